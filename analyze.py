@@ -2,15 +2,28 @@ from arguments import args
 from analyzer import Analyzer
 
 
+def read_lines(filename):
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
 if __name__ == "__main__":
 
     print("Please wait while the analyzer is being initialized.")
 
     analyzer = Analyzer(will_train=False, args=args)
 
-    text = input("Input text to analyze sentiment: ")
+    if args.input_file is not None:
+        results = analyzer.classify_sentiment_batch(
+            read_lines(args.input_file), batch_size=args.batch_size
+        )
+        for sentiment, percentage in results:
+            print(f"{sentiment}\t{percentage}")
+    else:
+        text = input("Input text to analyze sentiment: ")
 
-    while text:
-        sentiment, percentage = analyzer.classify_sentiment(text)
-        print(f"{sentiment} sentiment with {percentage}% probability.")
-        text = input("Input sentiment to analyze: ")
+        while text:
+            sentiment, percentage = analyzer.classify_sentiment(text)
+            print(f"{sentiment} sentiment with {percentage}% probability.")
+            text = input("Input sentiment to analyze: ")
@@ -1,4 +1,9 @@
+import time
+from contextlib import nullcontext
+from itertools import islice
+
 import torch
+from torch.nn.parallel import DistributedDataParallel
 from transformers import AutoTokenizer, AutoConfig
 from tqdm import tqdm
 
@@ -7,20 +12,61 @@ from modeling import (
     AlbertForSentimentClassification,
     DistilBertForSentimentClassification,
 )
+from quantization import quantize_model
+from result_cache import ResultCache, model_fingerprint
 from utils import get_accuracy_from_logits
 
 
 class Analyzer:
     def __init__(self, will_train, args):
 
+        Analyzer.resolve_model_name(will_train, args)
+
+        self.config = AutoConfig.from_pretrained(args.model_name_or_path)
+        self.backend = getattr(args, "backend", "torch")
+
+        if self.backend == "onnx":
+            if will_train:
+                raise ValueError("The ONNX backend can only be used for inference.")
+            if getattr(args, "quantization", "none") != "none":
+                raise ValueError("Quantization is only supported by the torch backend.")
+            # Imported here so onnxruntime is only needed when it is used.
+            from onnx_backend import OnnxClassifier
+
+            self.model = OnnxClassifier(args.model_name_or_path)
+            self.device = torch.device("cpu")
+        else:
+            self._load_torch_model(will_train, args)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(args.model_name_or_path)
+
+        self.output_dir = args.output_dir
+
+        # Repeated texts are answered from the cache instead of running the model again.
+        self.result_cache = None
+        cache_size = getattr(args, "result_cache_size", 0)
+        if not will_train and cache_size > 0:
+            self.result_cache = ResultCache(
+                model_fingerprint(
+                    args.model_name_or_path, self.backend, getattr(args, "quantization", "none")
+                ),
+                max_entries=cache_size,
+                ttl_seconds=getattr(args, "result_cache_ttl", None),
+                disk_path=getattr(args, "result_cache_path", None),
+            )
+
+    # Fills in the default model when --model_name_or_path was not given and returns it.
+    @staticmethod
+    def resolve_model_name(will_train, args):
         if args.model_name_or_path is None:
             if will_train:
                 args.model_name_or_path = "bert-base-uncased"
             else:
                 args.model_name_or_path = "barissayil/bert-sentiment-analysis-sst"
+        return args.model_name_or_path
 
-        self.config = AutoConfig.from_pretrained(args.model_name_or_path)
-
+    # Loads the PyTorch sentiment model matching the checkpoint's model type.
+    def _load_torch_model(self, will_train, args):
         if self.config.model_type == "bert":
             self.model = BertForSentimentClassification.from_pretrained(
                 args.model_name_or_path
@@ -42,13 +88,31 @@ class Analyzer:
 
         self.model.eval()
 
-        self.tokenizer = AutoTokenizer.from_pretrained(args.model_name_or_path)
+        if not will_train:
+            self.model = quantize_model(self.model, getattr(args, "quantization", "none"))
 
-        self.output_dir = args.output_dir
+    # The underlying model when it is wrapped in DistributedDataParallel.
+    @property
+    def base_model(self):
+        return getattr(self.model, "module", self.model)
+
+    # Wraps the model for multi-process training (see distributed.init_distributed).
+    # The heads read the CLS hidden state, so the encoders' poolers never get gradients:
+    # find_unused_parameters lets DDP skip them.
+    def wrap_distributed(self, local_rank=0):
+        device_ids = None
+        if self.device.type == "cuda":
+            self.device = torch.device(f"cuda:{local_rank}")
+            self.model = self.model.to(self.device)
+            device_ids = [local_rank]
+        self.model = DistributedDataParallel(
+            self.model, device_ids=device_ids, find_unused_parameters=True
+        )
 
     # Evaluates analyzer.
     def evaluate(self, val_loader, criterion):
-        self.model.eval()
+        model = self.base_model
+        model.eval()
         batch_accuracy_summation, loss, num_batches = 0, 0, 0
         with torch.no_grad():
             for input_ids, attention_mask, labels in tqdm(
@@ -59,7 +123,9 @@ class Analyzer:
                     attention_mask.to(self.device),
                     labels.to(self.device),
                 )
-                logits = self.model(input_ids=input_ids, attention_mask=attention_mask)
+                logits = model(
+                    input_ids=input_ids, attention_mask=attention_mask
+                ).float()
                 batch_accuracy_summation += get_accuracy_from_logits(logits, labels)
                 loss += criterion(logits.squeeze(-1), labels.float()).item()
                 num_batches += 1
@@ -67,45 +133,138 @@ class Analyzer:
         return accuracy.item(), loss
 
     # Trains analyzer for one epoch.
-    def train(self, train_loader, optimizer, criterion):
+    # precision="bf16" runs the forward pass under bf16 autocast; gradients of
+    # grad_accum_steps batches are averaged before each optimizer step (and, with
+    # DistributedDataParallel, synchronized only on that step).
+    # Returns samples/s and step time; progress is logged every log_every steps.
+    def train(self, train_loader, optimizer, criterion, precision="fp32", grad_accum_steps=1,
+              log_every=50, verbose=True):
         self.model.train()
-        for input_ids, attention_mask, labels in tqdm(
-            iterable=train_loader, desc="Training"
+        autocast = torch.autocast(
+            device_type=self.device.type, dtype=torch.bfloat16, enabled=precision == "bf16"
+        )
+        num_batches = len(train_loader)
+        samples, steps, step_samples = 0, 0, 0
+        start = step_start = time.perf_counter()
+        step_log = []  # (seconds, samples) of every optimizer step
+
+        optimizer.zero_grad()
+        for i, (input_ids, attention_mask, labels) in enumerate(
+            tqdm(iterable=train_loader, desc="Training", disable=not verbose)
         ):
-            optimizer.zero_grad()
             input_ids, attention_mask, labels = (
                 input_ids.to(self.device),
                 attention_mask.to(self.device),
                 labels.to(self.device),
             )
-            logits = self.model(input_ids=input_ids, attention_mask=attention_mask)
-            loss = criterion(input=logits.squeeze(-1), target=labels.float())
-            loss.backward()
-            optimizer.step()
+            is_step = (i + 1) % grad_accum_steps == 0 or i + 1 == num_batches
+            # The last group may be short; averaging over its real size keeps its step full-sized.
+            group_start = i - i % grad_accum_steps
+            group_size = min(grad_accum_steps, num_batches - group_start)
+            sync = nullcontext()
+            if not is_step and isinstance(self.model, DistributedDataParallel):
+                sync = self.model.no_sync()
+            with sync:
+                with autocast:
+                    logits = self.model(input_ids=input_ids, attention_mask=attention_mask)
+                loss = criterion(input=logits.float().squeeze(-1), target=labels.float())
+                (loss / group_size).backward()
+            step_samples += len(labels)
+
+            if is_step:
+                optimizer.step()
+                optimizer.zero_grad()
+                now = time.perf_counter()
+                step_log.append((now - step_start, step_samples))
+                samples += step_samples
+                steps += 1
+                if verbose and log_every and steps % log_every == 0:
+                    seconds = sum(t for t, _ in step_log[-log_every:])
+                    recent_samples = sum(n for _, n in step_log[-log_every:])
+                    print(
+                        f"step {steps}: loss {loss.item():.4f}, "
+                        f"{recent_samples / seconds:.1f} samples/s, "
+                        f"{1000 * seconds / log_every:.1f} ms/step"
+                    )
+                step_start, step_samples = now, 0
+
+        elapsed = time.perf_counter() - start
+        return {
+            "samples": samples,
+            "steps": steps,
+            "seconds": elapsed,
+            "samples_per_sec": samples / elapsed if elapsed else 0.0,
+            "avg_step_ms": 1000 * elapsed / steps if steps else 0.0,
+        }
 
     # Saves analyzer.
     def save(self):
-        self.model.save_pretrained(save_directory=f"models/{self.output_dir}/")
+        self.base_model.save_pretrained(save_directory=f"models/{self.output_dir}/")
         self.config.save_pretrained(save_directory=f"models/{self.output_dir}/")
         self.tokenizer.save_pretrained(save_directory=f"models/{self.output_dir}/")
 
     # Classifies sentiment as positve or negative.
     def classify_sentiment(self, text):
+        if self.result_cache is not None:
+            cached = self.result_cache.get(text)
+            if cached is not None:
+                return tuple(cached)
+        input_ids = self.tokenizer(text, truncation=True)["input_ids"]
+        result = self._classify_ids([input_ids])[0]
+        if self.result_cache is not None:
+            self.result_cache.put(text, result)
+        return result
+
+    # Classifies an iterable of texts in length-sorted, padded batches.
+    # Results are yielded lazily in input order, so generators of any size can be scored
+    # while holding at most batch_size * sort_window texts in memory.
+    def classify_sentiment_batch(self, texts, batch_size=32, sort_window=64):
+        texts = iter(texts)
+        while True:
+            window = list(islice(texts, batch_size * sort_window))
+            if not window:
+                return
+            results = [None] * len(window)
+            if self.result_cache is not None:
+                for i, text in enumerate(window):
+                    cached = self.result_cache.get(text)
+                    if cached is not None:
+                        results[i] = tuple(cached)
+            missing = [i for i, result in enumerate(results) if result is None]
+            if missing:
+                encoded = self.tokenizer([window[i] for i in missing], truncation=True)["input_ids"]
+                order = sorted(range(len(encoded)), key=lambda j: len(encoded[j]))
+                for start in range(0, len(order), batch_size):
+                    indices = order[start : start + batch_size]
+                    predictions = self._classify_ids([encoded[j] for j in indices])
+                    for j, prediction in zip(indices, predictions):
+                        results[missing[j]] = prediction
+                        if self.result_cache is not None:
+                            self.result_cache.put(window[missing[j]], prediction)
+            yield from results
+
+    # Runs a single padded forward pass over already tokenized inputs.
+    def _classify_ids(self, batch_ids):
+        maxlen = max(len(ids) for ids in batch_ids)
+        pad_id = self.tokenizer.pad_token_id or 0
         with torch.no_grad():
-            tokens = ["[CLS]"] + self.tokenizer.tokenize(text) + ["[SEP]"]
-            input_ids = (
-                torch.tensor(self.tokenizer.convert_tokens_to_ids(tokens))
-                .unsqueeze(0)
-                .to(self.device)
-            )
-            attention_mask = (input_ids != 0).long()
-            positive_logit = self.model(
+            input_ids = torch.tensor(
+                [ids + [pad_id] * (maxlen - len(ids)) for ids in batch_ids]
+            ).to(self.device)
+            attention_mask = torch.tensor(
+                [[1] * len(ids) + [0] * (maxlen - len(ids)) for ids in batch_ids]
+            ).to(self.device)
+            positive_logits = self.model(
                 input_ids=input_ids, attention_mask=attention_mask
             )
-            positive_probability = torch.sigmoid(positive_logit.unsqueeze(-1)).item()
-            positive_percentage = positive_probability * 100
-            is_positive = positive_probability > 0.5
-            if is_positive:
-                return "Positive", int(positive_percentage)
-            else:
-                return "Negative", int(100 - positive_percentage)
+            positive_probabilities = torch.sigmoid(positive_logits.float().squeeze(-1))
+        return [self._to_sentiment(p) for p in positive_probabilities.tolist()]
+
+    @staticmethod
+    def _to_sentiment(positive_probability):
+        positive_percentage = positive_probability * 100
+        is_positive = positive_probability > 0.5
+        if is_positive:
+            return "Positive", int(positive_percentage)
+        else:
+            return "Negative", int(100 - positive_percentage)
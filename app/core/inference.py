@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Per-model capacity, overridable with INFERENCE_<NAME>_WORKERS / INFERENCE_<NAME>_QUEUE.
+# Sentiment requests are cheap and are batched by the MicroBatcher, so it gets more workers.
+DEFAULT_LIMITS = {
+    "qa": (1, 8),
+    "sentiment": (16, 64),
+}
+
+
+class InferenceQueueFull(Exception):
+    """
+    Raised when a model's admission queue is full; the app answers 429.
+    """
+
+
+class InferenceExecutor:
+    """
+    A dedicated thread pool for one model with a bounded admission queue.
+
+    At most max_workers calls run at once and at most max_queue more wait;
+    any further request is rejected right away instead of piling up behind
+    the model. Awaiting run() keeps blocking inference off the event loop.
+    """
+
+    def __init__(self, name, max_workers=1, max_queue=8):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"infer-{name}")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+        self._max_run = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFull(f"Model '{self.name}' is busy, please retry shortly.")
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+        try:
+            future = self._pool.submit(self._call, submitted, fn, args, kwargs)
+        except Exception:
+            self._release()
+            raise
+        # The slot is held until the call itself ends, not until the awaiter stops waiting:
+        # a cancelled request (client gone) leaves its model call running in the pool.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _call(self, submitted, fn, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            wait = started - submitted
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._failed += failed
+                self._total_run += elapsed
+                self._max_run = max(self._max_run, elapsed)
+
+    # Returns queue depth plus queue wait and run time, reported separately.
+    def stats(self):
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "completed": completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": 1000.0 * self._total_wait / completed if completed else 0.0,
+                "max_queue_wait_ms": 1000.0 * self._max_wait,
+                "avg_run_ms": 1000.0 * self._total_run / completed if completed else 0.0,
+                "max_run_ms": 1000.0 * self._max_run,
+            }
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name) -> InferenceExecutor:
+    with _executors_lock:
+        if name not in _executors:
+            workers, queue = DEFAULT_LIMITS.get(name, (1, 8))
+            prefix = f"INFERENCE_{name.upper()}"
+            _executors[name] = InferenceExecutor(
+                name,
+                max_workers=int(os.environ.get(f"{prefix}_WORKERS", workers)),
+                max_queue=int(os.environ.get(f"{prefix}_QUEUE", queue)),
+            )
+        return _executors[name]
+
+
+def executor_stats():
+    with _executors_lock:
+        return {name: executor.stats() for name, executor in _executors.items()}
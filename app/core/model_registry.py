@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+# "background": start loading every model when the app starts and answer 503 until ready.
+# "lazy": load each model on the first request that needs it.
+# "prefork": load everything when app.main is imported, so a pre-forking server
+#            (gunicorn --preload, see gunicorn.conf.py) shares the weights with its workers.
+MODEL_LOADING = os.environ.get("MODEL_LOADING", "background")
+
+
+class ModelNotReady(Exception):
+    """
+    Raised when a request needs a model that is still loading or failed to load.
+    """
+
+
+class ModelRegistry:
+    """
+    Named model loaders with lazy or background loading and per-model status.
+
+    Modules register a loader at import time instead of loading weights, so
+    importing the app is fast and each router only waits for (or rejects
+    traffic until) the models it actually uses.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks[name] = threading.Lock()
+            self._status[name] = {"state": "not_loaded", "load_seconds": None, "error": None}
+
+    def get(self, name):
+        """
+        Returns the loaded model. A model that was never requested is loaded
+        now; one that is loading in the background or failed raises ModelNotReady.
+        """
+        status = self._status[name]
+        if status["state"] == "ready":
+            return self._models[name]
+        if status["state"] == "loading":
+            raise ModelNotReady(f"Model '{name}' is still loading.")
+        if status["state"] == "failed":
+            raise ModelNotReady(f"Model '{name}' failed to load: {status['error']}")
+        return self.load(name)
+
+    def load(self, name):
+        """
+        Loads a model (once) and blocks until it is ready.
+        """
+        with self._load_locks[name]:
+            if self._status[name]["state"] == "ready":
+                return self._models[name]
+
+            self._status[name] = {"state": "loading", "load_seconds": None, "error": None}
+            print(f"Loading model '{name}'...")
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = {
+                    "state": "failed",
+                    "load_seconds": time.perf_counter() - start,
+                    "error": str(e),
+                }
+                print(f"CRITICAL ERROR: Could not load model '{name}'. Details: {e}")
+                raise ModelNotReady(f"Model '{name}' failed to load: {e}") from e
+
+            self._models[name] = model
+            elapsed = time.perf_counter() - start
+            self._status[name] = {"state": "ready", "load_seconds": elapsed, "error": None}
+            print(f"Model '{name}' loaded in {elapsed:.1f} seconds.")
+            return model
+
+    def load_all(self):
+        """
+        Loads every registered model in the calling thread. Failures are recorded, not raised.
+        """
+        for name in list(self._loaders):
+            try:
+                self.load(name)
+            except ModelNotReady:
+                pass
+
+    def start_background(self, names=None):
+        """
+        Starts loading the given (default: all) models in daemon threads.
+        """
+        names = list(self._loaders) if names is None else names
+        for name in names:
+            if self._status[name]["state"] != "not_loaded":
+                continue
+            # Mark as loading right away so requests get a fast 503 instead of a second load.
+            self._status[name] = {"state": "loading", "load_seconds": None, "error": None}
+            threading.Thread(
+                target=self._load_quietly, args=(name,), name=f"load-{name}", daemon=True
+            ).start()
+
+    def _load_quietly(self, name):
+        try:
+            self.load(name)
+        except ModelNotReady:
+            pass
+
+    def is_ready(self, name):
+        return self._status[name]["state"] == "ready"
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+    def all_ready(self, lazy=False):
+        """
+        True when every model can serve requests. With lazy loading a model that
+        was never requested counts as ready, since it loads on the first request.
+        """
+        ok = {"ready", "not_loaded"} if lazy else {"ready"}
+        return all(status["state"] in ok for status in self._status.values())
+
+
+registry = ModelRegistry()
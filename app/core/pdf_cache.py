@@ -0,0 +1,88 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Where extracted PDF text is kept between requests, and how much of it.
+PDF_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR", ".cache/pdf_text"))
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+class PdfTextCache:
+    """
+    Content-addressed on-disk cache of extracted PDF text with LRU eviction.
+
+    Entries are keyed by a hash of the PDF bytes plus the parser settings, so
+    the same document uploaded twice is parsed once and a parser change
+    invalidates old entries. The key doubles as the document ID of the
+    upload-once API. Recency is tracked through file modification times,
+    which keeps the cache consistent across worker processes.
+    """
+
+    def __init__(self, cache_dir=PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(pdf_bytes: bytes, settings: str) -> str:
+        digest = hashlib.sha256(pdf_bytes)
+        digest.update(b"\0")
+        digest.update(settings.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        # Only hex digests are valid keys; anything else can't escape cache_dir.
+        if not key or any(c not in "0123456789abcdef" for c in key):
+            raise KeyError(key)
+        return self.cache_dir / f"{key}.txt"
+
+    def get(self, key: str):
+        try:
+            path = self._path(key)
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # mark as recently used
+        except (KeyError, OSError):
+            return None
+        return text
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def __contains__(self, key: str):
+        try:
+            return self._path(key).exists()
+        except KeyError:
+            return False
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith(".txt"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            entries.sort()
+            # Always keep the most recent entry, even if it alone exceeds the budget.
+            for _, size, path in entries[:-1]:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
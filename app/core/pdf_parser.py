@@ -1,78 +1,208 @@
-import io
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 import fitz  
-import re
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.pdf_cache import PdfTextCache
+from app.core.spatial import RectIndex
+from app.core.text_cleaning import TextCleaner
+
+# Drawings larger than this (in points, both sides) are treated as figures.
+MIN_FIGURE_SIZE = 50
+
+# Bump when the extraction rules change so cached results are invalidated.
+PARSER_VERSION = "1"
+
+PARSER_SETTINGS = f"v{PARSER_VERSION};min_figure={MIN_FIGURE_SIZE}"
+
+# Large documents are split into page ranges across this many processes.
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+MIN_PAGES_PER_WORKER = 8
+
+pdf_cache = PdfTextCache()
+
+# Compiled once per process and shared by every page.
+text_cleaner = TextCleaner()
+
+_process_pool = None
+
+
+async def read_pdf_upload(file: UploadFile) -> bytes:
 
-async def extract_text_from_pdf(file: UploadFile):
-    
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Error: Only PDF files are accepted.")
 
+    return await file.read()
+
+
+async def extract_text_from_pdf(file: UploadFile):
+
+    pdf_bytes = await read_pdf_upload(file)
+    # Parsing runs in a worker thread so the event loop keeps serving other requests.
+    _, text = await run_in_threadpool(get_or_extract_text, pdf_bytes)
+    return text
+
+
+def get_or_extract_text(pdf_bytes: bytes):
+    """
+    Returns (document_id, text), parsing the PDF only if it is not cached yet.
+    """
+    document_id = PdfTextCache.make_key(pdf_bytes, PARSER_SETTINGS)
+    text = pdf_cache.get(document_id)
+    if text is None:
+        text = extract_text_from_bytes(pdf_bytes)
+        pdf_cache.put(document_id, text)
+    else:
+        print(f"Using cached text for document {document_id[:12]}")
+    return document_id, text
+
+
+def extract_text_from_bytes(pdf_bytes: bytes, workers: int = None):
+    """
+    Extracts cleaned text from all pages, fanning page ranges out to a
+    process pool for large documents. Page order is preserved.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+
+    try:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            page_count = len(doc)
+            print(f"Processing PDF: {page_count} pages")
+
+            num_ranges = min(workers, page_count // MIN_PAGES_PER_WORKER)
+            if num_ranges <= 1:
+                pages = _extract_pages(doc, 0, page_count)
+            else:
+                pages = _extract_pages_parallel(pdf_bytes, page_count, num_ranges)
+
+        _report_page_stats(pages)
+
+        full_text = []
+        for page_num, page_clean_content, _ in pages:
+            if page_clean_content:
+                full_text.append(f"--- Page {page_num} ---")
+                full_text.append("\n\n".join(page_clean_content))
+
+        final_text = "\n\n".join(full_text)
+        return final_text
 
+    except Exception as e:
+        print(f"Error details: {e}")
+        raise HTTPException(status_code=500, detail=f"Text extraction error: {str(e)}")
+
+
+def iter_pdf_pages(pdf_bytes: bytes):
+    """
+    Yields (page_num, page_text) as each page is parsed, skipping empty pages.
+    Used to start answering before the whole document has been extracted.
+    Parse errors are raised as the same HTTPException as extract_text_from_bytes.
+    """
     try:
-        pdf_bytes = await file.read()
-        
-        with io.BytesIO(pdf_bytes) as pdf_stream:
-            with fitz.open(stream=pdf_stream, filetype="pdf") as doc:
-                
-                full_text = []
-                
-                exclude_patterns = [
-                    re.compile(r'arXiv:\d+\.\d+v\d+', re.IGNORECASE),
-                    re.compile(r'^\d+$'),
-                    re.compile(r'^(Figure|Fig\.|Table|Tab\.)\s*\d+', re.IGNORECASE) 
-                ]
-
-                print(f"Processing PDF: {len(doc)} pages")
-
-                for page_num, page in enumerate(doc, start=1):
-                    
-                    exclusion_rects = []
-
-                    for img in page.get_images():
-                        exclusion_rects.extend(page.get_image_rects(img[0]))
-
-                    drawings = page.get_drawings()
-                    for draw in drawings:
-                        rect = draw["rect"]
-                        if rect.width > 50 and rect.height > 50:
-                            exclusion_rects.append(rect)
-
-                    blocks = page.get_text("blocks", sort=True)
-                    page_clean_content = []
-                    
-                    for b in blocks:
-                        b_rect = fitz.Rect(b[:4])
-                        text_content = b[4]
-                        
-                        is_overlapping = False
-                        for exclude_area in exclusion_rects:
-                            if b_rect.intersects(exclude_area):
-                                is_overlapping = True
-                                break
-                        
-                        if is_overlapping:
-                            continue
-
-                        text_content = re.sub(r'-\s*\n\s*', '', text_content)
-                        text_content = re.sub(r'([a-z])\s*\n\s*([a-z])', r'\1 \2', text_content)
-                        text_content = re.sub(r'\s+', ' ', text_content).strip()
-
-                        if any(p.search(text_content) for p in exclude_patterns):
-                            continue
-
-                        if len(text_content) < 3:
-                            continue
-                            
-                        page_clean_content.append(text_content)
-                    
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            print(f"Streaming PDF: {len(doc)} pages")
+            for page_index in range(len(doc)):
+                for page_num, page_clean_content, _ in _extract_pages(doc, page_index, page_index + 1):
                     if page_clean_content:
-                        full_text.append(f"--- Page {page_num} ---")
-                        full_text.append("\n\n".join(page_clean_content))
-                
-                final_text = "\n\n".join(full_text)
-                return final_text
+                        yield page_num, "\n\n".join(page_clean_content)
 
     except Exception as e:
         print(f"Error details: {e}")
         raise HTTPException(status_code=500, detail=f"Text extraction error: {str(e)}")
+
+
+def _extract_pages_parallel(pdf_bytes: bytes, page_count: int, num_ranges: int):
+    # Workers open the document from a temp file instead of receiving a pickled copy of the bytes.
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+
+        bounds = [page_count * i // num_ranges for i in range(num_ranges + 1)]
+        futures = [
+            _get_process_pool().submit(_extract_page_range, pdf_path, start, end)
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+    finally:
+        os.remove(pdf_path)
+
+
+def _get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _process_pool
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int):
+    with fitz.open(pdf_path) as doc:
+        return _extract_pages(doc, start, end)
+
+
+def _extract_pages(doc, start: int, end: int):
+    """
+    Returns [(page_num, [clean block text, ...], stats), ...] for pages start..end-1.
+    stats holds per-page counters and stage timings in milliseconds.
+    """
+    pages = []
+    for page_index in range(start, end):
+        page = doc[page_index]
+        t0 = time.perf_counter()
+
+        exclusion_rects = []
+
+        for img in page.get_images():
+            exclusion_rects.extend(page.get_image_rects(img[0]))
+
+        drawings = page.get_drawings()
+        for draw in drawings:
+            rect = draw["rect"]
+            if rect.width > MIN_FIGURE_SIZE and rect.height > MIN_FIGURE_SIZE:
+                exclusion_rects.append(rect)
+
+        blocks = page.get_text("blocks", sort=True)
+        t1 = time.perf_counter()
+
+        # Nested and duplicate figure rects collapse into one entry of a grid index.
+        exclusion_index = RectIndex(
+            r for r in exclusion_rects if not (r.is_empty or r.is_infinite)
+        )
+        kept_blocks = [b for b in blocks if not exclusion_index.intersects(b[:4])]
+        t2 = time.perf_counter()
+
+        page_clean_content = text_cleaner.clean_blocks([b[4] for b in kept_blocks])
+        t3 = time.perf_counter()
+
+        stats = {
+            "blocks": len(blocks),
+            "exclusion_rects": len(exclusion_rects),
+            "indexed_rects": len(exclusion_index),
+            "layout_ms": 1000 * (t1 - t0),
+            "filter_ms": 1000 * (t2 - t1),
+            "clean_ms": 1000 * (t3 - t2),
+        }
+        pages.append((page_index + 1, page_clean_content, stats))
+
+    return pages
+
+
+def _report_page_stats(pages):
+    if not pages:
+        return
+    totals = {
+        key: sum(stats[key] for _, _, stats in pages)
+        for key in ("layout_ms", "filter_ms", "clean_ms", "exclusion_rects", "indexed_rects")
+    }
+    slowest_num, _, slowest = max(pages, key=lambda p: p[2]["filter_ms"])
+    print(
+        f"Page timings: layout {totals['layout_ms']:.1f} ms, filter {totals['filter_ms']:.1f} ms, "
+        f"clean {totals['clean_ms']:.1f} ms; exclusion rects {totals['exclusion_rects']} "
+        f"-> {totals['indexed_rects']} indexed; slowest filter on page {slowest_num} "
+        f"({slowest['filter_ms']:.1f} ms, {slowest['blocks']} blocks)"
+    )
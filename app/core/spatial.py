@@ -0,0 +1,60 @@
+import math
+from collections import defaultdict
+
+
+class RectIndex:
+    """
+    Grid-bucketed set of rectangles for fast "does this box overlap any of them?" checks.
+
+    Rectangles are (x0, y0, x1, y1) tuples with the same strict overlap rule
+    as fitz.Rect.intersects: touching edges do not count. Rectangles fully
+    contained in another one are dropped on insert, since any box overlapping
+    them also overlaps their container.
+    """
+
+    def __init__(self, rects=(), cell_size=64.0):
+        self.cell_size = cell_size
+        self.rects = []
+        self._cells = defaultdict(list)
+        # Largest first, so containers are indexed before the rects inside them.
+        for rect in sorted(rects, key=_area, reverse=True):
+            rect = tuple(rect)
+            if not self._is_covered(rect):
+                self._insert(rect)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def intersects(self, rect) -> bool:
+        x0, y0, x1, y1 = rect
+        if x0 >= x1 or y0 >= y1:
+            return False
+        for cell in self._cell_keys(rect):
+            for r in self._cells.get(cell, ()):
+                if x0 < r[2] and r[0] < x1 and y0 < r[3] and r[1] < y1:
+                    return True
+        return False
+
+    def _is_covered(self, rect) -> bool:
+        x0, y0, x1, y1 = rect
+        cell = (math.floor(x0 / self.cell_size), math.floor(y0 / self.cell_size))
+        for r in self._cells.get(cell, ()):
+            if r[0] <= x0 and r[1] <= y0 and x1 <= r[2] and y1 <= r[3]:
+                return True
+        return False
+
+    def _insert(self, rect):
+        self.rects.append(rect)
+        for cell in self._cell_keys(rect):
+            self._cells[cell].append(rect)
+
+    def _cell_keys(self, rect):
+        x0, y0, x1, y1 = rect
+        cs = self.cell_size
+        for cx in range(math.floor(x0 / cs), math.floor(x1 / cs) + 1):
+            for cy in range(math.floor(y0 / cs), math.floor(y1 / cs) + 1):
+                yield cx, cy
+
+
+def _area(rect):
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
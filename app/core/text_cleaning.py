@@ -0,0 +1,51 @@
+import re
+
+# Words hyphenated across a line break are joined: "extrac-\ntion" -> "extraction".
+DEHYPHENATE_RE = re.compile(r"-\s*\n\s*")
+
+# Blocks matching any of these are dropped: arXiv stamps, bare page numbers, figure/table captions.
+EXCLUDE_PATTERNS = (
+    r"(?i:arXiv:\d+\.\d+v\d+)",
+    r"^\d+$",
+    r"^(?i:(?:Figure|Fig\.|Table|Tab\.)\s*\d+)",
+)
+
+# Shorter blocks are noise (stray symbols, single letters).
+MIN_BLOCK_CHARS = 3
+
+
+class TextCleaner:
+    """
+    Cleans and filters the text blocks of a page with precompiled rules.
+
+    Cleaning joins hyphenated line breaks and collapses all whitespace to
+    single spaces. Only blocks with both a newline and a hyphen need the
+    regex; every other block takes the str.split() fast path. The exclude
+    patterns are compiled into a single alternation, so each block is
+    searched once.
+    """
+
+    def __init__(self, exclude_patterns=EXCLUDE_PATTERNS, min_chars=MIN_BLOCK_CHARS):
+        self.exclude_patterns = tuple(exclude_patterns)
+        self.min_chars = min_chars
+        self._exclude = (
+            re.compile("|".join(f"(?:{p})" for p in self.exclude_patterns)) if self.exclude_patterns else None
+        )
+
+    def clean(self, text: str) -> str:
+        if "\n" in text and "-" in text:
+            text = DEHYPHENATE_RE.sub("", text)
+        return " ".join(text.split())
+
+    def keep(self, text: str) -> bool:
+        """
+        True if a cleaned block is long enough and matches no exclude pattern.
+        """
+        return len(text) >= self.min_chars and not (self._exclude and self._exclude.search(text))
+
+    def clean_blocks(self, texts):
+        """
+        Cleans the raw texts of a page's blocks and returns the ones worth keeping, in order.
+        """
+        clean, keep = self.clean, self.keep
+        return [text for text in map(clean, texts) if keep(text)]
@@ -1,11 +1,34 @@
-from fastapi import FastAPI
+import gc
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.core.inference import InferenceQueueFull, executor_stats
+from app.core.model_registry import MODEL_LOADING, ModelNotReady, registry
 from app.qa_module.router import router as qa_module_router
 from app.sentiment_module.router import router as sentiment_router
 from fastapi.middleware.cors import CORSMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models load in background threads; routes answer 503 until their models are ready.
+    if MODEL_LOADING == "background":
+        registry.start_background()
+    yield
+
+
+if MODEL_LOADING == "prefork":
+    # Runs once in the gunicorn master; forked workers share these pages copy-on-write.
+    registry.load_all()
+    # Keep the collector from writing to (and so un-sharing) the objects loaded so far.
+    gc.collect()
+    gc.freeze()
+
+
 app = FastAPI(
     title="Smart Document Analyzer",
-    description="Question-Answering and Advanced Sentiment Analysis for PDF documents."
+    description="Question-Answering and Advanced Sentiment Analysis for PDF documents.",
+    lifespan=lifespan
 )
 
 origins = [
@@ -26,9 +49,35 @@ app.add_middleware(
     allow_headers=["*"],   
 )
 
+@app.exception_handler(ModelNotReady)
+async def model_not_ready_handler(request: Request, exc: ModelNotReady):
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": "5"})
+
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFull):
+    return JSONResponse(status_code=429, content={"error": str(exc)}, headers={"Retry-After": "1"})
+
 @app.get("/")
 def root():
     return {"message": "Smart Document Analyzer is working"}
 
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    models = registry.status()
+    # Lazy mode loads on the first request, so it must not wait for that before taking traffic.
+    is_ready = registry.all_ready(lazy=MODEL_LOADING == "lazy")
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "models": models}
+    )
+
+@app.get("/inference/stats")
+def inference_stats():
+    return executor_stats()
+
 app.include_router(qa_module_router, prefix="/qa", tags=["Question Answering"])
 app.include_router(sentiment_router)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+# Passages are windows of this many words, overlapping so answers are not cut in half.
+PASSAGE_WORDS = 150
+PASSAGE_OVERLAP = 30
+
+WORD_RE = re.compile(r"\S+")
+TERM_RE = re.compile(r"\w+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for",
+    "from", "has", "have", "how", "in", "is", "it", "its", "of", "on", "or",
+    "that", "the", "this", "to", "was", "were", "what", "when", "where", "which",
+    "who", "whom", "why", "with",
+}
+
+
+def tokenize(text: str):
+    return [t for t in TERM_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class PassageIndex:
+    """
+    BM25 inverted index over overlapping word windows of one document.
+
+    Built once per document; search() returns the passages most likely to
+    contain the answer so the reader only runs on those.
+    """
+
+    def __init__(self, text: str, passage_words=PASSAGE_WORDS, overlap=PASSAGE_OVERLAP, k1=1.5, b=0.75):
+        if not 0 <= overlap < passage_words:
+            raise ValueError("overlap must be smaller than passage_words.")
+        self.text = text
+        self.k1 = k1
+        self.b = b
+
+        words = [m.span() for m in WORD_RE.finditer(text)]
+        step = passage_words - overlap
+        self.passages = []  # (start_char, end_char)
+        for i in range(0, max(1, len(words)), step):
+            window = words[i : i + passage_words]
+            if not window:
+                break
+            self.passages.append((window[0][0], window[-1][1]))
+            if i + passage_words >= len(words):
+                break
+
+        self.postings = defaultdict(list)  # term -> [(passage_id, tf), ...]
+        self.lengths = []
+        for pid, (start, end) in enumerate(self.passages):
+            terms = tokenize(text[start:end])
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((pid, tf))
+
+        n = len(self.passages)
+        self.avg_length = sum(self.lengths) / n if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.passages)
+
+    def search(self, query: str, top_k: int):
+        """
+        Returns up to top_k (passage_id, score) pairs, best first.
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for pid, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[pid] / (self.avg_length or 1))
+                scores[pid] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return ranked[:top_k]
+
+    def spans(self, passage_ids):
+        """
+        Merges the given passages into sorted, non-overlapping (start, end) character spans.
+        """
+        merged = []
+        for start, end in sorted(self.passages[pid] for pid in passage_ids):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
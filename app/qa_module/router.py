@@ -1,24 +1,134 @@
+from typing import List, Optional
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException
-from app.core.pdf_parser import extract_text_from_pdf 
-from . import services  
+from starlette.concurrency import run_in_threadpool
+from app.core.inference import get_executor
+from app.core.pdf_parser import (
+    extract_text_from_pdf, get_or_extract_text, iter_pdf_pages, pdf_cache, read_pdf_upload
+)
+from . import services
 
 router = APIRouter()
 
+# Reader calls take seconds: they run in the QA executor, never on the event loop.
+qa_executor = get_executor("qa")
+
 @router.post("/ask-pdf")
 async def ask_question_from_pdf(
-    question: str = Form(...), 
-    file: UploadFile = File(...)
+    question: str = Form(...),
+    file: UploadFile = File(...),
+    stream: bool = Form(False),
+    confidence_threshold: Optional[float] = Form(None),
+    top_k_passages: Optional[int] = Form(None),
+    top_k: int = Form(services.TOP_K_ANSWERS, ge=1, le=services.MAX_TOP_K_ANSWERS)
 ):
-    
+
+    if stream:
+        # Score pages while they are parsed; optionally stop at the first confident answer.
+        try:
+            pdf_bytes = await read_pdf_upload(file)
+        except HTTPException as e:
+            return {"error": e.detail}
+
+        try:
+            result = await qa_executor.run(
+                services.find_answer_in_stream,
+                question,
+                iter_pdf_pages(pdf_bytes),
+                confidence_threshold,
+                top_k
+            )
+        except HTTPException as e:
+            return {"error": e.detail}
+    else:
+        try:
+            context = await extract_text_from_pdf(file)
+        except HTTPException as e:
+            return {"error": e.detail}
+
+        result = await qa_executor.run(
+            services.find_answer_in_text,
+            question=question, context=context, top_k_passages=top_k_passages, top_k=top_k
+        )
+
+    return {
+        "filename": file.filename,
+        "question": question,
+        "answer": result["answer"],
+        "candidates": result["candidates"]
+    }
+
+
+@router.post("/upload-pdf")
+async def upload_pdf(file: UploadFile = File(...)):
+    """
+    Parses a PDF once and returns a document ID for later questions.
+    """
     try:
-        context = await extract_text_from_pdf(file)
+        pdf_bytes = await read_pdf_upload(file)
+        document_id, context = await run_in_threadpool(get_or_extract_text, pdf_bytes)
     except HTTPException as e:
         return {"error": e.detail}
 
-    answer = services.find_answer_in_text(question=question, context=context)
-
     return {
         "filename": file.filename,
+        "document_id": document_id,
+        "characters": len(context)
+    }
+
+
+@router.post("/ask")
+async def ask_question_from_document(
+    question: str = Form(...),
+    document_id: str = Form(...),
+    top_k_passages: Optional[int] = Form(None),
+    top_k: int = Form(services.TOP_K_ANSWERS, ge=1, le=services.MAX_TOP_K_ANSWERS)
+):
+
+    context = pdf_cache.get(document_id)
+    if context is None:
+        return {"error": "Unknown or expired document_id. Please upload the PDF again."}
+
+    result = await qa_executor.run(
+        services.find_answer_in_text,
+        question=question, context=context, top_k_passages=top_k_passages, top_k=top_k
+    )
+
+    return {
+        "document_id": document_id,
         "question": question,
-        "answer": answer
-    }
\ No newline at end of file
+        "answer": result["answer"],
+        "candidates": result["candidates"]
+    }
+
+
+@router.post("/ask-many")
+async def ask_questions(
+    questions: List[str] = Form(...),
+    file: Optional[UploadFile] = File(None),
+    document_id: Optional[str] = Form(None),
+    top_k: int = Form(services.TOP_K_ANSWERS, ge=1, le=services.MAX_TOP_K_ANSWERS)
+):
+    """
+    Answers several questions about one PDF, given either as an upload or a document_id.
+    """
+    if document_id is not None:
+        context = pdf_cache.get(document_id)
+        if context is None:
+            return {"error": "Unknown or expired document_id. Please upload the PDF again."}
+    elif file is not None:
+        try:
+            pdf_bytes = await read_pdf_upload(file)
+            document_id, context = await run_in_threadpool(get_or_extract_text, pdf_bytes)
+        except HTTPException as e:
+            return {"error": e.detail}
+    else:
+        return {"error": "Either a file or a document_id is required."}
+
+    results = await qa_executor.run(
+        services.find_answers_in_text, questions=questions, context=context, top_k=top_k
+    )
+
+    return {
+        "document_id": document_id,
+        "results": results
+    }
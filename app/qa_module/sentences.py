@@ -0,0 +1,81 @@
+import re
+from bisect import bisect_right
+
+# A run of terminal punctuation, with any closing quotes or brackets, followed by whitespace or the end,
+# or a blank line between blocks, which also keeps "--- Page N ---" markers out of the sentences around them.
+BOUNDARY_RE = re.compile(r"([.!?]+)[\"')\]”’]*(?=\s|$)|\n[ \t]*\n")
+
+# Words that are usually followed by a period without ending the sentence.
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "fig", "figs", "eq",
+    "vol", "approx", "dept", "corp", "ltd", "inc", "al", "cf", "e.g", "i.e",
+}
+
+OPENING_CHARS = "\"'([“‘"
+
+# Longer words before a period are never treated as abbreviations.
+MAX_ABBREVIATION_CHARS = 12
+
+
+# The word that ends at offset end, or None if it is longer than MAX_ABBREVIATION_CHARS.
+def word_before(text: str, end: int):
+    start = max(0, end - MAX_ABBREVIATION_CHARS - 1)
+    window = text[start:end]
+    if not window or window[-1].isspace():
+        return ""
+    parts = window.rsplit(None, 1)
+    if len(parts) == 1 and start > 0 and not text[start - 1].isspace():
+        return None
+    return parts[-1]
+
+
+def is_abbreviation(word: str) -> bool:
+    word = word.lstrip(OPENING_CHARS)
+    if word.lower() in ABBREVIATIONS:
+        return True
+    # Initials ("J.") and dotted acronyms ("U.S.").
+    return word.replace(".", "").isalpha() and (len(word) == 1 and word.isupper() or "." in word)
+
+
+class SentenceIndex:
+    """
+    Sorted sentence boundaries of one document.
+
+    A boundary follows a '.', '!' or '?' (and any closing quote) that is
+    followed by whitespace, or a blank line; decimals, abbreviations and
+    initials are not boundaries. Built once per document; finding the
+    sentence around a span is then two binary searches.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.boundaries = []  # offsets right after each sentence end
+        for m in BOUNDARY_RE.finditer(text):
+            if m.group(1) == ".":
+                word = word_before(text, m.start())
+                if word is not None and is_abbreviation(word):
+                    continue
+            self.boundaries.append(m.end())
+
+    def __len__(self):
+        return len(self.boundaries) + 1
+
+    def span(self, start: int, end: int):
+        """
+        Returns the (start, end) offsets of the sentence(s) containing text[start:end], without surrounding whitespace.
+        """
+        i = bisect_right(self.boundaries, start)
+        sent_start = self.boundaries[i - 1] if i else 0
+        j = bisect_right(self.boundaries, max(end - 1, start), lo=i)
+        sent_end = self.boundaries[j] if j < len(self.boundaries) else len(self.text)
+
+        text = self.text
+        while sent_start < sent_end and text[sent_start].isspace():
+            sent_start += 1
+        while sent_end > sent_start and text[sent_end - 1].isspace():
+            sent_end -= 1
+        return sent_start, sent_end
+
+    def sentence(self, start: int, end: int) -> str:
+        sent_start, sent_end = self.span(start, end)
+        return self.text[sent_start:sent_end]
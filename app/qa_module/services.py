@@ -1,9 +1,51 @@
+import hashlib
+import os
+import threading
 import torch
 import time
+from collections import OrderedDict
+from fastapi import HTTPException
 from transformers import pipeline
 
-# Safety limit for text length
-MAX_CONTEXT_CHARS = 75000 
+from app.core.model_registry import registry
+from quantization import quantize_model
+from .retrieval import PassageIndex
+from .sentences import SentenceIndex
+from .spans import PageIndex, SpanMerger
+from .session import DocumentReader
+
+# Streaming QA scores the text in blocks of this many characters as pages arrive;
+# consecutive blocks share STREAM_OVERLAP_CHARS so an answer on the boundary is not cut.
+MAX_CONTEXT_CHARS = 75000
+STREAM_OVERLAP_CHARS = 2000
+
+# Retrieval-first QA: only the best BM25 passages go to the reader (0 = scan everything).
+TOP_K_PASSAGES = int(os.environ.get("QA_TOP_K_PASSAGES", "0"))
+
+# How many ranked answer candidates are returned per question (at most MAX_TOP_K_ANSWERS
+# on request), and the lowest score kept.
+TOP_K_ANSWERS = 3
+MAX_TOP_K_ANSWERS = 20
+MIN_ANSWER_SCORE = 0.01
+
+# Reader windowing over the whole document: tokens per window, longest answer span (in
+# tokens) and overlap between consecutive windows. Any answer of up to MAX_ANSWER_LEN tokens
+# lies whole inside some window only if the overlap is at least that long. The defaults keep
+# the previous answer length and overlap; shorter ones (e.g. 48/64) cut the window count.
+MAX_SEQ_LEN = 512
+MAX_ANSWER_LEN = int(os.environ.get("QA_MAX_ANSWER_LEN", "200"))
+DOC_STRIDE = int(os.environ.get("QA_DOC_STRIDE", "256"))
+if DOC_STRIDE < MAX_ANSWER_LEN:
+    raise ValueError(f"QA_DOC_STRIDE ({DOC_STRIDE}) must be at least MAX_ANSWER_LEN ({MAX_ANSWER_LEN}) tokens.")
+
+# Tokenized contexts are cached per document, up to this many tokens in total.
+SESSION_CACHE_TOKENS = int(os.environ.get("QA_SESSION_CACHE_TOKENS", "2000000"))
+
+# How many per-document passage and sentence indexes are kept in memory.
+MAX_CACHED_INDEXES = 16
+
+# Inference precision of the reader: "none" (fp32), "int8" (dynamic, CPU) or "bf16".
+QA_QUANTIZATION = os.environ.get("QA_QUANTIZATION", "none")
 
 # Extractive Model: Locates the exact answer in the text.
 EXTRACTIVE_MODEL_NAME = "deepset/deberta-v3-base-squad2" 
@@ -12,10 +54,9 @@ EXTRACTIVE_MODEL_NAME = "deepset/deberta-v3-base-squad2"
 device = 0 if torch.cuda.is_available() else -1
 device_name = 'GPU' if device == 0 else 'CPU'
 
-print(f"--- System Initialization on {device_name} ---")
-
 # --- LOAD MODEL ---
-try:
+def _load_reader():
+    print(f"--- System Initialization on {device_name} ---")
     print(f"Loading Extractive QA Model ({EXTRACTIVE_MODEL_NAME})...")
     extractive_pipeline = pipeline(
         "question-answering", 
@@ -23,111 +64,307 @@ try:
         device=device,
         handle_impossible_answer=True 
     )
-    print("Model loaded successfully.")
-    
-except Exception as e:
-    print(f"CRITICAL ERROR: Could not load model. Details: {e}")
-    exit()
+    # Tokenizes each context once and reuses its windows for follow-up questions.
+    # A span seen by two overlapping windows counts once, with its best score.
+    return DocumentReader(
+        quantize_model(extractive_pipeline.model, QA_QUANTIZATION),
+        extractive_pipeline.tokenizer,
+        max_seq_len=MAX_SEQ_LEN,
+        doc_stride=DOC_STRIDE,
+        max_cached_tokens=SESSION_CACHE_TOKENS,
+        dedupe_spans=True
+    )
 
 
-# --- HELPER FUNCTIONS ---
+# Loaded on first use or in the background at startup (see app.core.model_registry).
+registry.register("qa", _load_reader)
+
+
+def get_reader() -> DocumentReader:
+    return registry.get("qa")
 
-def expand_to_sentence(text, start_index, end_index):
-    """
-    Expands the exact answer span to the full sentence for better readability.
-    """
-    punctuations = ['.', '!', '?']
-    
-    sent_start = 0
-    text_before = text[:start_index]
-    for p in punctuations:
-        last_p = text_before.rfind(p)
-        if last_p > sent_start:
-            sent_start = last_p    
-    if sent_start > 0: sent_start += 1
-        
-    sent_end = len(text)
-    for p in punctuations:
-        next_p = text.find(p, end_index)
-        if next_p != -1 and next_p < sent_end:
-            sent_end = next_p + 1 
-            
-    return text[sent_start:sent_end].strip()
 
 # --- MAIN LOGIC ---
 
-def find_answer_in_text(question: str, context: str):
+NO_ANSWER = "I couldn't find a confident answer in the document."
+
+def find_answer_in_text(question: str, context: str, top_k_passages: int = None, top_k: int = TOP_K_ANSWERS):
+    """
+    Answers one question about a context.
+
+    Candidates from every window and chunk are merged by a SpanMerger.
+    Returns {"answer": the best span expanded to its sentence, "candidates":
+    up to top_k ranked spans with global offsets, score, page and sentence}.
+    """
+    get_reader()  # raises ModelNotReady before any work is done
+
     print(f"\n{'='*60}")
     print(f"PROCESSING QUESTION: '{question}'")
     print(f"{'='*60}")
     
     start_time = time.time()
 
-    # If context is larger than MAX_CONTEXT_CHARS, process in overlapping chunks
-    chunk_size = MAX_CONTEXT_CHARS
-    overlap = int(chunk_size * 0.2)  # 20% overlap to avoid cutting answers
-
-    if len(context) > chunk_size:
-        print(f"INFO: Context ({len(context)} chars) exceeds {chunk_size} chars. Processing in chunks with {overlap} char overlap.")
-        chunks = []
-        start = 0
-        while start < len(context):
-            end = min(start + chunk_size, len(context))
-            chunks.append((start, context[start:end]))
-            if end == len(context):
-                break
-            start = end - overlap
-    else:
+    if top_k_passages is None:
+        top_k_passages = TOP_K_PASSAGES
+
+    chunks = []
+    if top_k_passages > 0:
+        chunks = retrieve_chunks(question, context, top_k_passages)
+        print(f"INFO: Reading {len(chunks)} span(s) from the top {top_k_passages} retrieved passages.")
+
+    # Only whole documents are worth keeping tokenized for follow-up questions.
+    cache = not chunks
+    if not chunks:
+        # The reader windows the whole document by tokens.
         chunks = [(0, context)]
 
     try:
-        all_candidates = []
+        merger = SpanMerger(top_k)
 
-        # Run the Extractive Pipeline on each chunk and collect candidates with global spans
+        # Run the reader on each chunk and merge its candidates with global spans
         for chunk_start, chunk_text in chunks:
-            preds = extractive_pipeline(
-                question=question,
-                context=chunk_text,
-                top_k=3,
-                max_answer_len=200,
-                max_seq_len=512,
-                doc_stride=256
-            )
-
-            if not isinstance(preds, list):
-                preds = [preds]
-
-            for p in preds:
-                # defensive copy
-                p_global = p.copy()
-                if 'start' in p and 'end' in p:
-                    p_global['start'] = p['start'] + chunk_start
-                    p_global['end'] = p['end'] + chunk_start
-                all_candidates.append(p_global)
-
-        if not all_candidates:
-            return "I couldn't find a confident answer in the document."
-
-        # Sort all candidates by score and pick the best
-        all_candidates.sort(key=lambda x: x.get('score', 0), reverse=True)
-        best_answer = all_candidates[0]
-        if best_answer.get('score', 0) < 0.01:
-            return "I couldn't find a confident answer in the document."
-
-        # Format the Output
-        raw_answer = best_answer['answer']
-        
-        # Expand to full sentence for better context
-        full_sentence = expand_to_sentence(context, best_answer['start'], best_answer['end'])
+            for candidate in _score_chunk(question, chunk_text, chunk_start, top_k, cache):
+                if candidate['score'] >= MIN_ANSWER_SCORE:
+                    merger.add(candidate)
+
+        candidates = _describe_candidates(
+            merger.ranked(), get_sentence_index(context), get_page_index(context)
+        )
         
         elapsed = time.time() - start_time
         print(f"\n--- Done in {elapsed:.3f} seconds ---")
-        
-        return full_sentence if full_sentence else raw_answer
+
+        if not candidates:
+            return {"answer": NO_ANSWER, "candidates": []}
+        return {"answer": candidates[0]['sentence'] or candidates[0]['answer'], "candidates": candidates}
 
     except Exception as e:
         print(f"ERROR: {e}")
-        return f"An error occurred: {str(e)}"
+        return {"answer": f"An error occurred: {str(e)}", "candidates": []}
+
+def find_answers_in_text(questions, context: str, top_k: int = TOP_K_ANSWERS):
+    """
+    Answers many questions about one context in a single pass over it.
+
+    Every question x window pair of the document is run through the reader in
+    shared batches. Returns, per question, the best answer expanded to its
+    sentence plus the top_k merged candidate spans, as in find_answer_in_text.
+    """
+    get_reader()
+
+    print(f"\n{'='*60}")
+    print(f"PROCESSING {len(questions)} QUESTIONS")
+    print(f"{'='*60}")
+
+    start_time = time.time()
+
+    all_candidates = get_reader().answer_many(questions, context, top_k=top_k, max_answer_len=MAX_ANSWER_LEN)
+
+    sentences, pages = get_sentence_index(context), get_page_index(context)
+    results = []
+    for question, preds in zip(questions, all_candidates):
+        merger = SpanMerger(top_k)
+        for p in preds:
+            if p['score'] >= MIN_ANSWER_SCORE:
+                merger.add(p)
+        candidates = _describe_candidates(merger.ranked(), sentences, pages)
+
+        results.append({
+            "question": question,
+            "answer": (candidates[0]['sentence'] or candidates[0]['answer']) if candidates else NO_ANSWER,
+            "candidates": candidates
+        })
+
+    elapsed = time.time() - start_time
+    print(f"\n--- Done in {elapsed:.3f} seconds ---")
+
+    return results
+
+
+def find_answer_in_stream(question: str, pages, confidence_threshold: float = None, top_k: int = TOP_K_ANSWERS):
+    """
+    Answers from an iterable of (page_num, page_text) while it is still being produced.
+
+    Pages are joined in the same layout as extract_text_from_pdf and scored
+    chunk by chunk as soon as MAX_CONTEXT_CHARS are available, so only the
+    current chunk is held in memory. With confidence_threshold set, the
+    stream is abandoned once a candidate reaches that score. Returns the
+    same dict as find_answer_in_text; an HTTPException from the pages
+    (a PDF that fails to parse) is raised.
+    """
+    get_reader()  # raises ModelNotReady before the stream is consumed
+
+    print(f"\n{'='*60}")
+    print(f"PROCESSING QUESTION (streaming): '{question}'")
+    print(f"{'='*60}")
+
+    start_time = time.time()
+
+    chunk_size = MAX_CONTEXT_CHARS
+    overlap = STREAM_OVERLAP_CHARS
+
+    buffer = ""        # text from buffer_start onwards
+    buffer_start = 0
+    scored_until = 0   # global offset up to which text has been scored
+    merger = SpanMerger(top_k)
+    page_index = PageIndex()
+
+    def score(chunk_start, chunk_text):
+        nonlocal scored_until
+        sentences = None
+        for candidate in _score_chunk(question, chunk_text, chunk_start, top_k, cache=False):
+            if candidate['score'] >= MIN_ANSWER_SCORE and merger.add(candidate):
+                # Expand now, over the whole buffer (which may run past the chunk end),
+                # so no buffer has to outlive its chunk.
+                if sentences is None:
+                    sentences = SentenceIndex(buffer)
+                candidate['sentence'] = sentences.sentence(
+                    candidate['start'] - buffer_start, candidate['end'] - buffer_start
+                )
+        scored_until = chunk_start + len(chunk_text)
+
+    def confident():
+        best = merger.best()
+        return (
+            confidence_threshold is not None
+            and best is not None
+            and best['score'] >= confidence_threshold
+        )
+
+    try:
+        for page_num, page_text in pages:
+            if buffer_start or buffer:
+                buffer += "\n\n"
+            page_index.add(buffer_start + len(buffer), page_num)
+            buffer += f"--- Page {page_num} ---\n\n{page_text}"
+
+            while len(buffer) >= chunk_size:
+                score(buffer_start, buffer[:chunk_size])
+                buffer = buffer[chunk_size - overlap:]
+                buffer_start += chunk_size - overlap
+                if confident():
+                    break
+            if confident():
+                print(f"INFO: Stopping early on page {page_num} (score {merger.best()['score']:.3f}).")
+                break
+        else:
+            if buffer_start + len(buffer) > scored_until:
+                score(buffer_start, buffer)
+
+        if hasattr(pages, "close"):
+            pages.close()
+
+        candidates = merger.ranked()
+        last_sentences = None
+        for c in candidates:
+            if c['start'] >= buffer_start:
+                # The last buffer may have grown since the span was found.
+                if last_sentences is None:
+                    last_sentences = SentenceIndex(buffer)
+                c['sentence'] = last_sentences.sentence(c['start'] - buffer_start, c['end'] - buffer_start)
+            c['page'] = page_index.page_at(c['start'])
+
+        elapsed = time.time() - start_time
+        print(f"\n--- Done in {elapsed:.3f} seconds ---")
+
+        if not candidates:
+            return {"answer": NO_ANSWER, "candidates": []}
+        return {"answer": candidates[0]['sentence'] or candidates[0]['answer'], "candidates": candidates}
+
+    except HTTPException:
+        raise  # parse errors from the page source; the router reports them as {"error": ...}
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return {"answer": f"An error occurred: {str(e)}", "candidates": []}
+
+
+def _describe_candidates(candidates, sentences: SentenceIndex, pages: PageIndex):
+    """
+    Adds the sentence around each candidate and the page it starts on.
+    """
+    for c in candidates:
+        c['sentence'] = sentences.sentence(c['start'], c['end'])
+        c['page'] = pages.page_at(c['start'])
+    return candidates
+
+
+_passage_indexes = OrderedDict()
+_sentence_indexes = OrderedDict()
+_page_indexes = OrderedDict()
+
+
+_indexes_lock = threading.Lock()
+
+
+# Requests run in executor and threadpool threads, so the LRUs are only touched under the lock.
+# Indexes are built outside it; if two threads build the same one, the first stored wins.
+def _cached_index(cache: OrderedDict, context: str, build):
+    key = hashlib.sha1(context.encode("utf-8")).hexdigest()
+    with _indexes_lock:
+        index = cache.get(key)
+        if index is not None:
+            cache.move_to_end(key)
+            return index
+
+    index = build(context)
+
+    with _indexes_lock:
+        index = cache.setdefault(key, index)
+        cache.move_to_end(key)
+        while len(cache) > MAX_CACHED_INDEXES:
+            cache.popitem(last=False)
+    return index
+
+
+def get_passage_index(context: str) -> PassageIndex:
+    """
+    Returns the BM25 index for a document, building it on first use (LRU-bounded).
+    """
+    return _cached_index(_passage_indexes, context, PassageIndex)
+
+
+def get_sentence_index(context: str) -> SentenceIndex:
+    """
+    Returns the sentence boundaries of a document, found on first use (LRU-bounded).
+    """
+    return _cached_index(_sentence_indexes, context, SentenceIndex)
+
+
+def get_page_index(context: str) -> PageIndex:
+    """
+    Returns the page marker offsets of a document, found on first use (LRU-bounded).
+    """
+    return _cached_index(_page_indexes, context, PageIndex)
+
+
+def retrieve_chunks(question: str, context: str, top_k: int):
+    """
+    Returns [(start, text), ...] for the top_k BM25 passages, merged where they overlap.
+    Empty when no passage shares a term with the question.
+    """
+    index = get_passage_index(context)
+    hits = index.search(question, top_k)
+    return [(start, context[start:end]) for start, end in index.spans(pid for pid, _ in hits)]
+
+
+def _score_chunk(question: str, chunk_text: str, chunk_start: int, top_k: int = TOP_K_ANSWERS, cache=True):
+    """
+    Runs the reader on one chunk and returns its candidates with global spans.
+    With cache=False the chunk's tokenized session is not kept by the reader.
+    """
+    preds = get_reader().answer(
+        question, chunk_text, top_k=top_k, max_answer_len=MAX_ANSWER_LEN, cache=cache
+    )
+
+    candidates = []
+    for p in preds:
+        # defensive copy
+        p_global = p.copy()
+        if 'start' in p and 'end' in p:
+            p_global['start'] = p['start'] + chunk_start
+            p_global['end'] = p['end'] + chunk_start
+        candidates.append(p_global)
+    return candidates
 
 # --- TESTING BLOCK ---
 if __name__ == "__main__":
@@ -139,4 +376,4 @@ if __name__ == "__main__":
     
     test_question = "What is artificial intelligence?"
     answer = find_answer_in_text(test_question, test_context)
-    print(f"\nFINAL ANSWER: {answer}")
+    print(f"\nFINAL ANSWER: {answer['answer']}")
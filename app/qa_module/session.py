@@ -0,0 +1,222 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import torch
+from transformers.pipelines.question_answering import select_starts_ends
+
+
+class DocumentSession:
+    """
+    A context tokenized once, with its overlapping windows and offset mappings.
+
+    Windows are sized for a question of at most max_question_len tokens, so
+    they do not depend on the question and can be reused for every follow-up
+    question about the same text.
+    """
+
+    def __init__(self, context: str, tokenizer, max_seq_len=512, doc_stride=256, max_question_len=64):
+        self.context = context
+        self.tokenizer = tokenizer
+        self.max_question_len = max_question_len
+
+        enc = tokenizer(context, add_special_tokens=False, return_offsets_mapping=True)
+        self.encoding = enc
+        self.context_ids = enc["input_ids"]
+        self.offsets = enc["offset_mapping"]
+
+        # [CLS] question [SEP] window [SEP]
+        num_special = tokenizer.num_special_tokens_to_add(pair=True)
+        self.window_len = max_seq_len - max_question_len - num_special
+        if self.window_len <= doc_stride:
+            raise ValueError("max_seq_len leaves no room for windows larger than doc_stride.")
+        step = self.window_len - doc_stride
+
+        self.windows = []  # (token_start, token_end) into context_ids
+        start = 0
+        while True:
+            end = min(start + self.window_len, len(self.context_ids))
+            self.windows.append((start, end))
+            if end == len(self.context_ids):
+                break
+            start += step
+
+    def __len__(self):
+        return len(self.context_ids)
+
+    def char_span(self, start_token: int, end_token: int):
+        """
+        Character span of context tokens start..end, widened to whole words like the pipeline does.
+        """
+        start_word = self.encoding.token_to_word(start_token)
+        end_word = self.encoding.token_to_word(end_token)
+        if start_word is None or end_word is None:
+            return self.offsets[start_token][0], self.offsets[end_token][1]
+        return self.encoding.word_to_chars(start_word).start, self.encoding.word_to_chars(end_word).end
+
+    def features(self, question: str):
+        """
+        Merges the question tokens into every cached window.
+        Returns one dict per window with model inputs plus p_mask and window bounds.
+        """
+        tok = self.tokenizer
+        question_ids = tok(question, add_special_tokens=False)["input_ids"][: self.max_question_len]
+        context_offset = len(tok.build_inputs_with_special_tokens(question_ids))
+
+        features = []
+        for start, end in self.windows:
+            window_ids = self.context_ids[start:end]
+            input_ids = tok.build_inputs_with_special_tokens(question_ids, window_ids)
+            p_mask = np.ones(len(input_ids), dtype=np.int64)
+            p_mask[context_offset : context_offset + len(window_ids)] = 0
+            if tok.cls_token_id is not None:
+                p_mask[np.asarray(input_ids) == tok.cls_token_id] = 0
+            feature = {
+                "input_ids": input_ids,
+                "p_mask": p_mask,
+                "context_offset": context_offset,
+                "window": (start, end),
+            }
+            if "token_type_ids" in tok.model_input_names:
+                feature["token_type_ids"] = (
+                    [0] * context_offset + [1] * (len(input_ids) - context_offset)
+                )
+            features.append(feature)
+        return features
+
+
+class DocumentReader:
+    """
+    Extractive QA over DocumentSessions, with an LRU of sessions bounded by cached tokens.
+
+    Scoring follows the transformers question-answering pipeline
+    (handle_impossible_answer=True), so results match it for the same windows.
+    With dedupe_spans, a span found again in the overlap of two windows keeps
+    its best score instead of adding up the scores of every equal answer text.
+    """
+
+    def __init__(self, model, tokenizer, max_seq_len=512, doc_stride=256, batch_size=8,
+                 max_cached_tokens=2_000_000, dedupe_spans=False):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_seq_len = max_seq_len
+        self.doc_stride = doc_stride
+        self.batch_size = batch_size
+        self.max_cached_tokens = max_cached_tokens
+        self.dedupe_spans = dedupe_spans
+
+        self._sessions = OrderedDict()
+        self._cached_tokens = 0
+        self._lock = threading.Lock()
+
+    def session(self, context: str, cache=True) -> DocumentSession:
+        """
+        Returns the cached session of context, or tokenizes it. With cache=False a new
+        session is not kept, for one-off texts that would only push documents out of the cache.
+        """
+        key = hashlib.sha1(context.encode("utf-8")).hexdigest()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+
+        session = DocumentSession(context, self.tokenizer, self.max_seq_len, self.doc_stride)
+        if not cache:
+            return session
+
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = session
+                self._cached_tokens += len(session)
+            # Always keep the newest session, even if it alone exceeds the budget.
+            while self._cached_tokens > self.max_cached_tokens and len(self._sessions) > 1:
+                _, evicted = self._sessions.popitem(last=False)
+                self._cached_tokens -= len(evicted)
+        return session
+
+    def answer(self, question: str, context: str, top_k=3, max_answer_len=200, cache=True):
+        """
+        Returns up to top_k {"score", "start", "end", "answer"} dicts with character offsets into context.
+        """
+        return self.answer_many([question], context, top_k, max_answer_len, cache)[0]
+
+    def answer_many(self, questions, context: str, top_k=3, max_answer_len=200, cache=True):
+        """
+        Answers several questions about one context.
+        All question x window pairs go through the model in shared batches;
+        returns one answer list (as in answer()) per question. cache is passed to session().
+        """
+        session = self.session(context, cache)
+        features = [(qi, f) for qi, question in enumerate(questions) for f in session.features(question)]
+        start_logits, end_logits = self._run_model([f for _, f in features])
+
+        results = [([], {}, 1000000) for _ in questions]  # answers, seen, min_null_score
+        for (qi, feature), start_, end_ in zip(features, start_logits, end_logits):
+            answers, seen, min_null_score = results[qi]
+            length = len(feature["input_ids"])
+            starts, ends, scores, min_null_score = select_starts_ends(
+                start_[None, :length],
+                end_[None, :length],
+                feature["p_mask"],
+                np.ones((1, length), dtype=np.int64),
+                min_null_score,
+                top_k * 2 + 10,  # as in the pipeline: word alignment may merge candidates
+                True,
+                max_answer_len,
+            )
+            results[qi] = (answers, seen, min_null_score)
+
+            token_base = feature["window"][0] - feature["context_offset"]
+            for s, e, score in zip(starts, ends, scores):
+                start_char, end_char = session.char_span(token_base + s, token_base + e)
+                text = context[start_char:end_char]
+                key = (start_char, end_char) if self.dedupe_spans else text
+                if key in seen:
+                    if self.dedupe_spans:
+                        seen[key]["score"] = max(seen[key]["score"], score.item())
+                    else:
+                        # As in the pipeline: the same answer text accumulates its score.
+                        seen[key]["score"] += score.item()
+                else:
+                    seen[key] = {
+                        "score": score.item(),
+                        "start": start_char,
+                        "end": end_char,
+                        "answer": text,
+                    }
+                    answers.append(seen[key])
+
+        outputs = []
+        for answers, _, min_null_score in results:
+            answers.append({"score": min_null_score, "start": 0, "end": 0, "answer": ""})
+            answers.sort(key=lambda x: x["score"], reverse=True)
+            outputs.append(answers[:top_k])
+        return outputs
+
+    def _run_model(self, features):
+        pad_id = self.tokenizer.pad_token_id or 0
+        # Length-sorted batches keep padding low when questions differ in length.
+        order = sorted(range(len(features)), key=lambda i: len(features[i]["input_ids"]))
+        start_logits, end_logits = [None] * len(features), [None] * len(features)
+        with torch.no_grad():
+            for i in range(0, len(order), self.batch_size):
+                batch_indices = order[i : i + self.batch_size]
+                batch = [features[j] for j in batch_indices]
+                maxlen = max(len(f["input_ids"]) for f in batch)
+                inputs = {
+                    "input_ids": [f["input_ids"] + [pad_id] * (maxlen - len(f["input_ids"])) for f in batch],
+                    "attention_mask": [[1] * len(f["input_ids"]) + [0] * (maxlen - len(f["input_ids"])) for f in batch],
+                }
+                if "token_type_ids" in batch[0]:
+                    inputs["token_type_ids"] = [
+                        f["token_type_ids"] + [0] * (maxlen - len(f["input_ids"])) for f in batch
+                    ]
+                inputs = {k: torch.tensor(v, device=self.model.device) for k, v in inputs.items()}
+                outputs = self.model(**inputs)
+                batch_starts = outputs.start_logits.float().cpu().numpy()
+                batch_ends = outputs.end_logits.float().cpu().numpy()
+                for j, start_, end_ in zip(batch_indices, batch_starts, batch_ends):
+                    start_logits[j], end_logits[j] = start_, end_
+        return start_logits, end_logits
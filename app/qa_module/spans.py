@@ -0,0 +1,82 @@
+import heapq
+import re
+from bisect import bisect_right
+
+# Page headers written by extract_text_from_pdf / find_answer_in_stream.
+PAGE_MARKER_RE = re.compile(r"^--- Page (\d+) ---$", re.MULTILINE)
+
+
+class PageIndex:
+    """
+    Start offsets of the "--- Page N ---" markers of a document, for mapping offsets to pages.
+    """
+
+    def __init__(self, text: str = ""):
+        self.starts = []
+        self.pages = []
+        for m in PAGE_MARKER_RE.finditer(text):
+            self.add(m.start(), int(m.group(1)))
+
+    # Markers must be added in document order.
+    def add(self, offset: int, page_num: int):
+        self.starts.append(offset)
+        self.pages.append(page_num)
+
+    def page_at(self, offset: int):
+        """
+        Page number of the text at offset, or None before the first marker.
+        """
+        i = bisect_right(self.starts, offset)
+        return self.pages[i - 1] if i else None
+
+
+class SpanMerger:
+    """
+    The top_k best answer spans seen so far, over any number of windows and chunks.
+
+    A span that overlaps a kept span (including the same span found again in
+    an overlapping window) only survives if it scores higher, and then
+    replaces it. Spans live in a min-heap of at most top_k entries, so each
+    add() costs O(top_k) whatever the number of candidates. Empty (no-answer)
+    spans are ignored.
+    """
+
+    def __init__(self, top_k=3):
+        self.top_k = top_k
+        self._heap = []  # (score, seq, candidate), worst first
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, candidate) -> bool:
+        """
+        Offers a {"score", "start", "end", "answer"} dict; returns True if it was kept.
+        """
+        start, end, score = candidate["start"], candidate["end"], candidate["score"]
+        if start >= end or self.top_k <= 0:
+            return False
+        overlapping = [item for item in self._heap if item[2]["start"] < end and start < item[2]["end"]]
+        if any(item[0] >= score for item in overlapping):
+            return False
+        if not overlapping and len(self._heap) >= self.top_k and score <= self._heap[0][0]:
+            return False
+
+        if overlapping:
+            dropped = {item[1] for item in overlapping}
+            self._heap = [item for item in self._heap if item[1] not in dropped]
+            heapq.heapify(self._heap)
+        self._seq += 1
+        heapq.heappush(self._heap, (score, self._seq, candidate))
+        if len(self._heap) > self.top_k:
+            heapq.heappop(self._heap)
+        return True
+
+    def best(self):
+        return max(self._heap, key=lambda item: item[0])[2] if self._heap else None
+
+    def ranked(self):
+        """
+        Returns the kept candidates, best first.
+        """
+        return [item[2] for item in sorted(self._heap, key=lambda item: (-item[0], item[1]))]
@@ -2,19 +2,32 @@
 
 from fastapi import APIRouter
 from pydantic import BaseModel
-from app.sentiment_module.service import analyze_text_full
+from app.core.inference import get_executor
+from app.core.model_registry import registry
+from app.sentiment_module.service import analyze_text_full, full_result_cache, get_polarity_batcher
 
 router = APIRouter(
     prefix="/sentiment",
     tags=["Sentiment Analysis"],
 )
 
+sentiment_executor = get_executor("sentiment")
+
 
 class SentimentRequest(BaseModel):
     text: str
 
 
 @router.post("/analyze")
-def analyze(req: SentimentRequest):
-    
-    return analyze_text_full(req.text)
+async def analyze(req: SentimentRequest):
+
+    return await sentiment_executor.run(analyze_text_full, req.text)
+
+
+@router.get("/stats")
+def stats():
+
+    stats = {"result_cache": full_result_cache.stats(), "executor": sentiment_executor.stats()}
+    if registry.is_ready("sentiment"):
+        stats.update(get_polarity_batcher().stats())
+    return stats
@@ -1,4 +1,5 @@
 # app/sentiment_module/service.py
+import os
 import sys
 from pathlib import Path
 import torch
@@ -15,36 +16,80 @@ sys.argv = [sys.argv[0]]
 
 from arguments import args           
 from analyzer import Analyzer         
+from batching import MicroBatcher
+from modeling import BertForSentimentAndHelpfulness
+from quantization import quantize_model
+from result_cache import ResultCache, model_fingerprint
+from app.core.model_registry import registry
 
 sys.argv = _argv_backup
 
+# Inference precision per model: "none" (fp32), "int8" (dynamic, CPU) or "bf16".
+args.quantization = os.environ.get("SENTIMENT_QUANTIZATION", args.quantization)
+# "onnx" serves the polarity model with ONNX Runtime (SENTIMENT model dir from export_onnx.py).
+args.backend = os.environ.get("SENTIMENT_BACKEND", args.backend)
+
+# Full results for repeated texts (full_result_cache below); RESULT_CACHE_PATH shares them
+# between worker processes. The Analyzer's own cache stays off so nothing is cached twice.
+FULL_RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "10000"))
+args.result_cache_size = 0
+args.result_cache_ttl = (
+    float(os.environ["RESULT_CACHE_TTL"]) if "RESULT_CACHE_TTL" in os.environ else args.result_cache_ttl
+)
+args.result_cache_path = os.environ.get("RESULT_CACHE_PATH", args.result_cache_path)
+HELPFULNESS_QUANTIZATION = os.environ.get("HELPFULNESS_QUANTIZATION", "none")
+
+# Resolved now (not when the Analyzer loads) so the result cache fingerprint names the real model.
+Analyzer.resolve_model_name(will_train=False, args=args)
+
 # ---------------- POLARITY MODELİ (Positive / Negative) ---------------- #
 
-print("Initializing Sentiment Analyzer (polarity, using local project)...")
-sentiment_analyzer = Analyzer(will_train=False, args=args)
-sentiment_analyzer.model.eval()
+def _load_polarity():
+    print("Initializing Sentiment Analyzer (polarity, using local project)...")
+    sentiment_analyzer = Analyzer(will_train=False, args=args)
+    sentiment_analyzer.model.eval()
+
+    # Concurrent requests are grouped into a single padded forward pass.
+    return MicroBatcher(
+        lambda texts: list(sentiment_analyzer.classify_sentiment_batch(texts, batch_size=len(texts))),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.batch_wait_ms,
+    )
+
+
+registry.register("sentiment", _load_polarity)
+
+
+def get_polarity_batcher() -> MicroBatcher:
+    return registry.get("sentiment")
 
 
 def analyze_polarity(text: str):
     """
     Positive / Negative modelini kullanır.
     """
-    label, percentage = sentiment_analyzer.classify_sentiment(text)
+    label, percentage = get_polarity_batcher().submit(text)
     return {
         "label": label,                # "Positive" veya "Negative"
         "score": percentage / 100.0,   # 0–1 arası float
     }
 
 HELPFUL_MODEL_DIR = SENTIMENT_REPO / "models" / "helpful_distil"
-print("Initializing Helpfulness/Creativity model from:", HELPFUL_MODEL_DIR)
-
 help_device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
 
-help_tokenizer = AutoTokenizer.from_pretrained(str(HELPFUL_MODEL_DIR))
-help_model = AutoModelForSequenceClassification.from_pretrained(
-    str(HELPFUL_MODEL_DIR)
-).to(help_device)
-help_model.eval()
+
+def _load_helpfulness():
+    print("Initializing Helpfulness/Creativity model from:", HELPFUL_MODEL_DIR)
+    help_tokenizer = AutoTokenizer.from_pretrained(str(HELPFUL_MODEL_DIR))
+    help_model = AutoModelForSequenceClassification.from_pretrained(
+        str(HELPFUL_MODEL_DIR)
+    ).to(help_device)
+    help_model.eval()
+    help_model = quantize_model(help_model, HELPFULNESS_QUANTIZATION)
+    return help_tokenizer, help_model
+
+
+registry.register("helpfulness", _load_helpfulness)
 
 HELP_LABELS = [ "helpful", "creative", "unhelpful"]
 
@@ -71,31 +116,16 @@ def looks_creative(text: str) -> bool:
 
     return has_hint or has_examples or (long_enough and uniq_ratio >= 0.45)
 
-def analyze_helpfulness(text: str):
-    inputs = help_tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,
-        padding=True,
-        max_length=256,
-    ).to(help_device)
-
-    with torch.no_grad():
-        outputs = help_model(**inputs)
-        logits = outputs.logits
-        probs = torch.softmax(logits, dim=-1)[0].cpu().tolist()
-
+def _helpfulness_from_probs(text: str, probs, polarity):
     best_index = int(max(range(len(probs)), key=lambda i: probs[i]))
     best_score = float(probs[best_index])
 
-    HELP_LABELS = ["helpful", "creative", "unhelpful"]
     raw_label = HELP_LABELS[best_index]
     final_label = raw_label
 
     if raw_label == "creative" and best_score < 0.60:
         final_label = "helpful"
 
-    polarity = analyze_polarity(text)          
     sentiment_label = polarity["label"]        # "Positive" / "Negative"
     sentiment_pct = polarity["score"] * 100.0  # 0–1 → yüzdeye çevirme
 
@@ -112,9 +142,101 @@ def analyze_helpfulness(text: str):
     }
 
 
-def analyze_text_full(text: str):
-    
+def analyze_helpfulness(text: str, polarity=None):
+    """
+    polarity: analyze_polarity(text) sonucu; verilirse tekrar hesaplanmaz.
+    """
+    help_tokenizer, help_model = registry.get("helpfulness")
+    inputs = help_tokenizer(
+        text,
+        return_tensors="pt",
+        truncation=True,
+        padding=True,
+        max_length=256,
+    ).to(help_device)
+
+    with torch.no_grad():
+        outputs = help_model(**inputs)
+        logits = outputs.logits
+        probs = torch.softmax(logits.float(), dim=-1)[0].cpu().tolist()
+
+    if polarity is None:
+        polarity = analyze_polarity(text)
+
+    return _helpfulness_from_probs(text, probs, polarity)
+
+
+# ---------------- SHARED ENCODER (tek forward pass) ---------------- #
+
+# Optional: a BertForSentimentAndHelpfulness checkpoint (see train_shared_head.py)
+# serving both heads from one encoder pass.
+SHARED_MODEL_DIR = os.environ.get("SHARED_ENCODER_MODEL_DIR")
+
+def _load_shared():
+    print("Initializing shared sentiment/helpfulness encoder from:", SHARED_MODEL_DIR)
+    shared_tokenizer = AutoTokenizer.from_pretrained(SHARED_MODEL_DIR)
+    shared_model = BertForSentimentAndHelpfulness.from_pretrained(
+        SHARED_MODEL_DIR
+    ).to(help_device)
+    shared_model.eval()
+    shared_model = quantize_model(shared_model, args.quantization)
+    return shared_tokenizer, shared_model
+
+
+if SHARED_MODEL_DIR:
+    registry.register("shared", _load_shared)
+
+
+def analyze_text_shared(text: str):
+    shared_tokenizer, shared_model = registry.get("shared")
+    inputs = shared_tokenizer(
+        text,
+        return_tensors="pt",
+        truncation=True,
+        max_length=256,
+    ).to(help_device)
+
+    with torch.no_grad():
+        sentiment_logit, help_logits = shared_model(
+            input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"]
+        )
+        positive_probability = torch.sigmoid(sentiment_logit.float().squeeze(-1))[0].item()
+        probs = torch.softmax(help_logits.float(), dim=-1)[0].cpu().tolist()
+
+    label, percentage = Analyzer._to_sentiment(positive_probability)
+    polarity = {"label": label, "score": percentage / 100.0}
     return {
-        "sentiment": analyze_polarity(text),
-        "helpfulness": analyze_helpfulness(text),
+        "sentiment": polarity,
+        "helpfulness": _helpfulness_from_probs(text, probs, polarity),
     }
+
+
+# Full sentiment + helpfulness results, invalidated when any of the models changes.
+full_result_cache = ResultCache(
+    model_fingerprint(
+        SHARED_MODEL_DIR or args.model_name_or_path,
+        args.backend,
+        args.quantization,
+        model_fingerprint(HELPFUL_MODEL_DIR, HELPFULNESS_QUANTIZATION),
+    ),
+    max_entries=FULL_RESULT_CACHE_SIZE,
+    ttl_seconds=args.result_cache_ttl,
+    disk_path=args.result_cache_path,
+)
+
+
+def _analyze_text_full(text: str):
+    if SHARED_MODEL_DIR:
+        return analyze_text_shared(text)
+
+    polarity = analyze_polarity(text)
+    return {
+        "sentiment": polarity,
+        "helpfulness": analyze_helpfulness(text, polarity=polarity),
+    }
+
+
+def analyze_text_full(text: str):
+    if FULL_RESULT_CACHE_SIZE <= 0:
+        return _analyze_text_full(text)
+    return full_result_cache.get_or_compute(text, _analyze_text_full)
@@ -25,6 +25,92 @@ parser.add_argument(
     default=1,
     help="Number of threads for collecting the datasets.",
 )
+parser.add_argument(
+    "--precision",
+    type=str,
+    default="fp32",
+    choices=["fp32", "bf16"],
+    help="Training precision; bf16 runs the forward pass under autocast (CPU or GPU).",
+)
+parser.add_argument(
+    "--grad_accum_steps",
+    type=int,
+    default=1,
+    help="Number of batches whose gradients are accumulated before each optimizer step.",
+)
+parser.add_argument(
+    "--log_every",
+    type=int,
+    default=50,
+    help="Log samples per second and step time every this many optimizer steps.",
+)
+parser.add_argument(
+    "--dist_backend",
+    type=str,
+    default="gloo",
+    help="torch.distributed backend when launched with torchrun (gloo for CPU processes).",
+)
+parser.add_argument(
+    "--token_store_dir",
+    type=str,
+    default=None,
+    help="Directory with train/ and dev/ token stores written by pretokenize.py; skips tokenization while training.",
+)
+parser.add_argument(
+    "--bucket_batches",
+    action="store_true",
+    help="Batch examples of similar length and pad each batch only to its longest example.",
+)
+parser.add_argument(
+    "--max_batch_size",
+    type=int,
+    default=16,
+    help="Maximum number of concurrent requests batched into one forward pass when serving.",
+)
+parser.add_argument(
+    "--batch_wait_ms",
+    type=float,
+    default=5.0,
+    help="How long the first request of a batch waits for others to join when serving.",
+)
+parser.add_argument(
+    "--quantization",
+    type=str,
+    default="none",
+    choices=["none", "int8", "bf16"],
+    help="Inference precision of the sentiment model: fp32 (none), dynamic int8 Linear layers, or bf16.",
+)
+parser.add_argument(
+    "--backend",
+    type=str,
+    default="torch",
+    choices=["torch", "onnx"],
+    help="Inference backend of the sentiment model; onnx expects a directory written by export_onnx.py.",
+)
+parser.add_argument(
+    "--result_cache_size",
+    type=int,
+    default=0,
+    help="How many sentiment results to keep in memory for repeated texts (0, the default, disables the cache).",
+)
+parser.add_argument(
+    "--result_cache_ttl",
+    type=float,
+    default=None,
+    help="Seconds after which a cached sentiment result is recomputed.",
+)
+parser.add_argument(
+    "--result_cache_path",
+    type=str,
+    default=None,
+    help="Optional SQLite file that shares cached sentiment results between processes.",
+)
+parser.add_argument(
+    "--input_file",
+    type=str,
+    default=None,
+    help="Text file with one input per line to analyze in batches instead of reading from stdin.",
+)
 parser.add_argument(
     "--output_dir",
     type=str,
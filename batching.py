@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from queue import Empty, Queue
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent requests into batches and runs them with one call.
+
+    `batch_fn` receives a list of items and must return a list of results
+    in the same order. A batch is dispatched as soon as `max_batch_size`
+    items are waiting or the oldest item has waited `max_wait_ms`.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._start_lock = threading.Lock()
+        self._start()
+
+    def _start(self):
+        self._pid = os.getpid()
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._num_requests = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+        self._worker.start()
+
+    # Submits one item and blocks until its result is available.
+    def submit(self, item, timeout=None):
+        return self.submit_async(item).result(timeout=timeout)
+
+    # Submits one item and returns a future for its result.
+    def submit_async(self, item):
+        if self._stopped.is_set():
+            raise RuntimeError("MicroBatcher has been closed.")
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    # Threads do not survive fork(): a forked process (e.g. a pre-forked server worker)
+    # starts its own worker on its first request; children that never submit start none.
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self._start()
+
+    # Stops the worker thread once the queued requests have been served.
+    def close(self):
+        self._stopped.set()
+        self._worker.join()
+
+    # Returns queue depth, batch size histogram and per-request wait times.
+    def stats(self):
+        with self._lock:
+            num_requests = self._num_requests
+            return {
+                "queue_depth": self._queue.qsize(),
+                "requests": num_requests,
+                "batches": sum(self._batch_sizes.values()),
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "avg_wait_ms": (
+                    1000.0 * self._total_wait / num_requests if num_requests else 0.0
+                ),
+                "max_wait_ms": 1000.0 * self._max_wait_seen,
+            }
+
+    def _collect(self):
+        try:
+            first = self._queue.get(timeout=0.1)
+        except Empty:
+            return []
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            waits = [started - enqueued for _, _, enqueued in batch]
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._num_requests += len(batch)
+                self._total_wait += sum(waits)
+                self._max_wait_seen = max(self._max_wait_seen, max(waits))
+
+            try:
+                results = self._call([item for item, _, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # One bad input must not fail the whole batch: retry each item on its own.
+                for item, future, _ in batch:
+                    try:
+                        future.set_result(self._call([item])[0])
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _call(self, items):
+        results = self.batch_fn(items)
+        if len(results) != len(items):
+            raise RuntimeError(f"batch_fn returned {len(results)} results for {len(items)} items.")
+        return results
@@ -0,0 +1,101 @@
+# benchmarks/bench_exclusion_filter.py
+#
+# Compares the old linear exclusion-rect scan with RectIndex on figure-heavy pages.
+# Run from the repository root:
+#   python -m benchmarks.bench_exclusion_filter --pdf paper.pdf
+# Without --pdf, random pages with --drawings figure rects are generated.
+import argparse
+import random
+import time
+
+import fitz
+
+from app.core.pdf_parser import MIN_FIGURE_SIZE
+from app.core.spatial import RectIndex
+
+
+def page_inputs_from_pdf(path):
+    with fitz.open(path) as doc:
+        for page in doc:
+            rects = []
+            for img in page.get_images():
+                rects.extend(page.get_image_rects(img[0]))
+            for draw in page.get_drawings():
+                r = draw["rect"]
+                if r.width > MIN_FIGURE_SIZE and r.height > MIN_FIGURE_SIZE:
+                    rects.append(r)
+            rects = [r for r in rects if not (r.is_empty or r.is_infinite)]
+            blocks = [b[:4] for b in page.get_text("blocks")]
+            yield [tuple(r) for r in rects], blocks
+
+
+def synthetic_inputs(num_pages, num_drawings, num_blocks, seed=0):
+    rng = random.Random(seed)
+    for _ in range(num_pages):
+        # Charts: many small nested paths inside a few figure frames.
+        frames = [(rng.uniform(0, 400), rng.uniform(0, 600)) for _ in range(4)]
+        rects = []
+        for _ in range(num_drawings):
+            fx, fy = rng.choice(frames)
+            x, y = fx + rng.uniform(0, 100), fy + rng.uniform(0, 100)
+            rects.append((x, y, x + rng.uniform(51, 90), y + rng.uniform(51, 90)))
+        rects.extend((fx, fy, fx + 200, fy + 200) for fx, fy in frames)
+        blocks = []
+        for _ in range(num_blocks):
+            x, y = rng.uniform(0, 500), rng.uniform(0, 780)
+            blocks.append((x, y, x + rng.uniform(50, 300), y + rng.uniform(8, 40)))
+        yield rects, blocks
+
+
+def linear_scan(rects, blocks):
+    # Mirrors the previous per-block loop in pdf_parser.
+    rects = [fitz.Rect(r) for r in rects]
+    kept = []
+    for b in blocks:
+        b_rect = fitz.Rect(b)
+        if not any(b_rect.intersects(r) for r in rects):
+            kept.append(b)
+    return kept
+
+
+def indexed(rects, blocks):
+    index = RectIndex(rects)
+    return [b for b in blocks if not index.intersects(b)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdf", default=None)
+    ap.add_argument("--pages", type=int, default=20)
+    ap.add_argument("--drawings", type=int, default=2000)
+    ap.add_argument("--blocks", type=int, default=60)
+    args = ap.parse_args()
+
+    if args.pdf:
+        pages = list(page_inputs_from_pdf(args.pdf))
+    else:
+        pages = list(synthetic_inputs(args.pages, args.drawings, args.blocks))
+
+    totals = {"linear": 0.0, "indexed": 0.0}
+    for page_num, (rects, blocks) in enumerate(pages, start=1):
+        timings = {}
+        results = {}
+        for name, fn in (("linear", linear_scan), ("indexed", indexed)):
+            start = time.perf_counter()
+            results[name] = fn(rects, blocks)
+            timings[name] = 1000 * (time.perf_counter() - start)
+            totals[name] += timings[name]
+        assert results["linear"] == results["indexed"], f"Mismatch on page {page_num}"
+        print(
+            f"page {page_num:3d}: {len(rects):5d} rects, {len(blocks):4d} blocks  "
+            f"linear {timings['linear']:8.2f} ms  indexed {timings['indexed']:8.2f} ms"
+        )
+
+    print(
+        f"total: linear {totals['linear']:.1f} ms, indexed {totals['indexed']:.1f} ms, "
+        f"speedup x{totals['linear'] / max(totals['indexed'], 1e-9):.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_onnx_backend.py
+#
+# Sentiment throughput of the PyTorch model against its ONNX Runtime export.
+# Export first, then run from the repository root:
+#   python export_onnx.py --model_name_or_path barissayil/bert-sentiment-analysis-sst --output_dir models/sst_onnx
+#   python -m benchmarks.bench_onnx_backend --torch_model barissayil/bert-sentiment-analysis-sst --onnx_model models/sst_onnx
+import argparse
+import time
+
+import pandas as pd
+import torch
+
+from analyzer import Analyzer
+
+
+def load_texts(path, count):
+    texts = pd.read_csv(path, delimiter="\t")["sentence"].astype(str).tolist()
+    return (texts * (count // len(texts) + 1))[:count]
+
+
+def throughput(analyzer, texts, batch_size):
+    list(analyzer.classify_sentiment_batch(texts[:batch_size], batch_size=batch_size))  # warm-up
+    start = time.perf_counter()
+    results = list(analyzer.classify_sentiment_batch(texts, batch_size=batch_size))
+    return len(texts) / (time.perf_counter() - start), results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--torch_model", default="barissayil/bert-sentiment-analysis-sst")
+    ap.add_argument("--onnx_model", required=True)
+    ap.add_argument("--texts", default="data/dev.tsv")
+    ap.add_argument("--count", type=int, default=512)
+    ap.add_argument("--batch_sizes", default="1,8,32")
+    ap.add_argument("--threads", type=int, default=None)
+    opts = ap.parse_args()
+
+    if opts.threads:
+        torch.set_num_threads(opts.threads)
+    texts = load_texts(opts.texts, opts.count)
+    analyzers = {
+        "torch": Analyzer(False, argparse.Namespace(model_name_or_path=opts.torch_model, output_dir=None)),
+        "onnx": Analyzer(
+            False, argparse.Namespace(model_name_or_path=opts.onnx_model, output_dir=None, backend="onnx")
+        ),
+    }
+
+    for batch_size in [int(b) for b in opts.batch_sizes.split(",")]:
+        outputs = {}
+        for name, analyzer in analyzers.items():
+            texts_per_sec, outputs[name] = throughput(analyzer, texts, batch_size)
+            print(f"batch {batch_size:3d}  {name:5s} {texts_per_sec:9.1f} texts/s")
+        labels_agree = sum(a[0] == b[0] for a, b in zip(outputs["torch"], outputs["onnx"]))
+        print(f"batch {batch_size:3d}  label agreement {labels_agree / len(texts):.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_pdf_extraction.py
+#
+# Measures extract_text_from_bytes as the number of worker processes grows.
+# Run from the repository root:
+#   python -m benchmarks.bench_pdf_extraction --pdf paper.pdf --workers 1,2,4,8
+# Without --pdf a synthetic document of --pages pages is generated.
+import argparse
+import time
+
+import fitz
+
+from app.core import pdf_parser
+
+LOREM = (
+    "Transformer models process every token of a sequence in parallel and "
+    "rely on self-attention to combine informa-\ntion across positions. "
+)
+
+
+def synthetic_pdf(num_pages):
+    with fitz.open() as doc:
+        for i in range(num_pages):
+            page = doc.new_page()
+            for row in range(40):
+                page.insert_text((50, 50 + 18 * row), f"{i}.{row} " + LOREM[:90], fontsize=9)
+            page.draw_rect(fitz.Rect(300, 600, 500, 750))
+        return doc.tobytes()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdf", default=None)
+    ap.add_argument("--pages", type=int, default=300)
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.pdf:
+        with open(args.pdf, "rb") as f:
+            pdf_bytes = f.read()
+    else:
+        pdf_bytes = synthetic_pdf(args.pages)
+
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    pdf_parser.PDF_WORKERS = max(worker_counts)
+
+    baseline, reference = None, None
+    for workers in worker_counts:
+        best = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            text = pdf_parser.extract_text_from_bytes(pdf_bytes, workers=workers)
+            best = min(best, time.perf_counter() - start)
+        if reference is None:
+            baseline, reference = best, text
+        assert text == reference, "Output differs from the single-process result"
+        print(f"workers={workers:2d}  {best:7.3f} s  speedup x{baseline / best:4.2f}")
+
+
+if __name__ == "__main__":
+    main()
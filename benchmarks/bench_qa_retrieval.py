@@ -0,0 +1,87 @@
+# benchmarks/bench_qa_retrieval.py
+#
+# Recall/latency comparison of retrieval-first QA against the exhaustive scan.
+# SQuAD articles are concatenated into long documents so the reader has to search.
+# Needs the `datasets` package. Run from the repository root:
+#   python -m benchmarks.bench_qa_retrieval --top_k 3,5,10 --max_questions 100
+import argparse
+import random
+import statistics
+import time
+
+from datasets import load_dataset
+
+from app.qa_module import services
+
+
+def build_documents(num_articles, seed):
+    squad = load_dataset("squad", split="validation")
+    articles = {}
+    for row in squad:
+        articles.setdefault(row["title"], []).append(row)
+
+    rng = random.Random(seed)
+    titles = sorted(articles)
+    rng.shuffle(titles)
+
+    documents = []
+    for title in titles[:num_articles]:
+        context_offsets = {}
+        parts = []
+        offset = 0
+        for row in articles[title]:
+            if row["context"] not in context_offsets:
+                context_offsets[row["context"]] = offset
+                parts.append(row["context"])
+                offset += len(row["context"]) + 2
+        text = "\n\n".join(parts)
+        questions = []
+        for row in articles[title]:
+            start = context_offsets[row["context"]] + row["answers"]["answer_start"][0]
+            answer = row["answers"]["text"][0]
+            questions.append((row["question"], start, start + len(answer), answer))
+        documents.append((text, questions))
+    return documents
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top_k", default="3,5,10")
+    ap.add_argument("--articles", type=int, default=5)
+    ap.add_argument("--max_questions", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    documents = build_documents(args.articles, args.seed)
+    per_doc = max(1, args.max_questions // len(documents))
+    settings = [0] + [int(k) for k in args.top_k.split(",")]
+
+    results = {k: {"latency": [], "recall": 0, "found": 0} for k in settings}
+    total = 0
+    for text, questions in documents:
+        services.get_passage_index(text)  # built once per document, as in serving
+        for question, start, end, answer in questions[:per_doc]:
+            total += 1
+            for k in settings:
+                if k > 0:
+                    spans = services.retrieve_chunks(question, text, k)
+                    results[k]["recall"] += any(s <= start and end <= s + len(t) for s, t in spans)
+                else:
+                    results[k]["recall"] += 1
+                t0 = time.perf_counter()
+                prediction = services.find_answer_in_text(question, text, top_k_passages=k)["answer"]
+                results[k]["latency"].append(time.perf_counter() - t0)
+                results[k]["found"] += answer.lower() in prediction.lower()
+
+    print(f"\n{total} questions over {len(documents)} documents")
+    for k in settings:
+        r = results[k]
+        name = "exhaustive" if k == 0 else f"top-{k}"
+        print(
+            f"{name:12s} recall {r['recall'] / total:6.1%}   answer found {r['found'] / total:6.1%}   "
+            f"mean latency {statistics.mean(r['latency']):7.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
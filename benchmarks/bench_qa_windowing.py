@@ -0,0 +1,110 @@
+# benchmarks/bench_qa_windowing.py
+#
+# Windows per document and answer accuracy of the token-aware windowing against the old
+# scheme (75,000-char chunks with 20% overlap, 256-token window overlap, 200-token answers,
+# scores summed per text). Strides below --max_answer_len are skipped: answers could fall between windows.
+# SQuAD articles are concatenated into long documents, as in bench_qa_retrieval.
+# --model takes a hub ID or a local directory. Needs the `datasets` package. Run from the repository root:
+#   python -m benchmarks.bench_qa_windowing --strides 48,64,128,256 --max_answer_len 48 --max_questions 100
+import argparse
+import statistics
+import time
+
+from transformers import pipeline
+
+from app.qa_module.services import EXTRACTIVE_MODEL_NAME, MAX_ANSWER_LEN, MAX_SEQ_LEN
+from app.qa_module.session import DocumentReader
+from benchmarks.bench_qa_retrieval import build_documents
+
+LEGACY_CHUNK_CHARS = 75000
+LEGACY_DOC_STRIDE = 256
+LEGACY_MAX_ANSWER_LEN = 200
+
+
+def legacy_chunks(context):
+    overlap = int(LEGACY_CHUNK_CHARS * 0.2)
+    chunks, start = [], 0
+    while True:
+        end = min(start + LEGACY_CHUNK_CHARS, len(context))
+        chunks.append((start, context[start:end]))
+        if end == len(context):
+            return chunks
+        start = end - overlap
+
+
+def join_documents(documents, articles_per_doc):
+    joined = []
+    for i in range(0, len(documents), articles_per_doc):
+        parts, questions, offset = [], [], 0
+        for text, qs in documents[i : i + articles_per_doc]:
+            parts.append(text)
+            questions.extend((q, s + offset, e + offset, a) for q, s, e, a in qs)
+            offset += len(text) + 2
+        joined.append(("\n\n".join(parts), questions))
+    return joined
+
+
+def best_span(reader, question, chunks, max_answer_len):
+    candidates = []
+    for chunk_start, chunk_text in chunks:
+        for a in reader.answer(question, chunk_text, top_k=3, max_answer_len=max_answer_len):
+            candidates.append((a["score"], a["start"] + chunk_start, a["end"] + chunk_start, a["answer"]))
+    candidates.sort(reverse=True)
+    if not candidates or candidates[0][0] < 0.01 or not candidates[0][3]:
+        return None
+    return candidates[0][1:3]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--strides", default="48,64,128,256")
+    ap.add_argument("--max_answer_len", type=int, default=MAX_ANSWER_LEN)
+    ap.add_argument("--model", default=EXTRACTIVE_MODEL_NAME)
+    ap.add_argument("--articles", type=int, default=8)
+    ap.add_argument("--articles_per_doc", type=int, default=4)
+    ap.add_argument("--max_questions", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    documents = join_documents(build_documents(args.articles, args.seed), args.articles_per_doc)
+    per_doc = max(1, args.max_questions // len(documents))
+    qa = pipeline("question-answering", model=args.model, device=-1)
+
+    # name -> (reader, max_answer_len)
+    schemes = {
+        "legacy": (DocumentReader(qa.model, qa.tokenizer, MAX_SEQ_LEN, LEGACY_DOC_STRIDE), LEGACY_MAX_ANSWER_LEN)
+    }
+    for stride in (int(s) for s in args.strides.split(",")):
+        if stride < args.max_answer_len:
+            print(f"Skipping stride {stride}: below --max_answer_len ({args.max_answer_len}).")
+            continue
+        schemes[f"token stride={stride}"] = (
+            DocumentReader(qa.model, qa.tokenizer, MAX_SEQ_LEN, stride, dedupe_spans=True), args.max_answer_len
+        )
+
+    results = {name: {"windows": 0, "found": 0, "latency": []} for name in schemes}
+    total = 0
+    for text, questions in documents:
+        for name, (reader, _) in schemes.items():
+            chunks = legacy_chunks(text) if name == "legacy" else [(0, text)]
+            results[name]["windows"] += sum(len(reader.session(t).windows) for _, t in chunks)
+        for question, start, end, _ in questions[:per_doc]:
+            total += 1
+            for name, (reader, max_answer_len) in schemes.items():
+                chunks = legacy_chunks(text) if name == "legacy" else [(0, text)]
+                t0 = time.perf_counter()
+                span = best_span(reader, question, chunks, max_answer_len)
+                results[name]["latency"].append(time.perf_counter() - t0)
+                results[name]["found"] += span is not None and span[0] < end and start < span[1]
+
+    print(f"\n{total} questions over {len(documents)} documents "
+          f"(mean {statistics.mean(len(t) for t, _ in documents):,.0f} chars)")
+    for name, r in results.items():
+        print(
+            f"{name:18s} windows/doc {r['windows'] / len(documents):7.1f}   "
+            f"answer found {r['found'] / total:6.1%}   mean latency {statistics.mean(r['latency']):7.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_quantization.py
+#
+# Accuracy and latency of each model at every quantization mode, so each one
+# can be accepted or rejected on its own (SENTIMENT_/HELPFULNESS_/QA_QUANTIZATION).
+# Run from the repository root:
+#   python -m benchmarks.bench_quantization --models sentiment --model_name_or_path models/sst_bert
+#   python -m benchmarks.bench_quantization --models helpfulness --helpful_model_dir models/helpful_distil --helpful_valid valid.csv
+#   python -m benchmarks.bench_quantization --models qa --qa_questions 100   (needs `datasets`)
+import argparse
+import copy
+import statistics
+import time
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from quantization import QUANTIZATION_MODES, quantize_model
+
+
+def report(model_name, mode, accuracy, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(
+        f"{model_name:12s} {mode:5s} accuracy {accuracy:6.2%}   "
+        f"mean {1000 * statistics.mean(latencies):8.2f} ms   p95 {1000 * p95:8.2f} ms"
+    )
+
+
+def bench_sentiment(opts, modes):
+    from analyzer import Analyzer
+    from dataset import SSTDataset
+
+    for mode in modes:
+        args = argparse.Namespace(
+            model_name_or_path=opts.model_name_or_path, output_dir=None, quantization=mode
+        )
+        analyzer = Analyzer(will_train=False, args=args)
+        val_set = SSTDataset(filename=opts.sst_dev, maxlen=64, tokenizer=analyzer.tokenizer)
+        val_loader = DataLoader(dataset=val_set, batch_size=32)
+        accuracy, _ = analyzer.evaluate(val_loader=val_loader, criterion=nn.BCEWithLogitsLoss())
+
+        latencies = []
+        for text in val_set.df["sentence"][: opts.latency_samples]:
+            start = time.perf_counter()
+            analyzer.classify_sentiment(text)
+            latencies.append(time.perf_counter() - start)
+        report("sentiment", mode, accuracy, latencies)
+
+
+def bench_helpfulness(opts, modes):
+    from helpfulness_dataset import HelpfulnessDataset
+
+    tokenizer = AutoTokenizer.from_pretrained(opts.helpful_model_dir)
+    base = AutoModelForSequenceClassification.from_pretrained(opts.helpful_model_dir).eval()
+    valid = HelpfulnessDataset(opts.helpful_valid, tokenizer)
+
+    for mode in modes:
+        model = quantize_model(copy.deepcopy(base), mode)
+        correct, latencies = 0, []
+        with torch.no_grad():
+            for text, label in zip(valid.texts, valid.labels):
+                inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=256)
+                start = time.perf_counter()
+                logits = model(**inputs).logits.float()
+                latencies.append(time.perf_counter() - start)
+                correct += int(logits.argmax(-1).item() == label)
+        report("helpfulness", mode, correct / len(valid.texts), latencies)
+
+
+def bench_qa(opts, modes):
+    from datasets import load_dataset
+    from transformers import pipeline
+
+    from app.qa_module.services import DOC_STRIDE, EXTRACTIVE_MODEL_NAME, MAX_SEQ_LEN
+    from app.qa_module.session import DocumentReader
+
+    squad = load_dataset("squad", split="validation").select(range(opts.qa_questions))
+    qa = pipeline("question-answering", model=EXTRACTIVE_MODEL_NAME, device=-1)
+
+    for mode in modes:
+        model = quantize_model(copy.deepcopy(qa.model), mode)
+        reader = DocumentReader(model, qa.tokenizer, max_seq_len=MAX_SEQ_LEN, doc_stride=DOC_STRIDE)
+        found, latencies = 0, []
+        for row in squad:
+            start = time.perf_counter()
+            best = reader.answer(row["question"], row["context"], top_k=1)[0]
+            latencies.append(time.perf_counter() - start)
+            found += any(a.lower() in best["answer"].lower() for a in row["answers"]["text"])
+        report("qa", mode, found / len(squad), latencies)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", default="sentiment,helpfulness,qa")
+    ap.add_argument("--modes", default=",".join(QUANTIZATION_MODES))
+    ap.add_argument("--threads", type=int, default=None)
+    ap.add_argument("--model_name_or_path", default="bert-base-uncased")
+    ap.add_argument("--sst_dev", default="data/dev.tsv")
+    ap.add_argument("--latency_samples", type=int, default=200)
+    ap.add_argument("--helpful_model_dir", default="models/helpful_distil")
+    ap.add_argument("--helpful_valid", default="valid.csv")
+    ap.add_argument("--qa_questions", type=int, default=100)
+    opts = ap.parse_args()
+
+    if opts.threads:
+        torch.set_num_threads(opts.threads)
+    modes = opts.modes.split(",")
+    benches = {"sentiment": bench_sentiment, "helpfulness": bench_helpfulness, "qa": bench_qa}
+    for name in opts.models.split(","):
+        benches[name](opts, modes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_sentiment_service.py
+#
+# Compares the latency of analyze_text_full before and after polarity reuse.
+# Run from the repository root:
+#   python -m benchmarks.bench_sentiment_service --repeats 50
+#   SHARED_ENCODER_MODEL_DIR=models/shared_head python -m benchmarks.bench_sentiment_service
+import argparse
+import statistics
+import time
+
+from app.sentiment_module import service
+
+TEXTS = [
+    "Great product, works exactly as described and arrived on time.",
+    "Terrible. Broke after two days and support never answered.",
+    "Imagine a lighthouse on a stormy sea: this blender is that reliable, for example with ice.",
+    "ok",
+]
+
+
+def analyze_text_legacy(text):
+    # Previous behaviour: analyze_helpfulness recomputed polarity on its own.
+    return {
+        "sentiment": service.analyze_polarity(text),
+        "helpfulness": service.analyze_helpfulness(text),
+    }
+
+
+def timeit(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        for text in TEXTS:
+            start = time.perf_counter()
+            fn(text)
+            timings.append(1000.0 * (time.perf_counter() - start))
+    return timings
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeats", type=int, default=20)
+    args = ap.parse_args()
+
+    # Measure the models, not the result cache.
+    service.FULL_RESULT_CACHE_SIZE = 0
+
+    for text in TEXTS:
+        analyze_text_legacy(text)
+        service.analyze_text_full(text)
+
+    paths = [("legacy (3 passes)", analyze_text_legacy)]
+    if service.SHARED_MODEL_DIR:
+        paths.append(("shared encoder (1 pass)", service.analyze_text_full))
+    else:
+        paths.append(("polarity reused (2 passes)", service.analyze_text_full))
+
+    for name, fn in paths:
+        timings = sorted(timeit(fn, args.repeats))
+        p95 = timings[int(0.95 * (len(timings) - 1))]
+        print(f"{name:28s} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
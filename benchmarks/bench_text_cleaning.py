@@ -0,0 +1,103 @@
+# benchmarks/bench_text_cleaning.py
+#
+# Micro-benchmark of block cleaning: the previous per-block re.sub chain against TextCleaner.
+# The input is a stored corpus of raw block strings (a JSON list of pages, each a list of blocks),
+# so runs are repeatable without parsing PDFs. Run from the repository root:
+#   python -m benchmarks.bench_text_cleaning --pdf paper.pdf --save_corpus blocks.json
+#   python -m benchmarks.bench_text_cleaning --corpus blocks.json --repeat 20
+# Without --corpus or --pdf, a synthetic corpus of --pages pages is generated.
+import argparse
+import json
+import random
+import re
+import time
+
+from app.core.text_cleaning import TextCleaner
+
+
+def corpus_from_pdf(path):
+    import fitz
+
+    with fitz.open(path) as doc:
+        return [[b[4] for b in page.get_text("blocks", sort=True)] for page in doc]
+
+
+def synthetic_corpus(num_pages, blocks_per_page, seed=0):
+    rng = random.Random(seed)
+    words = ["model", "extrac-\ntion", "data", "the", "of", "results", "Table", "3.5", "network", "and"]
+    pages = []
+    for page_num in range(1, num_pages + 1):
+        blocks = [str(page_num)]
+        for _ in range(blocks_per_page):
+            lines = [" ".join(rng.choice(words) for _ in range(rng.randint(4, 12))) for _ in range(rng.randint(1, 8))]
+            blocks.append("\n".join(lines) + "\n")
+        blocks.append(f"Figure {page_num}: an example caption\n")
+        pages.append(blocks)
+    return pages
+
+
+def legacy_clean(blocks):
+    # Mirrors the previous loop in pdf_parser._extract_pages, patterns rebuilt per call.
+    exclude_patterns = [
+        re.compile(r'arXiv:\d+\.\d+v\d+', re.IGNORECASE),
+        re.compile(r'^\d+$'),
+        re.compile(r'^(Figure|Fig\.|Table|Tab\.)\s*\d+', re.IGNORECASE)
+    ]
+    kept = []
+    for text_content in blocks:
+        text_content = re.sub(r'-\s*\n\s*', '', text_content)
+        text_content = re.sub(r'([a-z])\s*\n\s*([a-z])', r'\1 \2', text_content)
+        text_content = re.sub(r'\s+', ' ', text_content).strip()
+        if any(p.search(text_content) for p in exclude_patterns):
+            continue
+        if len(text_content) < 3:
+            continue
+        kept.append(text_content)
+    return kept
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default=None)
+    ap.add_argument("--pdf", default=None)
+    ap.add_argument("--save_corpus", default=None)
+    ap.add_argument("--pages", type=int, default=500)
+    ap.add_argument("--blocks", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            pages = json.load(f)
+    elif args.pdf:
+        pages = corpus_from_pdf(args.pdf)
+    else:
+        pages = synthetic_corpus(args.pages, args.blocks)
+    if args.save_corpus:
+        with open(args.save_corpus, "w", encoding="utf-8") as f:
+            json.dump(pages, f)
+
+    cleaner = TextCleaner()
+    for blocks in pages:
+        assert cleaner.clean_blocks(blocks) == legacy_clean(blocks), "TextCleaner output differs"
+
+    num_blocks = sum(len(blocks) for blocks in pages)
+    fast_path = sum(not ("\n" in b and "-" in b) for blocks in pages for b in blocks)
+    print(f"{len(pages)} pages, {num_blocks} blocks ({fast_path / max(num_blocks, 1):.0%} on the fast path)")
+
+    timings = {}
+    for name, fn in (("legacy", legacy_clean), ("cleaner", cleaner.clean_blocks)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for blocks in pages:
+                fn(blocks)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(f"{name:8s} {1000 * best:8.1f} ms   {1e6 * best / max(num_blocks, 1):6.2f} us/block")
+
+    print(f"speedup x{timings['legacy'] / max(timings['cleaner'], 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
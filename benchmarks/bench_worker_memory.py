@@ -0,0 +1,100 @@
+# benchmarks/bench_worker_memory.py
+#
+# Resident memory of a gunicorn deployment against its worker count, with models
+# loaded once in the master (prefork) or separately in every worker (background).
+# Linux only (reads /proc). Run from the repository root:
+#   python -m benchmarks.bench_worker_memory --workers 1,2,4
+#   python -m benchmarks.bench_worker_memory --app server:app --worker_class sync --ready_path "/?text=good"
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(c) for c in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_kb(pid):
+    # Rss counts shared pages in every process; Pss splits them between the sharers.
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ("Rss:", "Pss:"):
+                    values[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        pass
+    return values.get("Rss", 0), values.get("Pss", 0)
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as r:
+                if r.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(1)
+    return False
+
+
+def measure(args, mode, workers):
+    env = dict(os.environ, MODEL_LOADING=mode, WEB_CONCURRENCY=str(workers),
+               WORKER_CLASS=args.worker_class, BIND=f"127.0.0.1:{args.port}")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", args.app],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{args.port}{args.ready_path}"
+        # Each worker must have its models loaded, so hit it a few times per worker.
+        if not wait_ready(url, args.timeout):
+            return None
+        for _ in range(4 * workers):
+            wait_ready(url, args.timeout)
+        time.sleep(2)
+
+        pids = [proc.pid] + children(proc.pid)
+        usage = [memory_kb(pid) for pid in pids]
+        return sum(r for r, _ in usage) / 1024, sum(p for _, p in usage) / 1024
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app.main:app")
+    ap.add_argument("--worker_class", default="uvicorn.workers.UvicornWorker")
+    ap.add_argument("--ready_path", default="/ready")
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--modes", default="prefork,background")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--timeout", type=int, default=600)
+    args = ap.parse_args()
+
+    print(f"{'mode':8s} {'workers':>7s} {'sum RSS MB':>11s} {'sum PSS MB':>11s}")
+    for mode in args.modes.split(","):
+        for workers in (int(w) for w in args.workers.split(",")):
+            result = measure(args, mode, workers)
+            if result is None:
+                print(f"{mode:8s} {workers:7d}   did not become ready")
+                continue
+            rss, pss = result
+            print(f"{mode:8s} {workers:7d} {rss:11.0f} {pss:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,29 @@
 # create_dataset_helpfulness.py
 
 import argparse
+import os
 import random
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+from dedup import Deduplicator, MinHasher, text_hashes
+
 CREATIVE_HINT_WORDS = {
     "creative", "imaginative", "original", "novel", "innovative", "unique",
     "inventive", "fresh", "clever", "unusual", "surprising", "inspired", "insightful"
 }
 
+EXAMPLE_PHRASES = ["for example", "for instance", "e.g.", "such as", " like "]
+LIST_PHRASES = ["1.", "2.", "• ", "- ", "steps", "tip", "tips"]
+COLUMNS = ["Summary", "Text", "HelpfulnessNumerator", "HelpfulnessDenominator"]
+
+
 def clean(t: str) -> str:
     if not isinstance(t, str):
         return ""
@@ -34,6 +45,7 @@ def vote_label(num, den, min_votes, hi_thr, lo_thr):
             return "unhelpful"
     return None
 
+# Row-at-a-time reference versions of the rules; label_chunk applies the same rules to whole columns.
 def looks_creative(text: str) -> bool:
     
     if not text:
@@ -47,11 +59,119 @@ def looks_creative(text: str) -> bool:
     long_enough = len(tokens) >= 20
 
     has_hint = any(w in s for w in CREATIVE_HINT_WORDS)
-    has_examples = any(p in s for p in ["for example", "for instance", "e.g.", "such as", " like "])
-    has_listy = any(p in s for p in ["1.", "2.", "• ", "- ", "steps", "tip", "tips"])
+    has_examples = any(p in s for p in EXAMPLE_PHRASES)
+    has_listy = any(p in s for p in LIST_PHRASES)
 
     return has_hint or has_examples or has_listy or (long_enough and uniq_ratio >= 0.50)
 
+
+def _contains_any(s: pd.Series, phrases) -> pd.Series:
+    return s.str.contains("|".join(re.escape(p) for p in phrases), regex=True)
+
+
+def clean_series(s: pd.Series) -> pd.Series:
+    return s.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def looks_creative_series(text: pd.Series) -> pd.Series:
+    s = text.str.lower()
+    num_tokens = s.str.count(r"[a-z']+")
+    creative = _contains_any(s, CREATIVE_HINT_WORDS) | _contains_any(s, EXAMPLE_PHRASES) | _contains_any(s, LIST_PHRASES)
+
+    # The unique-token ratio needs the tokens themselves; only compute it where it can matter.
+    long_enough = ~creative & (num_tokens >= 20)
+    if long_enough.any():
+        uniq = s[long_enough].str.findall(r"[a-z']+").map(lambda t: len(set(t)))
+        creative.loc[long_enough] = (uniq / num_tokens[long_enough]) >= 0.50
+    return creative & (num_tokens > 0)
+
+
+def label_chunk(chunk: pd.DataFrame, min_votes, hi_thr, lo_thr) -> pd.DataFrame:
+    """
+    Builds the text column and labels one chunk of Reviews.csv with column operations.
+    Returns text, label and a 64-bit hash of the text (for de-duplication across chunks).
+    """
+    for col in ["HelpfulnessNumerator", "HelpfulnessDenominator"]:
+        if col not in chunk:
+            chunk[col] = 0
+    text = (
+        clean_series(chunk["Summary"].astype(str).fillna(""))
+        + ". "
+        + clean_series(chunk["Text"].astype(str).fillna(""))
+    ).str.strip()
+    num_words = text.str.count(r"\S+").to_numpy()
+
+    num = pd.to_numeric(chunk["HelpfulnessNumerator"], errors="coerce").to_numpy(dtype=float)
+    den = pd.to_numeric(chunk["HelpfulnessDenominator"], errors="coerce").to_numpy(dtype=float)
+    voted = (den >= min_votes) & (den > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.trunc(num) / np.trunc(den)
+    helpful = voted & (ratio >= hi_thr)
+    unhelpful = voted & ~helpful & (ratio <= lo_thr)
+
+    unlabeled = ~(helpful | unhelpful)
+    creative = np.zeros(len(text), dtype=bool)
+    if unlabeled.any():
+        creative[unlabeled] = looks_creative_series(text[unlabeled]).to_numpy()
+
+    label = np.select(
+        [helpful, unhelpful, creative, num_words < 12],
+        ["helpful", "unhelpful", "creative", "unhelpful"],
+        default="creative",
+    )
+    return pd.DataFrame({
+        "text": text.to_numpy(),
+        "label": label,
+        "num_words": num_words,
+        "hash": text_hashes(text),
+    })
+
+
+# Worker task: labels a chunk and, for near-duplicate detection, computes the LSH band keys
+# of the rows long enough to be kept (other rows get zeros and are dropped before the check).
+def process_chunk(chunk, min_votes, hi_thr, lo_thr, minhasher=None):
+    labeled = label_chunk(chunk, min_votes, hi_thr, lo_thr)
+    band_keys = None
+    if minhasher is not None:
+        band_keys = np.zeros((len(labeled), minhasher.bands), dtype=np.uint64)
+        long_enough = labeled["num_words"].to_numpy() >= 5
+        band_keys[long_enough] = minhasher.band_keys(labeled["text"].to_numpy()[long_enough])
+    return labeled, band_keys
+
+
+class ReservoirSampler:
+    """
+    Keeps a uniform random sample of at most k rows per label over a stream of chunks (Algorithm R).
+    """
+
+    def __init__(self, k, seed):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.samples = {}
+        self.seen = {}
+
+    def add(self, texts, labels):
+        for lbl in pd.unique(labels):
+            items = texts[labels == lbl]
+            sample = self.samples.setdefault(lbl, [])
+            seen = self.seen.get(lbl, 0)
+
+            fill = min(max(self.k - len(sample), 0), len(items))
+            sample.extend(items[:fill])
+            # Item number n (0-based) replaces a random slot with probability k / (n + 1).
+            positions = seen + np.arange(fill, len(items))
+            slots = np.floor(self.rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+            for item, slot in zip(items[fill:][slots < self.k], slots[slots < self.k]):
+                sample[slot] = item
+            self.seen[lbl] = seen + len(items)
+
+    def to_frame(self):
+        return pd.DataFrame(
+            [(text, lbl) for lbl, texts in self.samples.items() for text in texts],
+            columns=["text", "label"],
+        )
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--input", required=True, help="Path to Reviews.csv")
@@ -63,6 +183,12 @@ def main():
     ap.add_argument("--lo_thr", type=float, default=0.3)
     ap.add_argument("--max_per_class", type=int, default=2000, help="Cap per label for balance/speed")
     ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--chunksize", type=int, default=50000, help="Rows of Reviews.csv read at a time")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes labeling chunks")
+    ap.add_argument("--formats", default="csv,parquet", help="Output formats: csv, parquet or both")
+    ap.add_argument("--near_dup", action="store_true", help="Also drop near-duplicates (MinHash/LSH)")
+    ap.add_argument("--minhash_perm", type=int, default=64, help="MinHash permutations")
+    ap.add_argument("--lsh_bands", type=int, default=16, help="LSH bands (more bands: lower similarity threshold)")
     args = ap.parse_args()
 
     random.seed(args.seed)
@@ -70,42 +196,49 @@ def main():
     out = Path(args.outdir)
     out.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(args.input, encoding="utf-8", engine="python")
+    start = time.perf_counter()
+    reader = pd.read_csv(
+        args.input, encoding="utf-8", engine="c", chunksize=args.chunksize,
+        usecols=lambda c: c in COLUMNS,
+    )
+    sampler = ReservoirSampler(args.max_per_class, args.seed)
+    dedup = Deduplicator(near_dup=args.near_dup, bands=args.lsh_bands)
+    minhasher = MinHasher(args.minhash_perm, args.lsh_bands, seed=args.seed) if args.near_dup else None
+    num_rows = num_kept = 0
 
-    df["Summary"] = df["Summary"].astype(str).fillna("")
-    df["Text"] = df["Text"].astype(str).fillna("")
-    df["text"] = (df["Summary"].map(clean) + ". " + df["Text"].map(clean)).str.strip()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending = []
+        chunks = iter(reader)
+        # At most two chunks per worker are in flight, which bounds memory on multi-GB files.
+        while True:
+            while len(pending) < 2 * args.workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                num_rows += len(chunk)
+                pending.append(pool.submit(
+                    process_chunk, chunk, args.min_votes, args.hi_thr, args.lo_thr, minhasher
+                ))
+            if not pending:
+                break
 
-    df = df[df["text"].str.len() > 0]
-    df = df.drop_duplicates(subset=["text"]).reset_index(drop=True)
-    df = df[df["text"].str.split().str.len() >= 5]
+            labeled, band_keys = pending.pop(0).result()
+            # First occurrence wins, as with drop_duplicates over the whole file.
+            keep = dedup.keep_exact(labeled["hash"].to_numpy())
+            keep &= labeled["num_words"].to_numpy() >= 5
+            if band_keys is not None:
+                keep[keep] = dedup.keep_near(band_keys[keep])
+            num_kept += int(keep.sum())
+            sampler.add(labeled["text"].to_numpy()[keep], labeled["label"].to_numpy()[keep])
 
-    labels = []
-    for _, row in df.iterrows():
-        lbl = vote_label(
-            row.get("HelpfulnessNumerator", 0),
-            row.get("HelpfulnessDenominator", 0),
-            args.min_votes, args.hi_thr, args.lo_thr
-        )
-        if lbl is None:
-            if looks_creative(row["text"]):
-                lbl = "creative"
-            else:
-                lbl = "unhelpful" if len(row["text"].split()) < 12 else "creative"
-        labels.append(lbl)
-
-    df = pd.DataFrame({"text": df["text"], "label": labels})
-
-    parts = []
-    for name, grp in df.groupby("label", sort=False):
-        if len(grp) == 0:
-            continue
-        parts.append(grp.sample(frac=1.0, random_state=args.seed).head(args.max_per_class))
-
-    if not parts:
+    print(f"Labeled {num_rows} rows ({num_kept} unique, long enough) in {time.perf_counter() - start:.1f} s")
+    print("Duplicates removed:", dedup.report())
+
+    df_bal = sampler.to_frame()
+    if len(df_bal) == 0:
         raise RuntimeError("No data after labeling. Check thresholds or input file.")
 
-    df_bal = pd.concat(parts).sample(frac=1.0, random_state=args.seed).reset_index(drop=True)
+    df_bal = df_bal.sample(frac=1.0, random_state=args.seed).reset_index(drop=True)
 
     if args.val_ratio + args.test_ratio > 0:
         temp_size = args.val_ratio + args.test_ratio
@@ -129,10 +262,16 @@ def main():
         train, valid, test = df_bal, pd.DataFrame(columns=["text", "label"]), pd.DataFrame(columns=["text", "label"])
 
     # --- Save ---
-    (out / "train.csv").write_text(train.to_csv(index=False, encoding="utf-8"), encoding="utf-8")
-    (out / "valid.csv").write_text(valid.to_csv(index=False, encoding="utf-8"), encoding="utf-8")
+    splits = {"train": train, "valid": valid}
     if args.test_ratio > 0:
-        (out / "test.csv").write_text(test.to_csv(index=False, encoding="utf-8"), encoding="utf-8")
+        splits["test"] = test
+    formats = args.formats.split(",")
+    for name, split in splits.items():
+        split = split.reset_index(drop=True)
+        if "csv" in formats:
+            split.to_csv(out / f"{name}.csv", index=False, encoding="utf-8")
+        if "parquet" in formats:
+            split.to_parquet(out / f"{name}.parquet", index=False)
 
     # --- Report ---
     print(f"Saved: {len(train)} train, {len(valid)} valid, {len(test)} test -> {out}")
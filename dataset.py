@@ -2,18 +2,42 @@ import pandas as pd
 import torch
 from torch.utils.data import Dataset
 
+from token_store import TokenStore
+
 
 class SSTDataset(Dataset):
 
-    def __init__(self, filename, maxlen, tokenizer):
-        self.df = pd.read_csv(filename, delimiter="\t")
+    def __init__(self, filename, maxlen, tokenizer, token_store=None):
         self.tokenizer = tokenizer
         self.maxlen = maxlen
+        # A directory written by pretokenize.py; items are then sliced from it instead of tokenized.
+        self.store = None
+        if token_store is not None:
+            self.store = TokenStore(token_store)
+            self.store.check_tokenizer(tokenizer)
+            self.cls_id, self.sep_id, self.pad_id = tokenizer.convert_tokens_to_ids(
+                ["[CLS]", "[SEP]", "[PAD]"]
+            )
+        else:
+            self.df = pd.read_csv(filename, delimiter="\t")
 
     def __len__(self):
+        if self.store is not None:
+            return len(self.store)
         return len(self.df)
 
+    # Number of non-padding tokens of every item, for length-bucketed batching.
+    def lengths(self):
+        if self.store is not None:
+            token_counts = self.store.lengths()
+        else:
+            sentences = self.df["sentence"].astype(str).tolist()
+            token_counts = [len(self.tokenizer.tokenize(s)) for s in sentences]
+        return [min(int(n) + 2, self.maxlen) for n in token_counts]
+
     def __getitem__(self, index):
+        if self.store is not None:
+            return self._get_pretokenized(index)
         sentence = self.df.loc[index, "sentence"]
         label = self.df.loc[index, "label"]
         tokens = self.tokenizer.tokenize(sentence)
@@ -25,3 +49,13 @@ class SSTDataset(Dataset):
         input_ids = torch.tensor(self.tokenizer.convert_tokens_to_ids(tokens))
         attention_mask = (input_ids != 0).long()
         return input_ids, attention_mask, label
+
+    # Same layout as above: [CLS] tokens [SEP], truncated or padded to maxlen.
+    def _get_pretokenized(self, index):
+        tokens = self.store.example(index)[: self.maxlen - 2]
+        input_ids = torch.full((self.maxlen,), self.pad_id, dtype=torch.long)
+        input_ids[0] = self.cls_id
+        input_ids[1 : len(tokens) + 1] = torch.from_numpy(tokens.astype("int64"))
+        input_ids[len(tokens) + 1] = self.sep_id
+        attention_mask = (input_ids != 0).long()
+        return input_ids, attention_mask, int(self.store.labels[index])
@@ -0,0 +1,149 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Modulus of the MinHash permutations: a * x + b stays below 2**63 for 32-bit shingle hashes.
+MINHASH_PRIME = (1 << 31) - 1
+
+
+# 64-bit hashes of a column of texts, computed in C by pandas.
+def text_hashes(texts: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(texts, index=False).to_numpy()
+
+
+class HashSet:
+    """
+    A set of 64-bit hashes held in sorted NumPy arrays: 8 bytes per entry.
+
+    New hashes form a sorted run; a run is merged into the previous one
+    while that one is no larger (a size-tiered log), so there are at most
+    log2(n) runs, each entry is merged O(log n) times and nothing is ever
+    re-sorted. Merges are linear (searchsorted + insert) and lookups are
+    one binary search per run.
+    """
+
+    def __init__(self):
+        self._runs = []  # sorted arrays, strictly shrinking in size
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        # Sorted queries walk each run in order, which is much faster than random probes.
+        order = np.argsort(hashes, kind="stable")
+        queries = hashes[order]
+        found = np.zeros(len(hashes), dtype=bool)
+        for arr in self._runs:
+            pos = np.minimum(np.searchsorted(arr, queries), len(arr) - 1)
+            found |= arr[pos] == queries
+        result = np.empty(len(hashes), dtype=bool)
+        result[order] = found
+        return result
+
+    def add_new(self, hashes):
+        """
+        Adds hashes and returns a mask that is True where a hash was not seen
+        before, neither in earlier calls nor earlier in this array.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        new = ~pd.Series(hashes).duplicated().to_numpy() & ~self.contains(hashes)
+        if new.any():
+            run = np.sort(hashes[new])
+            while self._runs and len(self._runs[-1]) <= len(run):
+                run = merge_sorted(self._runs.pop(), run)
+            self._runs.append(run)
+        return new
+
+
+# Merges two sorted arrays with disjoint values in linear time.
+def merge_sorted(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    return np.insert(a, np.searchsorted(a, b), b)
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles, cut into LSH bands.
+
+    Two texts whose shingle sets have Jaccard similarity s share at least one
+    band with probability 1 - (1 - s**rows)**bands, where rows = num_perm / bands;
+    the defaults (64 permutations, 16 bands of 4) catch most pairs above s ~ 0.5.
+    """
+
+    def __init__(self, num_perm=64, bands=16, shingle_size=3, seed=0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MINHASH_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MINHASH_PRIME, num_perm, dtype=np.uint64)
+        self.band_mix = rng.integers(1, 1 << 63, (num_perm // bands,), dtype=np.uint64) | np.uint64(1)
+        self.band_salt = rng.integers(0, 1 << 63, bands, dtype=np.uint64)
+
+    def shingles(self, text):
+        words = text.lower().split()
+        n = self.shingle_size
+        if len(words) <= n:
+            return [" ".join(words)]
+        return [" ".join(words[i : i + n]) for i in range(len(words) - n + 1)]
+
+    def signature(self, text):
+        x = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in self.shingles(text)), dtype=np.uint64
+        )
+        return ((self.a[:, None] * x[None, :] + self.b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+    def band_keys(self, texts):
+        """
+        Returns an (n, bands) array of 64-bit keys; texts sharing any key are near-duplicate candidates.
+        """
+        if len(texts) == 0:
+            return np.empty((0, self.bands), dtype=np.uint64)
+        signatures = np.stack([self.signature(t) for t in texts])
+        rows = signatures.reshape(len(texts), self.bands, -1)
+        with np.errstate(over="ignore"):
+            return (rows * self.band_mix).sum(axis=2, dtype=np.uint64) ^ self.band_salt
+
+
+class Deduplicator:
+    """
+    One-pass exact (and optionally near-duplicate) filtering over a stream of chunks.
+
+    Exact duplicates are detected through 64-bit text hashes. Near-duplicates
+    are texts that share an LSH band with any earlier text; the bands of every
+    text that reaches that check are remembered, so memory grows by
+    8 * (1 + bands) bytes per unique text, not with the texts themselves.
+    """
+
+    def __init__(self, near_dup=False, bands=16):
+        self.exact = HashSet()
+        self.near = HashSet() if near_dup else None
+        self.bands = bands
+        self.num_seen = 0
+        self.num_exact_dups = 0
+        self.num_near_dups = 0
+
+    def keep_exact(self, hashes):
+        keep = self.exact.add_new(hashes)
+        self.num_seen += len(keep)
+        self.num_exact_dups += int((~keep).sum())
+        return keep
+
+    def keep_near(self, band_keys):
+        if self.near is None:
+            return np.ones(len(band_keys), dtype=bool)
+        new = self.near.add_new(band_keys.ravel()).reshape(band_keys.shape)
+        keep = new.all(axis=1)
+        self.num_near_dups += int((~keep).sum())
+        return keep
+
+    def report(self):
+        report = {"rows": self.num_seen, "exact_duplicates": self.num_exact_dups}
+        if self.near is not None:
+            report["near_duplicates"] = self.num_near_dups
+        return report
@@ -0,0 +1,54 @@
+import os
+
+import torch
+import torch.distributed as dist
+
+
+# Joins the process group set up by torchrun (RANK/WORLD_SIZE/LOCAL_RANK in the environment).
+# Returns (rank, world_size); a plain `python train.py` run is rank 0 of 1.
+def init_distributed(backend="gloo"):
+    world_size = int(os.environ.get("WORLD_SIZE", "1"))
+    if world_size == 1:
+        return 0, 1
+
+    if not dist.is_initialized():
+        dist.init_process_group(backend=backend)
+
+    # torchrun sets OMP_NUM_THREADS=1; give each process its share of the cores instead.
+    local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", world_size))
+    threads = int(
+        os.environ.get("TRAIN_THREADS_PER_PROC", max(1, (os.cpu_count() or 1) // local_world_size))
+    )
+    torch.set_num_threads(threads)
+    return dist.get_rank(), world_size
+
+
+def is_distributed():
+    return dist.is_available() and dist.is_initialized()
+
+
+def is_main_process():
+    return not is_distributed() or dist.get_rank() == 0
+
+
+def local_rank():
+    return int(os.environ.get("LOCAL_RANK", "0"))
+
+
+# Sums a number over all processes.
+def all_reduce_sum(value):
+    if not is_distributed():
+        return value
+    tensor = torch.tensor(float(value), dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return tensor.item()
+
+
+def barrier():
+    if is_distributed():
+        dist.barrier()
+
+
+def cleanup():
+    if is_distributed():
+        dist.destroy_process_group()
@@ -1,7 +1,11 @@
+import os
+import time
+
 import torch.nn as nn
 from torch.utils.data import DataLoader
 
 from dataset import SSTDataset
+from sampling import BucketBatchSampler, format_report, padding_report, trim_padding_collate
 from arguments import args
 from analyzer import Analyzer
 
@@ -13,14 +17,32 @@ if __name__ == "__main__":
     criterion = nn.BCEWithLogitsLoss()
 
     val_set = SSTDataset(
-        filename="data/dev.tsv", maxlen=args.maxlen_val, tokenizer=analyzer.tokenizer
-    )
-    val_loader = DataLoader(
-        dataset=val_set, batch_size=args.batch_size, num_workers=args.num_threads
+        filename="data/dev.tsv",
+        maxlen=args.maxlen_val,
+        tokenizer=analyzer.tokenizer,
+        token_store=args.token_store_dir and os.path.join(args.token_store_dir, "dev"),
     )
-
+    if args.bucket_batches:
+        val_lengths = val_set.lengths()
+        val_sampler = BucketBatchSampler(val_lengths, args.batch_size, shuffle=False)
+        val_loader = DataLoader(
+            dataset=val_set,
+            batch_sampler=val_sampler,
+            collate_fn=trim_padding_collate,
+            num_workers=args.num_threads,
+        )
+    else:
+        val_loader = DataLoader(
+            dataset=val_set, batch_size=args.batch_size, num_workers=args.num_threads
+        )
+
+    start = time.perf_counter()
     val_accuracy, val_loss = analyzer.evaluate(
         val_loader=val_loader, criterion=criterion
     )
+    if args.bucket_batches:
+        report = padding_report(val_sampler.batches(), val_lengths, fixed_len=args.maxlen_val)
+        print(f"Evaluation: {format_report(report, time.perf_counter() - start)}")
 
+    print(f"Quantization : {args.quantization}")
     print(f"Validation Accuracy : {val_accuracy}, Validation Loss : {val_loss}")
@@ -0,0 +1,91 @@
+# export_onnx.py
+#
+# Exports the sentiment classifier (BERT, ALBERT or DistilBERT head from modeling.py)
+# or the helpfulness classifier to ONNX with dynamic batch and sequence axes.
+#   python export_onnx.py --model_name_or_path barissayil/bert-sentiment-analysis-sst --output_dir models/sst_onnx
+#   python export_onnx.py --task helpfulness --model_name_or_path models/helpful_distil --output_dir models/helpful_onnx
+# The output directory can be passed to analyze.py / evaluate.py with --backend onnx.
+import argparse
+import os
+
+import torch
+import torch.nn as nn
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from analyzer import Analyzer
+from onnx_backend import ONNX_FILENAME
+
+
+class LogitsOnly(nn.Module):
+    """
+    Wraps a transformers sequence classifier so it returns the logits tensor, like modeling.py.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--task", choices=["sentiment", "helpfulness"], default="sentiment")
+    p.add_argument("--model_name_or_path", default=None)
+    p.add_argument("--output_dir", required=True)
+    p.add_argument("--opset", type=int, default=14)
+    return p.parse_args()
+
+
+def load_model(task, model_name_or_path):
+    if task == "sentiment":
+        analyzer = Analyzer(
+            will_train=False,
+            args=argparse.Namespace(model_name_or_path=model_name_or_path, output_dir=None),
+        )
+        return analyzer.model.cpu(), analyzer.tokenizer, analyzer.config
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name_or_path)
+    tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+    return LogitsOnly(model).eval(), tokenizer, model.config
+
+
+def export_model(model, path, opset=14):
+    """
+    Writes `model(input_ids, attention_mask) -> logits` to `path` with dynamic batch and sequence axes.
+    """
+    dummy = torch.ones(2, 8, dtype=torch.long)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy, dummy),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    model, tokenizer, config = load_model(args.task, args.model_name_or_path)
+    path = os.path.join(args.output_dir, ONNX_FILENAME)
+    export_model(model, path, args.opset)
+
+    # Analyzer reads the model type and tokenizer from the same directory.
+    config.save_pretrained(args.output_dir)
+    tokenizer.save_pretrained(args.output_dir)
+    print("Saved:", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+#
+# Pre-fork serving: models are loaded once in the master and shared copy-on-write
+# with every worker, so adding workers costs little extra memory.
+#
+#   gunicorn -c gunicorn.conf.py app.main:app
+#   WORKER_CLASS=sync APP_ARGS="--model_name_or_path models/my_model" gunicorn -c gunicorn.conf.py server:app
+import os
+import shlex
+import sys
+
+os.environ.setdefault("MODEL_LOADING", "prefork")
+
+bind = os.environ.get("BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = os.environ.get("WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+timeout = int(os.environ.get("TIMEOUT", "120"))
+preload_app = os.environ["MODEL_LOADING"] == "prefork"
+
+# arguments.py parses sys.argv when server.py is preloaded; show it APP_ARGS instead of
+# gunicorn's own flags, and put the real command line back once the master starts.
+_gunicorn_argv = sys.argv
+sys.argv = sys.argv[:1] + shlex.split(os.environ.get("APP_ARGS", ""))
+
+
+def on_starting(server):
+    sys.argv = _gunicorn_argv
+    server.START_CTX["args"] = [sys.executable] + _gunicorn_argv
+
+
+def post_fork(server, worker):
+    # Split the cores between workers instead of every worker using all of them.
+    import torch
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
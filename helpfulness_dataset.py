@@ -3,8 +3,28 @@ import pandas as pd
 import torch
 from torch.utils.data import Dataset
 
+from token_store import TokenStore
+
 class HelpfulnessDataset(Dataset):
-    def __init__(self, csv_path, tokenizer, label_list=None, max_length=256):
+    def __init__(self, csv_path, tokenizer, label_list=None, max_length=256, token_store=None):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+
+        # Pre-tokenized store from pretokenize.py: no tokenization per item or epoch.
+        self.store = None
+        if token_store is not None:
+            self.store = TokenStore(token_store)
+            self.store.check_tokenizer(tokenizer)
+            self.label_list = self.store.meta["label_list"]
+            if label_list is not None and list(label_list) != self.label_list:
+                raise ValueError(f"Token store labels {self.label_list} differ from {label_list}")
+            self.label2id = {l: i for i, l in enumerate(self.label_list)}
+            self.id2label = {i: l for l, i in self.label2id.items()}
+            self.labels = self.store.labels
+            self.num_special = tokenizer.num_special_tokens_to_add()
+            self.with_token_types = "token_type_ids" in tokenizer.model_input_names
+            return
+
         df = pd.read_csv(csv_path)
         if "text" not in df or "label" not in df:
             raise ValueError("CSV must have 'text' and 'label' columns")
@@ -21,13 +41,19 @@ class HelpfulnessDataset(Dataset):
         except KeyError as e:
             raise ValueError(f"Unknown label in file: {e}. Allowed: {self.label_list}")
 
-        self.tokenizer = tokenizer
-        self.max_length = max_length
-
     def __len__(self):
-        return len(self.texts)
+        return len(self.labels)
+
+    # Number of non-padding tokens of every item, for length-bucketed batching.
+    def lengths(self):
+        if self.store is not None:
+            return [min(int(n) + self.num_special, self.max_length) for n in self.store.lengths()]
+        encoded = self.tokenizer(self.texts, truncation=True, max_length=self.max_length)
+        return [len(ids) for ids in encoded["input_ids"]]
 
     def __getitem__(self, idx):
+        if self.store is not None:
+            return self._get_pretokenized(idx)
         x = self.tokenizer(
             self.texts[idx],
             truncation=True,
@@ -38,3 +64,18 @@ class HelpfulnessDataset(Dataset):
         item = {k: v.squeeze(0) for k, v in x.items()}
         item["labels"] = torch.tensor(self.labels[idx], dtype=torch.long)
         return item
+
+    # Matches the tokenizer call above: special tokens added, truncated and padded to max_length.
+    def _get_pretokenized(self, idx):
+        tokens = self.store.example(idx)[: self.max_length - self.num_special].tolist()
+        ids = self.tokenizer.build_inputs_with_special_tokens(tokens)
+        input_ids = torch.full((self.max_length,), self.tokenizer.pad_token_id, dtype=torch.long)
+        input_ids[: len(ids)] = torch.tensor(ids)
+        attention_mask = torch.zeros(self.max_length, dtype=torch.long)
+        attention_mask[: len(ids)] = 1
+
+        item = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if self.with_token_types:
+            item["token_type_ids"] = torch.zeros(self.max_length, dtype=torch.long)
+        item["labels"] = torch.tensor(int(self.labels[idx]), dtype=torch.long)
+        return item
@@ -47,3 +47,17 @@ class DistilBertForSentimentClassification(DistilBertPreTrainedModel):
         cls_reps = outputs.last_hidden_state[:, 0]
         logits = self.cls_layer(cls_reps)
         return logits
+
+
+class BertForSentimentAndHelpfulness(BertPreTrainedModel):
+    def __init__(self, config):
+        super().__init__(config)
+        self.bert = BertModel(config)
+        self.cls_layer = nn.Linear(config.hidden_size, 1)
+        self.help_layer = nn.Linear(config.hidden_size, config.num_labels)
+
+    def forward(self, input_ids, attention_mask):
+        # One encoder pass feeds both the sentiment logit and the helpfulness logits.
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        cls_reps = outputs.last_hidden_state[:, 0]
+        return self.cls_layer(cls_reps), self.help_layer(cls_reps)
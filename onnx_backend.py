@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import onnxruntime as ort
+import torch
+
+ONNX_FILENAME = "model.onnx"
+
+
+class OnnxClassifier:
+    """
+    ONNX Runtime session behind the call signature of the models in modeling.py:
+    model(input_ids=..., attention_mask=...) returns a logits tensor.
+
+    `model_dir` is a directory written by export_onnx.py (model.onnx plus config and tokenizer).
+    """
+
+    def __init__(self, model_dir, num_threads=None):
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, ONNX_FILENAME),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    # ONNX Runtime runs on the CPU here; these keep the torch model interface.
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": input_ids.cpu().numpy().astype(np.int64),
+                "attention_mask": attention_mask.cpu().numpy().astype(np.int64),
+            },
+        )
+        return torch.from_numpy(logits)
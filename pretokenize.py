@@ -0,0 +1,60 @@
+# pretokenize.py
+#
+# Tokenizes a training file once into a memory-mapped token store (see token_store.py).
+#   python pretokenize.py --format sst --input data/train.tsv --output_dir data/tokens/train
+#   python pretokenize.py --format helpfulness --input train.csv --output_dir data/tokens/help_train \
+#       --tokenizer distilbert-base-uncased
+# Pass the output directory as token_store= to SSTDataset / HelpfulnessDataset
+# (train.py: --token_store_dir, train_helpfulness.py: --train_store/--valid_store).
+import argparse
+import time
+
+import pandas as pd
+from transformers import AutoTokenizer
+
+from token_store import TokenStore, tokenize_texts
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--format", choices=["sst", "helpfulness"], required=True)
+    p.add_argument("--input", required=True)
+    p.add_argument("--output_dir", required=True)
+    p.add_argument("--tokenizer", default="bert-base-uncased")
+    p.add_argument("--labels", default="helpful,creative,unhelpful",
+                   help="Helpfulness label order, as in train_helpfulness.py.")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    start = time.perf_counter()
+
+    if args.format == "sst":
+        df = pd.read_csv(args.input, delimiter="\t")
+        texts = df["sentence"].astype(str).tolist()
+        labels = df["label"].tolist()
+        meta = {"format": "sst", "source": args.input}
+    else:
+        df = pd.read_csv(args.input)
+        if "text" not in df or "label" not in df:
+            raise ValueError("CSV must have 'text' and 'label' columns")
+        label_list = args.labels.split(",")
+        label2id = {label: i for i, label in enumerate(label_list)}
+        texts = df["text"].astype(str).tolist()
+        try:
+            labels = [label2id[label] for label in df["label"].astype(str)]
+        except KeyError as e:
+            raise ValueError(f"Unknown label in file: {e}. Allowed: {label_list}")
+        meta = {"format": "helpfulness", "source": args.input, "label_list": label_list}
+
+    store = TokenStore.write(args.output_dir, tokenize_texts(texts, tokenizer), labels, tokenizer, **meta)
+    print(
+        f"Saved {len(store)} examples ({int(store.offsets[-1])} tokens) to {args.output_dir} "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
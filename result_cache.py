@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+# Texts that differ only in Unicode form or whitespace share a cache entry.
+def normalize_text(text):
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+# Identifies a model checkpoint plus the settings that change its outputs.
+# Local checkpoints are identified by their files' sizes and modification times,
+# so retraining into the same directory invalidates cached results. Hub IDs are
+# identified by the snapshot directory of the revision they resolve to.
+def model_fingerprint(model_name_or_path, *settings):
+    digest = hashlib.sha1(str(model_name_or_path).encode("utf-8"))
+    model_dir = model_name_or_path
+    if model_dir is not None and not os.path.isdir(model_dir):
+        model_dir = hub_snapshot_dir(model_dir)
+    if model_dir is not None:
+        if model_dir != model_name_or_path:
+            digest.update(f"\0{model_dir}".encode("utf-8"))
+        for name in sorted(os.listdir(model_dir)):
+            stat = os.stat(os.path.join(model_dir, name))
+            digest.update(f"\0{name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    for setting in settings:
+        digest.update(f"\0{setting}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# The local snapshot directory (named after the commit hash) that a hub model ID
+# resolves to, downloading its config if needed; None if it cannot be resolved.
+def hub_snapshot_dir(model_id):
+    # Imported here so the cache itself does not need transformers.
+    from transformers.utils import cached_file
+
+    try:
+        config_file = cached_file(model_id, "config.json")
+    except (OSError, ValueError):
+        return None
+    return os.path.dirname(config_file) if config_file else None
+
+
+class ResultCache:
+    """
+    In-process LRU cache of model results keyed by normalized text and a model fingerprint.
+
+    Entries older than `ttl_seconds` are treated as misses. With `disk_path`,
+    results are also written to a SQLite file that every worker process can
+    read, so a text scored by one worker is a hit in the others. Values must
+    be JSON serializable; tuples come back from disk as lists.
+    """
+
+    def __init__(self, fingerprint, max_entries=10000, ttl_seconds=None, disk_path=None):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+
+        self._entries = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        self._db = None
+        self._db_pid = None
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+
+    def key(self, text):
+        digest = hashlib.sha1(self.fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, text):
+        """
+        Returns the cached result for text, or None.
+        """
+        key = self.key(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0], now):
+                    del self._entries[key]
+                    self._expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+
+            if self.disk_path:
+                row = self._connection().execute(
+                    "SELECT created, value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[0], now):
+                    value = json.loads(row[1])
+                    self._store(key, row[0], value)
+                    self._hits += 1
+                    self._disk_hits += 1
+                    return value
+
+            self._misses += 1
+            return None
+
+    def put(self, text, value):
+        key = self.key(text)
+        now = time.time()
+        with self._lock:
+            self._store(key, now, value)
+            if self.disk_path:
+                db = self._connection()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, created, value) VALUES (?, ?, ?)",
+                    (key, now, json.dumps(value)),
+                )
+                db.commit()
+
+    # Returns the cached result for text, computing and caching it on a miss.
+    def get_or_compute(self, text, compute):
+        value = self.get(text)
+        if value is None:
+            value = compute(text)
+            self.put(text, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.disk_path:
+                db = self._connection()
+                db.execute("DELETE FROM results")
+                db.commit()
+
+    # Returns hit, miss and eviction counters plus the current size.
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def _expired(self, created, now):
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def _store(self, key, created, value):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    # SQLite connections must not cross fork(), so each process opens its own.
+    def _connection(self):
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.disk_path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, created REAL, value TEXT)"
+            )
+            if self.ttl_seconds is not None:
+                self._db.execute(
+                    "DELETE FROM results WHERE created < ?", (time.time() - self.ttl_seconds,)
+                )
+            self._db.commit()
+            self._db_pid = os.getpid()
+        return self._db
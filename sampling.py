@@ -0,0 +1,106 @@
+import random
+
+from torch.utils.data import Sampler
+from torch.utils.data.dataloader import default_collate
+
+
+class BucketBatchSampler(Sampler):
+    """
+    Yields batches of indices whose examples have similar lengths.
+
+    Indices are shuffled, cut into buckets of batch_size * bucket_multiplier,
+    sorted by length inside each bucket and split into batches; the batch
+    order is shuffled again so training still sees lengths in random order.
+    Each pass uses the next epoch's seed, so the batches change every epoch.
+    With num_replicas > 1 every process gets an equal share of the batches.
+    """
+
+    def __init__(self, lengths, batch_size, shuffle=True, bucket_multiplier=50, drop_last=False, seed=0,
+                 num_replicas=1, rank=0):
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * bucket_multiplier
+        self.drop_last = drop_last
+        self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def batches(self, epoch=0):
+        rng = random.Random(self.seed + epoch)
+        indices = list(range(len(self.lengths)))
+        if self.shuffle:
+            rng.shuffle(indices)
+
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = sorted(indices[start : start + self.bucket_size], key=lambda i: self.lengths[i])
+            for i in range(0, len(bucket), self.batch_size):
+                batches.append(bucket[i : i + self.batch_size])
+        if self.drop_last:
+            batches = [batch for batch in batches if len(batch) == self.batch_size]
+        if self.shuffle:
+            rng.shuffle(batches)
+        if self.num_replicas > 1:
+            # Equal counts per process: DDP needs every rank to take the same number of steps.
+            per_replica = len(batches) // self.num_replicas
+            batches = batches[self.rank : per_replica * self.num_replicas : self.num_replicas]
+        return batches
+
+    def __iter__(self):
+        batches = self.batches(self.epoch)
+        self.epoch += 1
+        return iter(batches)
+
+    def __len__(self):
+        if self.drop_last:
+            num_batches = len(self.lengths) // self.batch_size
+        else:
+            num_batches = (len(self.lengths) + self.batch_size - 1) // self.batch_size
+        return num_batches // self.num_replicas
+
+
+# Collates right-padded examples and cuts every sequence tensor to the batch's longest example.
+# Works for (input_ids, attention_mask, label) tuples (SSTDataset) and dicts (HelpfulnessDataset).
+def trim_padding_collate(batch):
+    batch = default_collate(batch)
+    if isinstance(batch, dict):
+        length = int(batch["attention_mask"].sum(dim=1).max())
+        return {
+            key: value[:, :length] if value.dim() == 2 else value for key, value in batch.items()
+        }
+    input_ids, attention_mask, labels = batch
+    length = int(attention_mask.sum(dim=1).max())
+    return input_ids[:, :length], attention_mask[:, :length], labels
+
+
+# Token counts of a list of batches: real tokens, tokens after padding each batch to its
+# longest example, and tokens after padding everything to fixed_len (the old behaviour).
+def padding_report(batches, lengths, fixed_len=None):
+    real = sum(lengths[i] for batch in batches for i in batch)
+    padded = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+    report = {
+        "batches": len(batches),
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "padding_waste": 1 - real / padded if padded else 0.0,
+    }
+    if fixed_len is not None:
+        fixed = fixed_len * sum(len(batch) for batch in batches)
+        report["fixed_padded_tokens"] = fixed
+        report["fixed_padding_waste"] = 1 - real / fixed if fixed else 0.0
+    return report
+
+
+# Formats a padding_report plus the throughput of an epoch that took `elapsed` seconds.
+def format_report(report, elapsed=None):
+    line = f"padding waste {report['padding_waste']:.1%}"
+    if "fixed_padding_waste" in report:
+        line += f" (fixed length: {report['fixed_padding_waste']:.1%})"
+    if elapsed:
+        line += f", {report['real_tokens'] / elapsed:.0f} tokens/s"
+    return line
@@ -3,6 +3,7 @@ from flask_cors import CORS
 
 from arguments import args
 from analyzer import Analyzer
+from batching import MicroBatcher
 
 
 app = Flask(__name__)
@@ -10,14 +11,27 @@ app.config.from_object(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 analyzer = Analyzer(will_train=False, args=args)
+batcher = MicroBatcher(
+    lambda texts: list(analyzer.classify_sentiment_batch(texts, batch_size=len(texts))),
+    max_batch_size=args.max_batch_size,
+    max_wait_ms=args.batch_wait_ms,
+)
 
 
 @app.get("/")
 def sentiment():
     text = request.args["text"]
-    sentiment, percentage = analyzer.classify_sentiment(text)
+    sentiment, percentage = batcher.submit(text)
     return jsonify({"sentiment": sentiment, "percentage": percentage})
 
 
+@app.get("/stats")
+def stats():
+    stats = batcher.stats()
+    if analyzer.result_cache is not None:
+        stats["result_cache"] = analyzer.result_cache.stats()
+    return jsonify(stats)
+
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,33 @@
+import pytest
+import torch
+from transformers import BertConfig, BertTokenizerFast
+
+TINY_BERT_CONFIG = dict(hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64)
+
+
+@pytest.fixture
+def tiny_bert(tmp_path):
+    """
+    Factory for tiny randomly initialised BERT models over a given word list.
+
+    make(words, model_class=None, path=tmp_path, **config) writes vocab.txt and
+    the tokenizer to path and returns (model, tokenizer). With model_class, the
+    model is built from a seeded tiny BertConfig (overridden by config) and
+    saved next to the tokenizer, so path can be loaded with from_pretrained;
+    otherwise model is None.
+    """
+
+    def make(words, model_class=None, path=None, **config):
+        path = tmp_path if path is None else path
+        (path / "vocab.txt").write_text("\n".join(words))
+        tokenizer = BertTokenizerFast(str(path / "vocab.txt"))
+        tokenizer.save_pretrained(str(path))
+        if model_class is None:
+            return None, tokenizer
+
+        torch.manual_seed(0)
+        model = model_class(BertConfig(vocab_size=len(words), **{**TINY_BERT_CONFIG, **config})).eval()
+        model.save_pretrained(str(path))
+        return model, tokenizer
+
+    return make
@@ -1,11 +1,14 @@
 import argparse
 
 from analyzer import Analyzer
+from modeling import BertForSentimentClassification
 
 args = argparse.Namespace()
 args.model_name_or_path = "barissayil/bert-sentiment-analysis-sst"
 args.output_dir = "my_model"
 
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "a", "great", "bad", "movie", "plot", "not"]
+
 
 def test_analyzer():
     analyzer = Analyzer(will_train=False, args=args)
@@ -14,3 +17,46 @@ def test_analyzer():
     assert analyzer.classify_sentiment("good") == ("Positive", 99)
     assert analyzer.classify_sentiment("bad") == ("Negative", 99)
     assert analyzer.classify_sentiment("average") == ("Negative", 68)
+
+
+def test_resolve_model_name():
+    given = argparse.Namespace(model_name_or_path=None)
+    assert Analyzer.resolve_model_name(False, given) == "barissayil/bert-sentiment-analysis-sst"
+    assert given.model_name_or_path == "barissayil/bert-sentiment-analysis-sst"
+    assert Analyzer.resolve_model_name(True, argparse.Namespace(model_name_or_path=None)) == "bert-base-uncased"
+    assert Analyzer.resolve_model_name(True, argparse.Namespace(model_name_or_path="x")) == "x"
+
+
+def test_classify_sentiment_batch_keeps_input_order(tmp_path, tiny_bert, monkeypatch):
+    tiny_bert(WORDS, BertForSentimentClassification)
+    analyzer = Analyzer(will_train=False, args=argparse.Namespace(model_name_or_path=str(tmp_path), output_dir=None))
+    words = WORDS[5:]
+    # Longest first, so the length sort reorders every window.
+    texts = [" ".join(words[(i + j) % len(words)] for j in range(9 - i)) for i in range(9)]
+    expected = [analyzer.classify_sentiment(text) for text in texts]
+    assert list(analyzer.classify_sentiment_batch(texts, batch_size=2, sort_window=2)) == expected
+
+    # The tiny model scores every text alike; tag each result with its length to check the order.
+    batches = []
+
+    def classify_ids(batch_ids):
+        batches.append([len(ids) for ids in batch_ids])
+        return [("Positive", len(ids)) for ids in batch_ids]
+
+    monkeypatch.setattr(analyzer, "_classify_ids", classify_ids)
+    lengths = [len(analyzer.tokenizer(text)["input_ids"]) for text in texts]
+    consumed = []
+
+    def generate():
+        for text in texts:
+            consumed.append(text)
+            yield text
+
+    # Windows of 4 texts: two full ones and a last one of a single text.
+    results = analyzer.classify_sentiment_batch(generate(), batch_size=2, sort_window=2)
+    first = next(results)
+    assert len(consumed) == 4
+    assert [first] + list(results) == [("Positive", n) for n in lengths]
+    assert batches == [sorted(lengths[0:4])[:2], sorted(lengths[0:4])[2:],
+                       sorted(lengths[4:8])[:2], sorted(lengths[4:8])[2:], lengths[8:]]
+    assert list(analyzer.classify_sentiment_batch(iter([]))) == []
@@ -0,0 +1,93 @@
+import os
+import threading
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_micro_batcher():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+    results = [None] * 8
+
+    def worker(i):
+        results[i] = batcher.submit(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == [i * 2 for i in range(8)]
+    assert max(calls) <= 4
+    assert len(calls) < 8
+
+    stats = batcher.stats()
+    assert stats["requests"] == 8
+    assert stats["queue_depth"] == 0
+    assert sum(size * n for size, n in stats["batch_size_histogram"].items()) == 8
+
+
+def test_micro_batcher_error():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.submit("text")
+    batcher.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_micro_batcher_after_fork():
+    batcher = MicroBatcher(lambda items: [item + 1 for item in items], max_wait_ms=1)
+    assert batcher.submit(1) == 2
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if batcher.submit(41, timeout=5) == 42 else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    batcher.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_micro_batcher_starts_no_thread_in_idle_child():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+
+    pid = os.fork()
+    if pid == 0:
+        idle = not any(t.name == "micro-batcher" and t.is_alive() for t in threading.enumerate())
+        os._exit(0 if idle else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    batcher.close()
+
+
+def test_micro_batcher_isolates_failing_item():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        if "bad" in items:
+            raise ValueError("bad input")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=200)
+    futures = [batcher.submit_async(item) for item in ["a", "bad", "c"]]
+    assert futures[0].result(timeout=5) == "A"
+    assert futures[2].result(timeout=5) == "C"
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    batcher.close()
+
+    assert calls[0] == ["a", "bad", "c"]
+    assert calls[1:] == [["a"], ["bad"], ["c"]]
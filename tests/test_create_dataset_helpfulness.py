@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from create_dataset_helpfulness import ReservoirSampler, clean, label_chunk, looks_creative, vote_label
+
+ROWS = [
+    ("Great", "Works well, five stars from me.", 9, 10),
+    ("Meh", "Did not like it at all really.", 1, 10),
+    ("Ok", "Short text only.", 2, 3),
+    ("Tips", "Here are some steps to brew it well every single time.", 0, 0),
+    ("Plain", "good good good good good good good good good good good good good", None, None),
+    ("Story", " ".join(f"word{i}" for i in range(25)), "x", 7),
+    ("Multi\nline", "1. 2. 3.", 4, 4),
+    ("", "an imaginative   take\r\non coffee for sure", 0, 1),
+]
+
+
+def reference_label(text, num, den):
+    label = vote_label(num, den, 5, 0.7, 0.3)
+    if label is None:
+        if looks_creative(text):
+            label = "creative"
+        else:
+            label = "unhelpful" if len(text.split()) < 12 else "creative"
+    return label
+
+
+def test_label_chunk_matches_row_rules():
+    chunk = pd.DataFrame(ROWS, columns=["Summary", "Text", "HelpfulnessNumerator", "HelpfulnessDenominator"])
+    labeled = label_chunk(chunk.copy(), min_votes=5, hi_thr=0.7, lo_thr=0.3)
+
+    texts = [(clean(str(s)) + ". " + clean(str(t))).strip() for s, t, _, _ in ROWS]
+    assert labeled["text"].tolist() == texts
+    assert labeled["label"].tolist() == [
+        reference_label(text, num, den) for text, (_, _, num, den) in zip(texts, ROWS)
+    ]
+    assert labeled["num_words"].tolist() == [len(t.split()) for t in texts]
+
+
+def test_reservoir_sampler_caps_each_class():
+    sampler = ReservoirSampler(k=50, seed=0)
+    for start in range(0, 1000, 100):
+        texts = np.array([f"t{i}" for i in range(start, start + 100)], dtype=object)
+        labels = np.array(["a" if i % 4 else "b" for i in range(start, start + 100)], dtype=object)
+        sampler.add(texts, labels)
+
+    df = sampler.to_frame()
+    counts = df["label"].value_counts()
+    assert counts["a"] == 50 and counts["b"] == 50
+    assert df["text"].is_unique
+    assert sampler.seen == {"a": 750, "b": 250}
+    # Later chunks are represented, not just the first rows that filled the reservoir.
+    assert max(int(t[1:]) for t in df["text"]) > 500
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from dedup import Deduplicator, HashSet, MinHasher, text_hashes
+
+
+def test_hash_set_matches_python_set():
+    rng = np.random.default_rng(0)
+    hash_set = HashSet()
+    seen = set()
+    for _ in range(20):
+        hashes = rng.integers(0, 3000, 200).astype(np.uint64)
+        expected = []
+        for h in hashes.tolist():
+            expected.append(h not in seen)
+            seen.add(h)
+        assert hash_set.add_new(hashes).tolist() == expected
+    assert len(hash_set) == len(seen)
+    assert hash_set.contains(np.array(sorted(seen), dtype=np.uint64)).all()
+
+
+def test_minhash_finds_templated_reviews():
+    template = "this coffee is great and i would buy it again for my whole family {}"
+    unrelated = "terrible customer service, the package arrived broken and nobody answered my emails"
+    minhasher = MinHasher()
+    keys = minhasher.band_keys([template.format("today"), template.format("tomorrow"), unrelated])
+
+    assert len(set(keys[0]) & set(keys[1])) > 0
+    assert len(set(keys[0]) & set(keys[2])) == 0
+
+
+def test_deduplicator_counts():
+    texts = pd.Series(["a b c d e f", "a b c d e f", "x y z w v u", "a b c d e f g"])
+    dedup = Deduplicator(near_dup=True)
+
+    keep = dedup.keep_exact(text_hashes(texts))
+    assert keep.tolist() == [True, False, True, True]
+    keep[keep] = dedup.keep_near(MinHasher().band_keys(texts[keep].tolist()))
+    assert keep.tolist() == [True, False, True, False]
+    assert dedup.report() == {"rows": 4, "exact_duplicates": 1, "near_duplicates": 1}
+
+
+def test_hash_set_keeps_few_sorted_runs():
+    hash_set = HashSet()
+    for start in range(0, 100_000, 1000):
+        hash_set.add_new(np.arange(start, start + 1000, dtype=np.uint64)[::-1])
+    assert len(hash_set) == 100_000
+    assert len(hash_set._runs) <= 17
+    assert all(np.all(np.diff(run.astype(np.int64)) > 0) for run in hash_set._runs)
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.inference import InferenceExecutor, InferenceQueueFull
+
+
+def test_executor_runs_off_the_event_loop():
+    executor = InferenceExecutor("test", max_workers=1, max_queue=4)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        worker_thread, _ = await asyncio.gather(
+            executor.run(lambda: time.sleep(0.1) or threading.get_ident()), ticker()
+        )
+        assert worker_thread != loop_thread
+        assert len(ticks) == 5
+
+    asyncio.run(main())
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["avg_run_ms"] >= 100
+
+
+def test_executor_rejects_when_queue_is_full():
+    executor = InferenceExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        second = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: "rejected")
+
+        stats = executor.stats()
+        assert stats["running"] == 1 and stats["queued"] == 1 and stats["rejected"] == 1
+        release.set()
+        assert await second == "queued"
+        await first
+
+    asyncio.run(main())
+    stats = executor.stats()
+    assert stats["completed"] == 2
+    assert stats["max_queue_wait_ms"] >= 40
+
+
+def test_cancelled_request_keeps_its_slot_until_the_call_ends():
+    executor = InferenceExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def main():
+        task = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.01)
+        # The model call is still running in the pool, so there is no free slot.
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: "rejected")
+        release.set()
+        for _ in range(100):
+            stats = executor.stats()
+            if stats["running"] == 0 and stats["queued"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert await executor.run(lambda: "admitted") == "admitted"
+
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from app.core.model_registry import ModelNotReady, ModelRegistry
+
+
+def test_lazy_loading():
+    calls = []
+    registry = ModelRegistry()
+    registry.register("model", lambda: calls.append(1) or "weights")
+
+    assert registry.status()["model"]["state"] == "not_loaded"
+    assert registry.get("model") == "weights"
+    assert registry.get("model") == "weights"
+    assert calls == [1]
+
+    status = registry.status()["model"]
+    assert status["state"] == "ready"
+    assert status["load_seconds"] >= 0
+
+
+def test_background_loading():
+    release = threading.Event()
+    registry = ModelRegistry()
+    registry.register("slow", lambda: release.wait() and "weights")
+
+    registry.start_background()
+    with pytest.raises(ModelNotReady):
+        registry.get("slow")
+    assert not registry.is_ready("slow")
+
+    release.set()
+    assert registry.load("slow") == "weights"
+    assert registry.is_ready("slow")
+
+
+def test_failed_loading():
+    def loader():
+        raise OSError("missing weights")
+
+    registry = ModelRegistry()
+    registry.register("broken", loader)
+
+    with pytest.raises(ModelNotReady):
+        registry.get("broken")
+    status = registry.status()["broken"]
+    assert status["state"] == "failed"
+    assert "missing weights" in status["error"]
+    with pytest.raises(ModelNotReady):
+        registry.get("broken")
+
+
+def test_all_ready():
+    release = threading.Event()
+    registry = ModelRegistry()
+    registry.register("fast", lambda: "weights")
+    registry.register("slow", lambda: release.wait() and "weights")
+
+    assert not registry.all_ready()
+    assert registry.all_ready(lazy=True)
+
+    registry.start_background(["slow"])
+    assert not registry.all_ready(lazy=True)
+    release.set()
+    registry.load("slow")
+    registry.get("fast")
+    assert registry.all_ready()
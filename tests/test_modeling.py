@@ -9,6 +9,7 @@ from modeling import (
     BertForSentimentClassification,
     AlbertForSentimentClassification,
     DistilBertForSentimentClassification,
+    BertForSentimentAndHelpfulness,
 )
 
 
@@ -33,3 +34,12 @@ def test_distilbert():
     assert isinstance(model, DistilBertForSentimentClassification)
     assert isinstance(model, DistilBertPreTrainedModel)
     assert isinstance(model, nn.Module)
+
+
+def test_bert_sentiment_and_helpfulness():
+    model = BertForSentimentAndHelpfulness.from_pretrained(
+        "bert-base-uncased", num_labels=3
+    )
+    assert isinstance(model, BertForSentimentAndHelpfulness)
+    assert isinstance(model, BertPreTrainedModel)
+    assert model.help_layer.out_features == 3
@@ -0,0 +1,66 @@
+import argparse
+
+import pytest
+import torch
+from transformers import BertTokenizerFast, DistilBertConfig, DistilBertForSequenceClassification
+
+from analyzer import Analyzer
+from modeling import BertForSentimentClassification
+
+# These modules import onnxruntime, so they can only be imported once the skip guard has run.
+pytest.importorskip("onnxruntime")
+
+from export_onnx import LogitsOnly, export_model  # noqa: E402
+from onnx_backend import ONNX_FILENAME, OnnxClassifier  # noqa: E402
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "a", "great", "bad", "movie", "plot", "not"]
+TEXTS = ["great movie", "a bad , bad plot", "not great", "movie"]
+
+
+def test_onnx_analyzer_matches_torch(tmp_path, tiny_bert):
+    torch_dir, onnx_dir = tmp_path / "torch", tmp_path / "onnx"
+    torch_dir.mkdir()
+    onnx_dir.mkdir()
+    model, _ = tiny_bert(WORDS, BertForSentimentClassification, path=torch_dir)
+    export_model(model, str(onnx_dir / ONNX_FILENAME))
+    model.config.save_pretrained(str(onnx_dir))
+    BertTokenizerFast.from_pretrained(str(torch_dir)).save_pretrained(str(onnx_dir))
+
+    torch_analyzer = Analyzer(
+        will_train=False, args=argparse.Namespace(model_name_or_path=str(torch_dir), output_dir=None)
+    )
+    onnx_analyzer = Analyzer(
+        will_train=False,
+        args=argparse.Namespace(model_name_or_path=str(onnx_dir), output_dir=None, backend="onnx"),
+    )
+    assert isinstance(onnx_analyzer.model, OnnxClassifier)
+
+    # Padded batches of different lengths exercise the dynamic axes.
+    enc = torch_analyzer.tokenizer(TEXTS, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        expected = torch_analyzer.model(input_ids=enc["input_ids"], attention_mask=enc["attention_mask"])
+    actual = onnx_analyzer.model(input_ids=enc["input_ids"], attention_mask=enc["attention_mask"])
+    assert actual.shape == expected.shape
+    assert torch.allclose(actual, expected, atol=1e-4)
+
+    assert list(onnx_analyzer.classify_sentiment_batch(TEXTS, batch_size=3)) == list(
+        torch_analyzer.classify_sentiment_batch(TEXTS, batch_size=3)
+    )
+
+
+def test_export_helpfulness_classifier(tmp_path):
+    torch.manual_seed(0)
+    config = DistilBertConfig(
+        vocab_size=len(WORDS), dim=32, n_layers=2, n_heads=2, hidden_dim=64, num_labels=3
+    )
+    model = LogitsOnly(DistilBertForSequenceClassification(config)).eval()
+    export_model(model, str(tmp_path / ONNX_FILENAME))
+
+    input_ids = torch.randint(5, len(WORDS), (3, 7))
+    attention_mask = torch.ones_like(input_ids)
+    attention_mask[0, 4:] = 0
+    with torch.no_grad():
+        expected = model(input_ids, attention_mask)
+    actual = OnnxClassifier(str(tmp_path))(input_ids=input_ids, attention_mask=attention_mask)
+    assert actual.shape == (3, 3)
+    assert torch.allclose(actual, expected, atol=1e-4)
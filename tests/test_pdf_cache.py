@@ -0,0 +1,28 @@
+import os
+
+from app.core.pdf_cache import PdfTextCache
+
+
+def test_pdf_cache(tmp_path):
+    cache = PdfTextCache(cache_dir=tmp_path, max_bytes=10)
+
+    key = PdfTextCache.make_key(b"%PDF-1.4 a", "v1")
+    assert key == PdfTextCache.make_key(b"%PDF-1.4 a", "v1")
+    assert key != PdfTextCache.make_key(b"%PDF-1.4 a", "v2")
+    assert cache.get(key) is None
+
+    cache.put(key, "hello")
+    assert key in cache
+    assert cache.get(key) == "hello"
+
+    other = PdfTextCache.make_key(b"%PDF-1.4 b", "v1")
+    os.utime(tmp_path / f"{key}.txt", (0, 0))
+    cache.put(other, "world!")
+    assert key not in cache
+    assert cache.get(other) == "world!"
+
+
+def test_pdf_cache_rejects_bad_keys(tmp_path):
+    cache = PdfTextCache(cache_dir=tmp_path)
+    assert cache.get("../../etc/passwd") is None
+    assert "../secret" not in cache
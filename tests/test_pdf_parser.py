@@ -0,0 +1,56 @@
+import re
+
+import fitz
+import pytest
+from fastapi import HTTPException
+
+from app.core import pdf_parser
+from app.core.pdf_parser import extract_text_from_bytes, iter_pdf_pages
+
+
+def make_pdf(page_texts):
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def test_iter_pdf_pages():
+    pdf_bytes = make_pdf(["The first page text.", "", "The third page text."])
+
+    pages = list(iter_pdf_pages(pdf_bytes))
+    assert pages == [(1, "The first page text."), (3, "The third page text.")]
+
+    joined = "\n\n".join(f"--- Page {n} ---\n\n{text}" for n, text in pages)
+    assert joined == extract_text_from_bytes(pdf_bytes, workers=1)
+
+
+def test_iter_pdf_pages_raises_parse_errors():
+    with pytest.raises(HTTPException) as e:
+        list(iter_pdf_pages(b"not a pdf"))
+    assert e.value.detail.startswith("Text extraction error")
+
+
+def test_parallel_extraction_keeps_page_order(monkeypatch):
+    num_pages = 3 * pdf_parser.MIN_PAGES_PER_WORKER + 1
+    pdf_bytes = make_pdf([f"Text of page number {n}." for n in range(1, num_pages + 1)])
+    ranges = []
+    extract_parallel = pdf_parser._extract_pages_parallel
+
+    def spy(pdf_bytes, page_count, num_ranges):
+        ranges.append(num_ranges)
+        return extract_parallel(pdf_bytes, page_count, num_ranges)
+
+    monkeypatch.setattr(pdf_parser, "_extract_pages_parallel", spy)
+
+    single = extract_text_from_bytes(pdf_bytes, workers=1)
+    parallel = extract_text_from_bytes(pdf_bytes, workers=3)
+
+    assert ranges == [3]
+    assert parallel == single
+    markers = [int(n) for n in re.findall(r"^--- Page (\d+) ---$", parallel, re.MULTILINE)]
+    assert markers == list(range(1, num_pages + 1))
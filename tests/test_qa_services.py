@@ -0,0 +1,196 @@
+import threading
+import tracemalloc
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from transformers import BertForQuestionAnswering
+
+from app.qa_module import services
+from app.qa_module.router import router
+from app.qa_module.session import DocumentReader
+
+
+class FakeReader:
+    """
+    Finds "answer" at the start of every chunk, each time with a higher score.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def answer(self, question, context, top_k=3, max_answer_len=200, cache=True):
+        self.calls += 1
+        start = context.find("answer")
+        if start < 0:
+            return []
+        return [{"score": 0.1 + 0.01 * self.calls, "start": start, "end": start + 6, "answer": "answer"}]
+
+
+class NeedleReader:
+    """
+    Finds the needle with a fixed score in every chunk that contains it; keeps the chunks it was given.
+    """
+
+    def __init__(self, needle, score=0.5):
+        self.needle = needle
+        self.score = score
+        self.chunks = []
+
+    def answer(self, question, context, top_k=3, max_answer_len=200, cache=True):
+        self.chunks.append(context)
+        start = context.find(self.needle)
+        if start < 0:
+            return []
+        return [{"score": self.score, "start": start, "end": start + len(self.needle), "answer": self.needle}]
+
+
+def join_pages(pages):
+    return "\n\n".join(f"--- Page {page_num} ---\n\n{text}" for page_num, text in pages)
+
+
+def use_reader(monkeypatch, reader, chunk_size, overlap):
+    monkeypatch.setattr(services, "get_reader", lambda: reader)
+    monkeypatch.setattr(services, "MAX_CONTEXT_CHARS", chunk_size)
+    monkeypatch.setattr(services, "STREAM_OVERLAP_CHARS", overlap)
+
+
+def test_stream_releases_old_buffers(monkeypatch, tiny_bert):
+    chunk_size = 5_000
+    model, tokenizer = tiny_bert(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "an", "answer", ".", "x"],
+                                 BertForQuestionAnswering)
+    reader = DocumentReader(model, tokenizer, max_seq_len=128, doc_stride=48)
+    use_reader(monkeypatch, reader, chunk_size, 1000)
+    peaks = []
+
+    def pages():
+        for page_num in range(1, 13):
+            yield page_num, "an answer . " + "x " * (chunk_size // 2)
+            peaks.append(tracemalloc.get_traced_memory()[0])
+
+    tracemalloc.start()
+    try:
+        result = services.find_answer_in_stream("answer ?", pages(), top_k=3)
+    finally:
+        tracemalloc.stop()
+
+    assert result["candidates"]
+    # Chunks are tokenized without being cached, so only a few buffers and their sessions
+    # (tens of bytes per character) are alive at any time; caching them grows past 1000x.
+    assert len(reader._sessions) == 0
+    assert max(peaks) < 200 * chunk_size
+
+
+def test_stream_chunks_overlap_and_map_spans_to_pages(monkeypatch):
+    chunk_size, overlap = 100, 20
+    reader = NeedleReader("needle")
+    use_reader(monkeypatch, reader, chunk_size, overlap)
+    pages = [(n, f"Page {n} says hello. " * 4) for n in range(1, 6)]
+    pages[2] = (3, "Some text first. The needle is here. " * 2)
+    text = join_pages(pages)
+
+    result = services.find_answer_in_stream("Where?", iter(pages))
+
+    step = chunk_size - overlap
+    for i, chunk in enumerate(reader.chunks):
+        assert chunk == text[i * step : i * step + chunk_size]
+    assert len(reader.chunks[-1]) < chunk_size
+    assert (len(reader.chunks) - 1) * step + len(reader.chunks[-1]) == len(text)
+
+    # A span found again in the overlap of two chunks is kept once.
+    starts = [c["start"] for c in result["candidates"]]
+    assert sorted(starts) == [i for i in range(len(text)) if text.startswith("needle", i)]
+    assert all(c["page"] == 3 for c in result["candidates"])
+    assert result["answer"] == "The needle is here."
+
+
+def test_stream_stops_at_confidence_threshold(monkeypatch):
+    use_reader(monkeypatch, NeedleReader("needle", score=0.9), 100, 20)
+    consumed = []
+    closed = []
+
+    def pages():
+        try:
+            for page_num in range(1, 11):
+                consumed.append(page_num)
+                text = "The needle is here. " if page_num == 2 else "Nothing to see. "
+                yield page_num, text * 10
+        finally:
+            closed.append(True)
+
+    result = services.find_answer_in_stream("Where?", pages(), confidence_threshold=0.8)
+    assert result["answer"] == "The needle is here."
+    assert consumed == [1, 2]
+    assert closed == [True]
+
+    consumed.clear()
+    services.find_answer_in_stream("Where?", pages(), confidence_threshold=0.95)
+    assert consumed == list(range(1, 11))
+
+
+def test_stream_expands_answers_past_the_chunk_end(monkeypatch):
+    chunk_size = 100
+    use_reader(monkeypatch, NeedleReader("needle"), chunk_size, 20)
+    sentence = "The needle " + "goes on " * 30 + "and ends here."
+    pages = [(1, "Intro. " + sentence + " Outro.")]
+    assert join_pages(pages).index("ends here.") > chunk_size
+
+    result = services.find_answer_in_stream("Where?", iter(pages))
+    assert result["answer"] == sentence
+    assert all(c["sentence"] == sentence for c in result["candidates"])
+
+
+def test_stream_reports_parse_errors(monkeypatch):
+    use_reader(monkeypatch, NeedleReader("needle"), 100, 20)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    response = client.post(
+        "/ask-pdf",
+        data={"question": "q", "stream": "true"},
+        files={"file": ("broken.pdf", b"not a pdf", "application/pdf")},
+    )
+    assert response.status_code == 200
+    assert response.json()["error"].startswith("Text extraction error")
+
+
+def test_top_k_is_validated():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    for top_k in (0, -1, services.MAX_TOP_K_ANSWERS + 1):
+        response = client.post("/ask", data={"question": "q", "document_id": "x", "top_k": top_k})
+        assert response.status_code == 422
+
+
+def test_document_indexes_are_thread_safe():
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(200):
+                text = f"Document {(seed * 7 + i) % 40}. It has one sentence."
+                services.get_passage_index(text)
+                services.get_sentence_index(text)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(services._passage_indexes) <= services.MAX_CACHED_INDEXES
+    assert len(services._sentence_indexes) <= services.MAX_CACHED_INDEXES
+
+
+def test_ask_many_top_k_is_validated():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    for top_k in (0, -2):
+        response = client.post("/ask-many", data={"questions": ["q"], "document_id": "x", "top_k": top_k})
+        assert response.status_code == 422
+    response = client.post("/ask-many", data={"questions": ["q"], "document_id": "x", "top_k": 2})
+    assert response.json() == {"error": "Unknown or expired document_id. Please upload the PDF again."}
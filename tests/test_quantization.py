@@ -0,0 +1,32 @@
+import pytest
+import torch
+import torch.nn as nn
+
+from quantization import quantize_model
+
+
+def make_model():
+    torch.manual_seed(0)
+    return nn.Sequential(nn.Linear(16, 32), nn.ReLU(), nn.Linear(32, 1)).eval()
+
+
+def test_quantize_model_int8():
+    model = make_model()
+    x = torch.randn(4, 16)
+    expected = model(x)
+
+    quantized = quantize_model(make_model(), "int8")
+    assert not any(type(m) is nn.Linear for m in quantized.modules())
+    assert torch.allclose(quantized(x), expected, atol=0.05)
+
+
+def test_quantize_model_bf16():
+    model = quantize_model(make_model(), "bf16")
+    assert all(p.dtype == torch.bfloat16 for p in model.parameters())
+
+
+def test_quantize_model_modes():
+    model = make_model()
+    assert quantize_model(model, "none") is model
+    with pytest.raises(ValueError):
+        quantize_model(model, "int4")
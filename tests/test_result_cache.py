@@ -0,0 +1,76 @@
+import time
+
+import transformers.utils
+
+from result_cache import ResultCache, model_fingerprint, normalize_text
+
+
+def test_normalized_text_shares_entry():
+    cache = ResultCache("model-a")
+    cache.put("Great   product!\n", ["Positive", 97])
+
+    assert normalize_text(" Great product! ") == "Great product!"
+    assert cache.get("Great product!") == ["Positive", 97]
+    assert cache.get("great product!") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResultCache("model-a", max_entries=2, ttl_seconds=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_fingerprint_invalidates(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    before = model_fingerprint(str(tmp_path), "int8")
+    assert model_fingerprint(str(tmp_path), "none") != before
+
+    (tmp_path / "pytorch_model.bin").write_bytes(b"weights")
+    after = model_fingerprint(str(tmp_path), "int8")
+    assert after != before
+
+    ResultCache(before).put("text", 1)
+    assert ResultCache(after).get("text") is None
+
+
+def test_disk_cache_is_shared(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    ResultCache("model-a", disk_path=path).put("hello", ["Positive", 90])
+
+    other = ResultCache("model-a", disk_path=path)
+    assert other.get("hello") == ["Positive", 90]
+    assert other.stats()["disk_hits"] == 1
+    assert ResultCache("model-b", disk_path=path).get("hello") is None
+
+    calls = []
+    assert other.get_or_compute("new", lambda text: calls.append(text) or 5) == 5
+    assert other.get_or_compute("new", lambda text: calls.append(text) or 5) == 5
+    assert calls == ["new"]
+
+
+def test_fingerprint_follows_hub_revisions(tmp_path, monkeypatch):
+    snapshots = tmp_path / "models--org--model" / "snapshots"
+    for revision in ("abc123", "def456"):
+        (snapshots / revision).mkdir(parents=True)
+        (snapshots / revision / "config.json").write_text("{}")
+    revision = "abc123"
+    monkeypatch.setattr(
+        transformers.utils, "cached_file", lambda model_id, name: str(snapshots / revision / name)
+    )
+
+    before = model_fingerprint("org/model", "none")
+    assert model_fingerprint("org/model", "none") == before
+    revision = "def456"
+    assert model_fingerprint("org/model", "none") != before
@@ -0,0 +1,29 @@
+from app.qa_module.retrieval import PassageIndex
+
+
+def test_passage_index():
+    filler = " ".join(f"word{i}" for i in range(400))
+    text = filler + " The Eiffel Tower is located in Paris. " + filler
+    index = PassageIndex(text, passage_words=50, overlap=10)
+
+    assert len(index) > 10
+    start, end = index.passages[0]
+    assert text[start:end].startswith("word0")
+    assert index.passages[-1][1] == len(text)
+
+    results = index.search("Where is the Eiffel Tower?", top_k=2)
+    assert 1 <= len(results) <= 2
+    best_start, best_end = index.passages[results[0][0]]
+    assert "Eiffel Tower" in text[best_start:best_end]
+
+    spans = index.spans([pid for pid, _ in results])
+    assert spans == sorted(spans)
+    assert all(a[1] < b[0] for a, b in zip(spans, spans[1:]))
+
+    assert index.search("nonexistent", top_k=3) == []
+
+
+def test_passage_index_empty():
+    index = PassageIndex("")
+    assert len(index) == 0
+    assert index.search("anything", top_k=3) == []
@@ -0,0 +1,49 @@
+import random
+
+import torch
+
+from sampling import BucketBatchSampler, padding_report, trim_padding_collate
+
+
+def test_bucket_batch_sampler_covers_every_index():
+    rng = random.Random(0)
+    lengths = [rng.randint(3, 256) for _ in range(1000)]
+    sampler = BucketBatchSampler(lengths, batch_size=16, bucket_multiplier=10)
+
+    first = list(sampler)
+    second = list(sampler)
+    assert len(first) == len(sampler)
+    assert sorted(i for batch in first for i in batch) == list(range(1000))
+    assert first != second
+    assert first == sampler.batches(0)
+
+    bucketed = padding_report(first, lengths, fixed_len=256)
+    sequential = padding_report([list(range(i, min(i + 16, 1000))) for i in range(0, 1000, 16)], lengths)
+    assert bucketed["real_tokens"] == sum(lengths)
+    assert bucketed["padding_waste"] < sequential["padding_waste"] < bucketed["fixed_padding_waste"]
+
+
+def test_bucket_batch_sampler_without_shuffle_is_sorted_and_deterministic():
+    lengths = [5, 1, 4, 2, 3, 6]
+    sampler = BucketBatchSampler(lengths, batch_size=2, shuffle=False)
+    assert list(sampler) == [[1, 3], [4, 2], [0, 5]]
+    assert list(sampler) == [[1, 3], [4, 2], [0, 5]]
+
+
+def test_trim_padding_collate():
+    items = [
+        (torch.tensor([2, 7, 3, 0, 0]), torch.tensor([1, 1, 1, 0, 0]), 1),
+        (torch.tensor([2, 3, 0, 0, 0]), torch.tensor([1, 1, 0, 0, 0]), 0),
+    ]
+    input_ids, attention_mask, labels = trim_padding_collate(items)
+    assert input_ids.tolist() == [[2, 7, 3], [2, 3, 0]]
+    assert attention_mask.shape == (2, 3)
+    assert labels.tolist() == [1, 0]
+
+    dicts = [
+        {"input_ids": ids, "attention_mask": mask, "labels": torch.tensor(label)}
+        for ids, mask, label in items
+    ]
+    batch = trim_padding_collate(dicts)
+    assert batch["input_ids"].shape == (2, 3)
+    assert batch["labels"].tolist() == [1, 0]
@@ -0,0 +1,47 @@
+from app.qa_module.sentences import SentenceIndex
+
+TEXT = (
+    "Dr. Smith paid $3.50 for the book. It was written by J. R. Tolkien in the U.S. "
+    "version, e.g. the first edition! Was it good? \"Yes.\" The end"
+)
+
+
+def span_of(text, phrase):
+    start = text.index(phrase)
+    return start, start + len(phrase)
+
+
+def test_sentence_boundaries():
+    index = SentenceIndex(TEXT)
+    assert index.sentence(*span_of(TEXT, "$3.50")) == "Dr. Smith paid $3.50 for the book."
+    assert index.sentence(*span_of(TEXT, "Tolkien")) == (
+        "It was written by J. R. Tolkien in the U.S. version, e.g. the first edition!"
+    )
+    assert index.sentence(*span_of(TEXT, "good")) == "Was it good?"
+    assert index.sentence(*span_of(TEXT, "Yes")) == "\"Yes.\""
+    assert index.sentence(*span_of(TEXT, "end")) == "The end"
+    assert len(index) == 5
+
+
+def test_sentence_span_edges():
+    text = "First one. Second one."
+    index = SentenceIndex(text)
+    # An answer that ends on the period stays in its own sentence.
+    assert index.sentence(*span_of(text, "First one.")) == "First one."
+    assert index.sentence(*span_of(text, "one. Second")) == text
+    assert index.span(0, 0) == (0, len("First one."))
+    assert SentenceIndex("").sentence(0, 0) == ""
+
+
+def test_sentences_stop_at_blank_lines():
+    text = "--- Page 1 ---\n\nIntroduction\n\nThe model is small. It runs fast"
+    index = SentenceIndex(text)
+    assert index.sentence(*span_of(text, "Introduction")) == "Introduction"
+    assert index.sentence(*span_of(text, "small")) == "The model is small."
+    assert index.sentence(*span_of(text, "fast")) == "It runs fast"
+
+
+def test_long_tokens_are_linear():
+    text = "x" * 200_000 + ". Next sentence."
+    index = SentenceIndex(text)
+    assert index.boundaries == [200_001, len(text)]
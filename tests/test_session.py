@@ -0,0 +1,91 @@
+from transformers import BertForQuestionAnswering, pipeline
+
+from app.qa_module.session import DocumentReader, DocumentSession
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "the", "cat", "sat", "on", "mat",
+         "where", "is", "a", "dog", ".", "?", "paris", "tower"]
+CONTEXT = "the cat sat on the mat . where is the dog ? paris tower is a tower ."
+
+
+def test_document_session_windows(tiny_bert):
+    _, tokenizer = tiny_bert(WORDS)
+    session = DocumentSession(" ".join([CONTEXT] * 50), tokenizer, max_seq_len=64, doc_stride=16, max_question_len=8)
+
+    assert session.windows[0][0] == 0
+    assert session.windows[-1][1] == len(session)
+    assert all(end - start <= session.window_len for start, end in session.windows)
+    assert all(b[0] < a[1] for a, b in zip(session.windows, session.windows[1:]))
+
+    features = session.features("where is the cat ?")
+    assert len(features) == len(session.windows)
+    assert all(len(f["input_ids"]) <= 64 for f in features)
+
+
+def test_document_reader_matches_pipeline(tiny_bert):
+    model, tokenizer = tiny_bert(WORDS, BertForQuestionAnswering)
+    qa = pipeline("question-answering", model=model, tokenizer=tokenizer, device=-1)
+    reader = DocumentReader(model, tokenizer)
+
+    question = "where is the cat ?"
+    expected = qa(question=question, context=CONTEXT, top_k=3, max_answer_len=200,
+                  handle_impossible_answer=True)
+    answers = reader.answer(question, CONTEXT, top_k=3, max_answer_len=200)
+
+    assert [(a["start"], a["end"], a["answer"]) for a in answers] == \
+        [(a["start"], a["end"], a["answer"]) for a in expected]
+    for a, b in zip(answers, expected):
+        assert abs(a["score"] - b["score"]) < 1e-6
+
+    assert reader.session(CONTEXT) is reader.session(CONTEXT)
+
+
+def test_document_reader_evicts_sessions(tiny_bert):
+    model, tokenizer = tiny_bert(WORDS, BertForQuestionAnswering)
+    reader = DocumentReader(model, tokenizer, max_cached_tokens=20)
+
+    first = reader.session(CONTEXT)
+    reader.session("the dog sat on the mat .")
+    assert reader.session(CONTEXT) is not first
+
+
+def test_document_reader_can_skip_the_cache(tiny_bert):
+    model, tokenizer = tiny_bert(WORDS, BertForQuestionAnswering)
+    reader = DocumentReader(model, tokenizer)
+
+    cached = reader.answer("where is the cat ?", CONTEXT)
+    chunk = "the dog sat on the mat ."
+    reader.answer("where is the dog ?", chunk, cache=False)
+    assert len(reader._sessions) == 1
+    assert reader._cached_tokens == len(reader.session(CONTEXT))
+
+    # A cached session is still used when the text is asked about without caching.
+    assert reader.session(CONTEXT, cache=False) is reader.session(CONTEXT)
+    assert reader.answer("where is the cat ?", CONTEXT, cache=False) == cached
+
+def test_document_reader_answer_many(tiny_bert):
+    model, tokenizer = tiny_bert(WORDS, BertForQuestionAnswering)
+    reader = DocumentReader(model, tokenizer, batch_size=4)
+    context = " ".join([CONTEXT] * 40)
+    questions = ["where is the cat ?", "where is the dog ?", "paris ?"]
+
+    many = reader.answer_many(questions, context)
+    assert len(many) == len(questions)
+    for question, answers in zip(questions, many):
+        single = reader.answer(question, context)
+        assert [a["answer"] for a in answers] == [a["answer"] for a in single]
+        for a, b in zip(answers, single):
+            assert abs(a["score"] - b["score"]) < 1e-5
+
+
+def test_document_reader_dedupes_overlapping_spans(tiny_bert):
+    model, tokenizer = tiny_bert(WORDS, BertForQuestionAnswering)
+    context = " ".join([CONTEXT] * 40)
+    wide = DocumentReader(model, tokenizer, max_seq_len=128, doc_stride=48, dedupe_spans=True)
+    narrow = DocumentReader(model, tokenizer, max_seq_len=128, doc_stride=8, dedupe_spans=True)
+    assert len(narrow.session(context).windows) < len(wide.session(context).windows)
+
+    answers = wide.answer("where is the cat ?", context, top_k=10)
+    spans = [(a["start"], a["end"]) for a in answers if a["answer"]]
+    assert len(spans) == len(set(spans))
+    # Each score is one window's probability, not a sum over the windows that saw the span.
+    assert all(a["score"] <= 1.0 for a in answers)
@@ -0,0 +1,37 @@
+from app.qa_module.spans import PageIndex, SpanMerger
+
+
+def span(start, end, score):
+    return {"start": start, "end": end, "score": score, "answer": "x" * (end - start)}
+
+
+def test_span_merger_keeps_best_of_overlapping_spans():
+    merger = SpanMerger(top_k=3)
+    assert merger.add(span(10, 20, 0.4))
+    assert not merger.add(span(10, 20, 0.3))   # same span from an overlapping window
+    assert merger.add(span(12, 25, 0.6))       # overlaps and scores higher: replaces it
+    assert not merger.add(span(0, 0, 0.9))     # no-answer span
+    assert len(merger) == 1
+
+    merger.add(span(30, 35, 0.2))
+    merger.add(span(40, 45, 0.1))
+    assert merger.add(span(50, 55, 0.3))       # the heap stays at top_k, dropping 0.1
+    assert not merger.add(span(60, 65, 0.05))
+    assert [(c["start"], c["score"]) for c in merger.ranked()] == [(12, 0.6), (50, 0.3), (30, 0.2)]
+    assert merger.best()["start"] == 12
+
+
+def test_span_merger_replaces_several_spans():
+    merger = SpanMerger(top_k=5)
+    merger.add(span(0, 10, 0.2))
+    merger.add(span(20, 30, 0.3))
+    assert merger.add(span(5, 25, 0.5))
+    assert [(c["start"], c["end"]) for c in merger.ranked()] == [(5, 25)]
+
+
+def test_page_index():
+    text = "--- Page 1 ---\n\nfirst page\n\n--- Page 3 ---\n\nthird page"
+    pages = PageIndex(text)
+    assert pages.page_at(text.index("first")) == 1
+    assert pages.page_at(text.index("third")) == 3
+    assert PageIndex("no markers").page_at(3) is None
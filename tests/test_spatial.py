@@ -0,0 +1,35 @@
+import random
+
+from app.core.spatial import RectIndex
+
+
+def brute_force(rects, box):
+    x0, y0, x1, y1 = box
+    if x0 >= x1 or y0 >= y1:
+        return False
+    return any(x0 < r[2] and r[0] < x1 and y0 < r[3] and r[1] < y1 for r in rects)
+
+
+def random_rect(rng):
+    x0, y0 = rng.uniform(-20, 600), rng.uniform(-20, 800)
+    return (x0, y0, x0 + rng.uniform(0, 150), y0 + rng.uniform(0, 150))
+
+
+def test_rect_index_matches_brute_force():
+    rng = random.Random(0)
+    rects = [random_rect(rng) for _ in range(300)]
+    index = RectIndex(rects, cell_size=32)
+    assert len(index) <= len(rects)
+
+    for _ in range(2000):
+        box = random_rect(rng)
+        assert index.intersects(box) == brute_force(rects, box)
+
+
+def test_rect_index_edges_and_containment():
+    index = RectIndex([(0, 0, 100, 100), (10, 10, 20, 20), (0, 0, 100, 100)])
+    assert len(index) == 1
+    assert index.intersects((50, 50, 60, 60))
+    assert not index.intersects((100, 0, 150, 50))
+    assert not index.intersects((200, 200, 300, 300))
+    assert not index.intersects((50, 50, 50, 60))
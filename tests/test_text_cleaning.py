@@ -0,0 +1,42 @@
+import random
+import re
+
+from app.core.text_cleaning import TextCleaner
+
+
+# The cleaning loop pdf_parser used before TextCleaner.
+def legacy_clean(blocks):
+    exclude_patterns = [
+        re.compile(r'arXiv:\d+\.\d+v\d+', re.IGNORECASE),
+        re.compile(r'^\d+$'),
+        re.compile(r'^(Figure|Fig\.|Table|Tab\.)\s*\d+', re.IGNORECASE)
+    ]
+    kept = []
+    for text in blocks:
+        text = re.sub(r'-\s*\n\s*', '', text)
+        text = re.sub(r'([a-z])\s*\n\s*([a-z])', r'\1 \2', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        if not any(p.search(text) for p in exclude_patterns) and len(text) >= 3:
+            kept.append(text)
+    return kept
+
+
+def test_clean_block():
+    cleaner = TextCleaner()
+    assert cleaner.clean("  informa-\n  tion\tretrieval \n systems ") == "information retrieval systems"
+    assert cleaner.clean("one line, no breaks") == "one line, no breaks"
+    assert cleaner.clean("state-of-the-art\nmodels") == "state-of-the-art models"
+
+
+def test_exclude_and_min_length():
+    cleaner = TextCleaner()
+    blocks = ["12\n", "arXiv:2101.00001v2 [cs.CL]", "Fig. 3: Results", "TABLE 2 Scores", "ok", "Kept text."]
+    assert cleaner.clean_blocks(blocks) == ["Kept text."]
+    assert TextCleaner(exclude_patterns=(), min_chars=0).clean_blocks(["12", "ok"]) == ["12", "ok"]
+
+
+def test_matches_previous_rules():
+    rng = random.Random(0)
+    pieces = ["word", "Word", "-", "\n", " ", "\t", "-\n", "7", "Table 1", "arXiv:1234.5678v1", "é", " "]
+    blocks = ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) for _ in range(2000)]
+    assert TextCleaner().clean_blocks(blocks) == legacy_clean(blocks)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from transformers import BertTokenizerFast
+
+from dataset import SSTDataset
+from helpfulness_dataset import HelpfulnessDataset
+from token_store import TokenStore, tokenize_texts
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "a", "great", "bad", "movie", "plot",
+         "not", "very", "the", "story", "helps", "!"]
+TEXTS = ["a great movie !", "bad", "not a very very very great plot , the story", "the story helps"]
+
+
+def test_token_store_roundtrip(tmp_path, tiny_bert):
+    _, tokenizer = tiny_bert(WORDS)
+    store = TokenStore.write(
+        str(tmp_path / "store"), tokenize_texts(TEXTS, tokenizer, batch_size=3), [1, 0, 0, 1], tokenizer
+    )
+    reopened = TokenStore(str(tmp_path / "store"))
+
+    assert len(reopened) == len(TEXTS)
+    assert isinstance(reopened.ids, np.memmap)
+    for i, text in enumerate(TEXTS):
+        assert reopened.example(i).tolist() == tokenizer(text, add_special_tokens=False)["input_ids"]
+    assert reopened.lengths().tolist() == [len(store.example(i)) for i in range(len(TEXTS))]
+
+
+def test_sst_dataset_from_store_matches_tokenizer(tmp_path, tiny_bert):
+    _, tokenizer = tiny_bert(WORDS)
+    pd.DataFrame({"sentence": TEXTS, "label": [1, 0, 0, 1]}).to_csv(
+        tmp_path / "train.tsv", sep="\t", index=False
+    )
+    TokenStore.write(str(tmp_path / "store"), tokenize_texts(TEXTS, tokenizer), [1, 0, 0, 1], tokenizer)
+
+    for maxlen in (4, 6, 30):
+        plain = SSTDataset(str(tmp_path / "train.tsv"), maxlen, tokenizer)
+        stored = SSTDataset(None, maxlen, tokenizer, token_store=str(tmp_path / "store"))
+        assert len(stored) == len(plain)
+        for i in range(len(plain)):
+            for expected, actual in zip(plain[i][:2], stored[i][:2]):
+                assert torch.equal(expected, actual)
+            assert stored[i][2] == plain[i][2]
+
+
+def test_helpfulness_dataset_from_store_matches_tokenizer(tmp_path, tiny_bert):
+    _, tokenizer = tiny_bert(WORDS)
+    labels = ["helpful", "unhelpful", "creative", "helpful"]
+    pd.DataFrame({"text": TEXTS, "label": labels}).to_csv(tmp_path / "train.csv", index=False)
+    label_list = ["helpful", "creative", "unhelpful"]
+    TokenStore.write(
+        str(tmp_path / "store"), tokenize_texts(TEXTS, tokenizer),
+        [label_list.index(label) for label in labels], tokenizer, label_list=label_list,
+    )
+
+    plain = HelpfulnessDataset(str(tmp_path / "train.csv"), tokenizer, max_length=8)
+    stored = HelpfulnessDataset(None, tokenizer, max_length=8, token_store=str(tmp_path / "store"))
+    assert len(stored) == len(plain)
+    for i in range(len(plain)):
+        assert plain[i].keys() == stored[i].keys()
+        for key in plain[i]:
+            assert torch.equal(plain[i][key], stored[i][key])
+
+
+def test_token_store_checks_tokenizer_by_vocabulary(tmp_path, tiny_bert):
+    _, tokenizer = tiny_bert(WORDS)
+    store = TokenStore.write(str(tmp_path / "store"), tokenize_texts(TEXTS, tokenizer), [1, 0, 0, 1], tokenizer)
+
+    # The same vocabulary saved elsewhere is accepted.
+    tokenizer.save_pretrained(str(tmp_path / "copy"))
+    store.check_tokenizer(BertTokenizerFast.from_pretrained(str(tmp_path / "copy")))
+
+    (tmp_path / "other.txt").write_text("\n".join(WORDS[:-1] + ["?"]))
+    with pytest.raises(ValueError):
+        store.check_tokenizer(BertTokenizerFast(str(tmp_path / "other.txt")))
@@ -0,0 +1,67 @@
+import argparse
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from analyzer import Analyzer
+from modeling import BertForSentimentClassification
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "great", "bad", "movie"]
+
+
+def make_analyzer(tmp_path, tiny_bert):
+    tiny_bert(
+        WORDS, BertForSentimentClassification, num_hidden_layers=1,
+        hidden_dropout_prob=0.0, attention_probs_dropout_prob=0.0,
+    )
+    return Analyzer(will_train=True, args=argparse.Namespace(model_name_or_path=str(tmp_path), output_dir=None))
+
+
+def make_data(num_samples=8):
+    torch.manual_seed(1)
+    input_ids = torch.randint(5, len(WORDS), (num_samples, 6))
+    return TensorDataset(input_ids, torch.ones_like(input_ids), torch.randint(0, 2, (num_samples,)))
+
+
+def test_gradient_accumulation_matches_large_batch(tmp_path, tiny_bert):
+    results = []
+    for batch_size, accum in ((8, 1), (4, 2)):
+        analyzer = make_analyzer(tmp_path, tiny_bert)
+        optimizer = torch.optim.SGD(analyzer.model.parameters(), lr=0.1)
+        stats = analyzer.train(
+            DataLoader(make_data(), batch_size=batch_size), optimizer, nn.BCEWithLogitsLoss(),
+            grad_accum_steps=accum, verbose=False,
+        )
+        assert stats["samples"] == 8
+        assert stats["steps"] == 1
+        results.append(analyzer.model.cls_layer.weight.detach().clone())
+    assert torch.allclose(results[0], results[1], atol=1e-6)
+
+
+def test_gradient_accumulation_matches_uneven_last_batch(tmp_path, tiny_bert):
+    # 12 samples: steps of 8 + 4 samples either way; the last group holds one batch of 4.
+    results = []
+    for batch_size, accum in ((8, 1), (4, 2)):
+        analyzer = make_analyzer(tmp_path, tiny_bert)
+        optimizer = torch.optim.SGD(analyzer.model.parameters(), lr=0.1)
+        stats = analyzer.train(
+            DataLoader(make_data(12), batch_size=batch_size), optimizer, nn.BCEWithLogitsLoss(),
+            grad_accum_steps=accum, verbose=False,
+        )
+        assert stats["steps"] == 2
+        results.append(analyzer.model.cls_layer.weight.detach().clone())
+    assert torch.allclose(results[0], results[1], atol=1e-6)
+
+def test_bf16_training_step(tmp_path, tiny_bert):
+    analyzer = make_analyzer(tmp_path, tiny_bert)
+    before = analyzer.model.cls_layer.weight.detach().clone()
+    optimizer = torch.optim.SGD(analyzer.model.parameters(), lr=0.1)
+    stats = analyzer.train(
+        DataLoader(make_data(), batch_size=4), optimizer, nn.BCEWithLogitsLoss(),
+        precision="bf16", verbose=False,
+    )
+    assert stats["steps"] == 2
+    assert stats["samples_per_sec"] > 0
+    assert analyzer.model.cls_layer.weight.dtype == torch.float32
+    assert not torch.equal(before, analyzer.model.cls_layer.weight)
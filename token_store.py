@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+META_FILENAME = "meta.json"
+
+
+# Identifies what a tokenizer produces, not where it was loaded from: the same vocabulary
+# under another hub name or in a local copy gives the same hash.
+def tokenizer_hash(tokenizer):
+    h = hashlib.sha1()
+    h.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode("utf-8"))
+    h.update(repr(getattr(tokenizer, "do_lower_case", None)).encode("utf-8"))
+    return h.hexdigest()
+
+
+class TokenStore:
+    """
+    Token IDs of a whole dataset, tokenized once and memory-mapped from disk.
+
+    The store is a directory with the concatenated IDs of every example
+    (ids.npy), the start of each example in it (offsets.npy, one extra entry
+    at the end), the labels (labels.npy) and a meta.json naming the tokenizer.
+    IDs are stored without special tokens so one store serves any maxlen;
+    example(i) returns a read-only view into the mapped file.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, META_FILENAME), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.ids = np.load(os.path.join(store_dir, "ids.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(store_dir, "offsets.npy"), mmap_mode="r")
+        self.labels = np.load(os.path.join(store_dir, "labels.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.labels)
+
+    def example(self, index):
+        return self.ids[self.offsets[index] : self.offsets[index + 1]]
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    # Raises if the store was written with a different tokenizer than the one in use.
+    # Stores written before tokenizer hashes were recorded are checked by name.
+    def check_tokenizer(self, tokenizer):
+        if "tokenizer_hash" in self.meta:
+            matches = self.meta["tokenizer_hash"] == tokenizer_hash(tokenizer)
+        else:
+            matches = self.meta["tokenizer"] == tokenizer.name_or_path and self.meta["vocab_size"] == len(tokenizer)
+        if not matches:
+            raise ValueError(
+                f"Token store {self.store_dir} was built with tokenizer {self.meta['tokenizer']!r}, whose "
+                f"vocabulary differs from {tokenizer.name_or_path!r}. Run pretokenize.py again."
+            )
+
+    @staticmethod
+    def write(store_dir, token_ids, labels, tokenizer, **meta):
+        """
+        Writes a store from an iterable of token ID lists and the matching labels.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        lengths = []
+        chunks = []
+        for ids in token_ids:
+            lengths.append(len(ids))
+            chunks.append(np.asarray(ids, dtype=np.int32))
+
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+
+        np.save(os.path.join(store_dir, "ids.npy"), ids)
+        np.save(os.path.join(store_dir, "offsets.npy"), offsets)
+        np.save(os.path.join(store_dir, "labels.npy"), np.asarray(labels, dtype=np.int64))
+        with open(os.path.join(store_dir, META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "tokenizer": tokenizer.name_or_path,
+                    "vocab_size": len(tokenizer),
+                    "tokenizer_hash": tokenizer_hash(tokenizer),
+                    **meta,
+                },
+                f,
+                indent=2,
+            )
+        return TokenStore(store_dir)
+
+
+# Tokenizes texts without special tokens, in batches so fast tokenizers work in parallel.
+def tokenize_texts(texts, tokenizer, batch_size=1000):
+    for start in range(0, len(texts), batch_size):
+        yield from tokenizer(texts[start : start + batch_size], add_special_tokens=False)["input_ids"]
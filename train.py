@@ -1,41 +1,106 @@
+import os
+
 import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
 from tqdm import trange
 
 from dataset import SSTDataset
+from distributed import all_reduce_sum, barrier, cleanup, init_distributed, is_main_process, local_rank
+from sampling import BucketBatchSampler, format_report, padding_report, trim_padding_collate
 from arguments import args
 from analyzer import Analyzer
 
 if __name__ == "__main__":
 
+    # `torchrun --nproc_per_node N train.py ...` trains with N DistributedDataParallel processes.
+    rank, world_size = init_distributed(args.dist_backend)
+
     analyzer = Analyzer(will_train=True, args=args)
+    if world_size > 1:
+        analyzer.wrap_distributed(local_rank())
 
     criterion = nn.BCEWithLogitsLoss()
 
     optimizer = optim.Adam(params=analyzer.model.parameters(), lr=args.lr)
 
+    store_dir = args.token_store_dir
     train_set = SSTDataset(
         filename="data/train.tsv",
         maxlen=args.maxlen_train,
         tokenizer=analyzer.tokenizer,
+        token_store=store_dir and os.path.join(store_dir, "train"),
     )
     val_set = SSTDataset(
-        filename="data/dev.tsv", maxlen=args.maxlen_val, tokenizer=analyzer.tokenizer
+        filename="data/dev.tsv",
+        maxlen=args.maxlen_val,
+        tokenizer=analyzer.tokenizer,
+        token_store=store_dir and os.path.join(store_dir, "dev"),
     )
 
-    train_loader = DataLoader(
-        dataset=train_set, batch_size=args.batch_size, num_workers=args.num_threads
-    )
-    val_loader = DataLoader(
-        dataset=val_set, batch_size=args.batch_size, num_workers=args.num_threads
-    )
+    if args.bucket_batches:
+        train_lengths = train_set.lengths()
+        train_sampler = BucketBatchSampler(
+            train_lengths, args.batch_size, shuffle=True, num_replicas=world_size, rank=rank
+        )
+        train_loader = DataLoader(
+            dataset=train_set,
+            batch_sampler=train_sampler,
+            collate_fn=trim_padding_collate,
+            num_workers=args.num_threads,
+        )
+        val_loader = DataLoader(
+            dataset=val_set,
+            batch_sampler=BucketBatchSampler(val_set.lengths(), args.batch_size, shuffle=False),
+            collate_fn=trim_padding_collate,
+            num_workers=args.num_threads,
+        )
+    else:
+        train_sampler = (
+            DistributedSampler(train_set, num_replicas=world_size, rank=rank, shuffle=False)
+            if world_size > 1
+            else None
+        )
+        train_loader = DataLoader(
+            dataset=train_set,
+            batch_size=args.batch_size,
+            sampler=train_sampler,
+            num_workers=args.num_threads,
+        )
+        val_loader = DataLoader(
+            dataset=val_set, batch_size=args.batch_size, num_workers=args.num_threads
+        )
 
     best_accuracy = 0
-    for epoch in trange(args.num_eps, desc="Epoch"):
-        analyzer.train(
-            train_loader=train_loader, optimizer=optimizer, criterion=criterion
+    for epoch in trange(args.num_eps, desc="Epoch", disable=not is_main_process()):
+        if isinstance(train_sampler, DistributedSampler):
+            train_sampler.set_epoch(epoch)
+        stats = analyzer.train(
+            train_loader=train_loader,
+            optimizer=optimizer,
+            criterion=criterion,
+            precision=args.precision,
+            grad_accum_steps=args.grad_accum_steps,
+            log_every=args.log_every,
+            verbose=is_main_process(),
+        )
+        samples = all_reduce_sum(stats["samples"])
+        if args.bucket_batches:
+            report = padding_report(
+                train_sampler.batches(epoch), train_lengths, fixed_len=args.maxlen_train
+            )
+            report["real_tokens"] = all_reduce_sum(report["real_tokens"])
+        if not is_main_process():
+            barrier()
+            continue
+
+        print(
+            f"Epoch {epoch} training: {samples / stats['seconds']:.1f} samples/s "
+            f"over {world_size} process(es), {stats['avg_step_ms']:.1f} ms/step"
         )
+        if args.bucket_batches:
+            print(f"Epoch {epoch} training: {format_report(report, stats['seconds'])}")
         val_accuracy, val_loss = analyzer.evaluate(
             val_loader=val_loader, criterion=criterion
         )
@@ -48,3 +113,6 @@ if __name__ == "__main__":
                 f"Best validation accuracy improved from {best_accuracy} to {val_accuracy}, saving analyzer..."
             )
             analyzer.save()
+        barrier()
+
+    cleanup()
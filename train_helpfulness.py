@@ -2,7 +2,32 @@
 import argparse, os
 from transformers import (AutoTokenizer, AutoConfig, AutoModelForSequenceClassification,
                           Trainer, TrainingArguments)
+from torch.utils.data import DataLoader
 from helpfulness_dataset import HelpfulnessDataset
+from sampling import BucketBatchSampler, format_report, padding_report, trim_padding_collate
+
+
+class BucketedTrainer(Trainer):
+    """
+    Trainer whose batches group examples of similar length and are padded only to their longest example.
+    """
+
+    def _bucketed_loader(self, dataset, batch_size, shuffle):
+        sampler = BucketBatchSampler(dataset.lengths(), batch_size, shuffle=shuffle, seed=self.args.seed)
+        return DataLoader(
+            dataset,
+            batch_sampler=sampler,
+            collate_fn=trim_padding_collate,
+            num_workers=self.args.dataloader_num_workers,
+        )
+
+    def get_train_dataloader(self):
+        return self._bucketed_loader(self.train_dataset, self.args.per_device_train_batch_size, True)
+
+    def get_eval_dataloader(self, eval_dataset=None):
+        dataset = eval_dataset if eval_dataset is not None else self.eval_dataset
+        return self._bucketed_loader(dataset, self.args.per_device_eval_batch_size, False)
+
 
 def parse_args():
     p = argparse.ArgumentParser()
@@ -13,6 +38,10 @@ def parse_args():
     p.add_argument("--epochs", type=int, default=2)
     p.add_argument("--batch_size", type=int, default=16)
     p.add_argument("--lr", type=float, default=2e-5)
+    p.add_argument("--train_store", default=None, help="Token store of train_file from pretokenize.py")
+    p.add_argument("--valid_store", default=None, help="Token store of valid_file from pretokenize.py")
+    p.add_argument("--bucket_batches", action="store_true",
+                   help="Length-bucketed batches padded to their longest example")
     return p.parse_args()
 
 def main():
@@ -23,8 +52,8 @@ def main():
 
     label_list = ["helpful", "creative", "unhelpful"]
 
-    train_ds = HelpfulnessDataset(args.train_file, tok, label_list=label_list)
-    valid_ds = HelpfulnessDataset(args.valid_file, tok, label_list=label_list)
+    train_ds = HelpfulnessDataset(args.train_file, tok, label_list=label_list, token_store=args.train_store)
+    valid_ds = HelpfulnessDataset(args.valid_file, tok, label_list=label_list, token_store=args.valid_store)
 
     num_labels = len(label_list)
     label2id = {l:i for i,l in enumerate(label_list)}
@@ -64,7 +93,8 @@ def main():
             "f1_macro": f1_score(labels, preds, average="macro"),
         }
 
-    trainer = Trainer(
+    trainer_class = BucketedTrainer if args.bucket_batches else Trainer
+    trainer = trainer_class(
         model=model,
         args=training_args,
         train_dataset=train_ds,
@@ -72,7 +102,13 @@ def main():
         tokenizer=tok,
         compute_metrics=compute_metrics,
     )
-    trainer.train()
+    result = trainer.train()
+    if args.bucket_batches:
+        lengths = train_ds.lengths()
+        sampler = BucketBatchSampler(lengths, args.batch_size, seed=training_args.seed)
+        report = padding_report(sampler.batches(), lengths, fixed_len=train_ds.max_length)
+        report["real_tokens"] *= args.epochs
+        print("Training:", format_report(report, result.metrics["train_runtime"]))
     trainer.save_model(args.output_dir)
     tok.save_pretrained(args.output_dir)
     print("Saved:", args.output_dir)
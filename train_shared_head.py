@@ -0,0 +1,100 @@
+# train_shared_head.py
+import argparse
+import os
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+from tqdm import tqdm, trange
+from transformers import AutoConfig, AutoTokenizer
+
+from helpfulness_dataset import HelpfulnessDataset
+from modeling import BertForSentimentAndHelpfulness
+
+
+def parse_args():
+    p = argparse.ArgumentParser(
+        description="Trains the helpfulness head of BertForSentimentAndHelpfulness on top of "
+                    "a frozen sentiment encoder, so one forward pass serves both tasks."
+    )
+    p.add_argument("--model_name_or_path", default="barissayil/bert-sentiment-analysis-sst")
+    p.add_argument("--train_file", required=True)
+    p.add_argument("--valid_file", required=True)
+    p.add_argument("--output_dir", required=True)
+    p.add_argument("--epochs", type=int, default=3)
+    p.add_argument("--batch_size", type=int, default=32)
+    p.add_argument("--lr", type=float, default=1e-3)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    label_list = ["helpful", "creative", "unhelpful"]
+    label2id = {label: i for i, label in enumerate(label_list)}
+    id2label = {i: label for label, i in label2id.items()}
+
+    tok = AutoTokenizer.from_pretrained(args.model_name_or_path)
+    cfg = AutoConfig.from_pretrained(
+        args.model_name_or_path,
+        num_labels=len(label_list),
+        label2id=label2id,
+        id2label=id2label
+    )
+    # Encoder and sentiment head come from the checkpoint; only help_layer is new.
+    model = BertForSentimentAndHelpfulness.from_pretrained(args.model_name_or_path, config=cfg)
+    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+
+    for p in model.parameters():
+        p.requires_grad = False
+    for p in model.help_layer.parameters():
+        p.requires_grad = True
+
+    train_loader = DataLoader(
+        HelpfulnessDataset(args.train_file, tok, label_list=label_list),
+        batch_size=args.batch_size, shuffle=True
+    )
+    valid_loader = DataLoader(
+        HelpfulnessDataset(args.valid_file, tok, label_list=label_list),
+        batch_size=args.batch_size
+    )
+
+    criterion = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(model.help_layer.parameters(), lr=args.lr)
+
+    best_accuracy = 0.0
+    for epoch in trange(args.epochs, desc="Epoch"):
+        model.train()
+        for batch in tqdm(train_loader, desc="Training"):
+            optimizer.zero_grad()
+            _, logits = model(
+                input_ids=batch["input_ids"].to(device),
+                attention_mask=batch["attention_mask"].to(device)
+            )
+            loss = criterion(logits, batch["labels"].to(device))
+            loss.backward()
+            optimizer.step()
+
+        model.eval()
+        correct, total = 0, 0
+        with torch.no_grad():
+            for batch in tqdm(valid_loader, desc="Evaluating"):
+                _, logits = model(
+                    input_ids=batch["input_ids"].to(device),
+                    attention_mask=batch["attention_mask"].to(device)
+                )
+                correct += (logits.argmax(dim=-1).cpu() == batch["labels"]).sum().item()
+                total += len(batch["labels"])
+        accuracy = correct / max(1, total)
+        print(f"Epoch {epoch} complete! Validation Accuracy : {accuracy}")
+
+        if accuracy > best_accuracy:
+            best_accuracy = accuracy
+            model.save_pretrained(args.output_dir)
+            tok.save_pretrained(args.output_dir)
+            print("Saved:", args.output_dir)
+
+
+if __name__ == "__main__":
+    main()